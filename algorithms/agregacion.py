@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# algorithms/agregacion.py
+
+"""
+Corrección por agregación–desagregación para aproximaciones sucesivas.
+
+Con α cerca de 1 las componentes suaves del error (casi constantes sobre
+grupos de estados) decaen como α^k. Cada `cada` barridos, con la política
+codiciosa μ del barrido, v' = T_μ v y d = v' – v, el error e = v_μ – v'
+cumple
+
+    (I – αP_μ) e = αP_μ d
+
+Se aproxima e ≈ W y, con W (n × K) la indicadora de una partición de los
+estados en K grupos, y se resuelve exactamente (denso, K × K) el
+problema agregado
+
+    (I – α R P_μ W) y = α R P_μ d,     R = (WᵀW)⁻¹Wᵀ (promedio por grupo)
+
+para prolongar la corrección: v' ← v' + W y (Bertsekas y Castañon,
+1989). R P_μ W es estocástica, así que el sistema siempre tiene solución.
+
+Particiones:
+  • "residuo": automática, se rehace en cada corrección: K intervalos de
+               igual ancho de d (estados con residuos parecidos suelen
+               tener errores parecidos)
+  • "valor"  : lo mismo con los valores v'
+  • un arreglo con el grupo de cada estado: partición fija del usuario
+
+La corrección no garantiza bajar el error (sobre todo mientras μ sigue
+cambiando). Si el residuo del barrido siguiente no baja respecto al de
+la corrección, cuenta como fallo y la espera hasta la próxima se
+duplica; con un acierto vuelve a `cada`. Entre correcciones son
+barridos simples, que convergen desde cualquier v.
+
+`Agregador` se pasa a `aproximaciones.iterar_valores` (variantes jacobi
+y mpi); `comparar_agregacion` corre el mismo modelo con y sin él y
+reporta la reducción de iteraciones y de tiempo.
+"""
+
+import time
+import numpy as np
+from scipy import sparse
+from modelo import como_modelo
+from aproximaciones import iterar_valores
+
+GRUPOS = 32
+CADA = 5
+PARTICIONES = ("residuo", "valor")
+
+
+def _intervalos(x, grupos):
+    """Grupo de cada entrada: `grupos` intervalos de igual ancho de x."""
+    ancho = np.ptp(x)
+    if ancho == 0:
+        return np.zeros(x.size, dtype=np.int64)
+    return np.minimum(((x - x.min()) * (grupos / ancho)).astype(np.int64),
+                      grupos - 1)
+
+
+class Agregador:
+    """Corrección periódica por agregación para el bucle de VI.
+
+    particion: "residuo", "valor" o un arreglo con el grupo de cada
+    estado. grupos: K de las particiones automáticas. cada: barridos
+    entre correcciones (mientras no fallen). Lleva la cuenta de
+    correcciones, fallos y el tiempo que consumen.
+    """
+
+    def __init__(self, datos, alpha, particion="residuo", grupos=GRUPOS,
+                 cada=CADA):
+        self.modelo = como_modelo(datos)
+        self.alpha = alpha
+        if isinstance(particion, str):
+            if particion not in PARTICIONES:
+                raise ValueError(f"Partición desconocida: {particion}")
+            self._fija = None
+        else:
+            etiquetas = np.asarray(particion, dtype=np.int64)
+            if etiquetas.shape != (self.modelo.n,):
+                raise ValueError(f"La partición debe tener {self.modelo.n} grupos.")
+            self._fija = np.unique(etiquetas, return_inverse=True)[1]
+        if grupos < 1 or cada < 1:
+            raise ValueError("grupos y cada deben ser positivos.")
+        self.particion = particion if self._fija is None else "fija"
+        self.grupos = grupos
+        self.cada = cada
+        self.correcciones = 0
+        self.fallos = 0
+        self.tiempo = 0.0
+        self._residuo = None
+        self._espera = cada
+        self._proxima = cada
+
+    def toca(self, k):
+        """True si en el barrido k corresponde corregir (y agenda la
+        siguiente)."""
+        if k < self._proxima:
+            return False
+        self._proxima = k + self._espera
+        return True
+
+    def vigilar(self, residuo):
+        """Residuo del barrido que sigue a una corrección."""
+        if self._residuo is None:
+            return
+        if residuo >= self._residuo:
+            self.fallos += 1
+            self._espera *= 2
+        else:
+            self._espera = self.cada
+        self._residuo = None
+
+    def _etiquetas(self, v, d):
+        if self._fija is not None:
+            return self._fija
+        x = d if self.particion == "residuo" else v
+        return np.unique(_intervalos(x, self.grupos), return_inverse=True)[1]
+
+    def corregir(self, v, v_nuevo, kopt, residuo):
+        """v' + W y, con v' = v_nuevo = T_μ v y μ dada por los pares kopt."""
+        t0 = time.perf_counter()
+        n, alpha = self.modelo.n, self.alpha
+        d = v_nuevo - v
+        etiquetas = self._etiquetas(v_nuevo, d)
+        K = int(etiquetas.max()) + 1
+        W = sparse.csr_matrix((np.ones(n), (np.arange(n), etiquetas)),
+                              shape=(n, K))
+        tam = np.bincount(etiquetas, minlength=K).astype(np.float64)
+        Pmu = self.modelo.P[kopt]
+        # R P_μ W y R P_μ d sin formar matrices n × K densas
+        WtP = W.T @ Pmu
+        RPW = np.asarray((WtP @ W).todense() if sparse.issparse(WtP)
+                         else WtP @ W.toarray()) / tam[:, None]
+        RPd = np.asarray(WtP @ d).ravel() / tam
+        y = np.linalg.solve(np.eye(K) - alpha * RPW, alpha * RPd)
+        self.correcciones += 1
+        self._residuo = residuo
+        self.tiempo += time.perf_counter() - t0
+        return v_nuevo + y[etiquetas]
+
+    def resumen(self):
+        return {"particion": self.particion, "correcciones": self.correcciones,
+                "fallos": self.fallos, "tiempo": self.tiempo}
+
+
+def comparar_agregacion(datos, alpha, tol, iter_max=100_000,
+                        variante="jacobi", criterio="sup", k_parcial=5,
+                        particion="residuo", grupos=GRUPOS, cada=CADA):
+    """Resuelve con barridos simples y con agregación y compara.
+
+    Devuelve un diccionario con iteraciones y tiempo (s) de cada corrida
+    ("simple", "agregada"), sus cocientes (reduccion_iteraciones,
+    reduccion_tiempo: simple / agregada), las correcciones hechas, si
+    las políticas coinciden y max |v_simple – v_agregada|.
+    """
+    modelo = como_modelo(datos)
+    corridas = {}
+    for nombre, agregador in (
+            ("simple", None),
+            ("agregada", Agregador(modelo, alpha, particion, grupos, cada))):
+        t0 = time.perf_counter()
+        res = iterar_valores(modelo, alpha, iter_max, tol, variante, criterio,
+                             k_parcial, agregador=agregador)
+        corridas[nombre] = dict(res, tiempo=time.perf_counter() - t0)
+    simple, agregada = corridas["simple"], corridas["agregada"]
+    return {
+        "iteraciones": {k: c["iteraciones"] for k, c in corridas.items()},
+        "tiempo": {k: c["tiempo"] for k, c in corridas.items()},
+        "convergio": {k: c["convergio"] for k, c in corridas.items()},
+        "reduccion_iteraciones": simple["iteraciones"] / agregada["iteraciones"],
+        "reduccion_tiempo": simple["tiempo"] / agregada["tiempo"],
+        "correcciones": agregada["correcciones"],
+        "misma_politica": simple["politica"] == agregada["politica"],
+        "diferencia_v": float(np.max(np.abs(simple["v"] - agregada["v"]))),
+    }
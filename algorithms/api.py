@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# algorithms/api.py
+
+"""
+Interfaz sin pantalla de los métodos de solución.
+
+Cada `resolver_*` recibe el modelo (ModeloPMD o el diccionario de
+`read.py`) y los parámetros que los métodos interactivos piden por
+input(). No limpia la pantalla, no lee del teclado ni imprime (salvo lo
+que haga la traza que se le pase) y devuelve un objeto Resultado:
+
+  • politica    : tupla de decisiones, una por estado
+  • v           : valores (descontados, o el sesgo con v_{n-1} = 0)
+  • g           : costo medio E[C_R] de la política
+  • pi          : distribución estacionaria de la política
+  • iteraciones, convergio, tiempo (s)
+  • aviso       : texto si la política es multicadena (entonces pi es
+                  None y g solo está definida cuando la da la evaluación)
+
+más los campos propios de cada método. `main.py` es la envoltura
+interactiva; los procesos de larga vida (servicio, barridos) llaman a
+estas funciones directamente.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from modelo import como_modelo
+from estacionaria import costo_medio_politica, CadenaMulticadenaError
+from enumeration import enumerar_politicas
+from pro_lineal import (resolver_lp_highs, resolver_lp_pulp, politica_de_lp,
+                        MAX_PARES_PULP)
+from pol_mejoradas import iterar_politicas
+from aproximaciones import iterar_valores
+from agregacion import Agregador
+from valores_relativos import iterar_valores_relativos
+from paralelo import iterar_valores_paralelo
+from barrido import iterar_valores_alphas, barrido_politicas, puntos_de_quiebre
+
+# Iteraciones de PI con que se intenta reutilizar una solución previa del LP
+ITER_LP_PREVIA = 10
+
+
+@dataclass
+class Resultado:
+    metodo: str
+    politica: Optional[tuple]
+    v: Optional[np.ndarray]
+    g: Optional[float]
+    pi: Optional[np.ndarray]
+    iteraciones: Optional[int]
+    convergio: bool
+    tiempo: float
+    aviso: Optional[str] = None
+
+
+@dataclass
+class ResultadoEnumeracion(Resultado):
+    mejores: list = field(default_factory=list)   # [(pol, π, g), …]
+    estadisticas: dict = field(default_factory=dict)
+
+
+@dataclass
+class ResultadoLP(Resultado):
+    y: Optional[np.ndarray] = None
+    estado: str = ""
+    backend: str = ""
+
+
+@dataclass
+class ResultadoPI(Resultado):
+    alpha: Optional[float] = None
+    refactorizaciones: int = 0
+    actualizaciones: int = 0
+    eliminados: Optional[np.ndarray] = None     # pares por iteración
+
+
+@dataclass
+class ResultadoVI(Resultado):
+    alpha: float = 0.0
+    variante: str = "jacobi"
+    backups: int = 0
+    cota_inferior: Optional[np.ndarray] = None
+    cota_superior: Optional[np.ndarray] = None
+    epsilon: float = float("inf")
+    eliminados: Optional[np.ndarray] = None     # pares por iteración
+    correcciones: int = 0                       # por agregación
+
+
+@dataclass
+class ResultadoRVI(Resultado):
+    tau: float = 1.0
+    cota_inferior: float = -float("inf")
+    cota_superior: float = float("inf")
+
+
+@dataclass
+class ResultadoBarrido:
+    motor: str                  # "pi" o "vi"
+    alphas: np.ndarray          # ordenados
+    politicas: list             # política óptima de cada α
+    V: np.ndarray               # valores, n × α
+    iteraciones: np.ndarray     # por α
+    quiebres: list              # (α_izq, α_der, política_izq, política_der)
+    tiempo: float
+
+
+def _validar_alpha(alpha):
+    if not 0 <= alpha < 1:
+        raise ValueError("α debe cumplir 0 ≤ α < 1.")
+
+
+def _validar_tol(tol):
+    if not tol > 0:
+        raise ValueError("tol debe ser positiva.")
+
+
+def _estacionaria(modelo, pol):
+    """(π, g, aviso) de la política; π y g son None si es multicadena."""
+    try:
+        pi, g = costo_medio_politica(modelo, pol)
+        return pi, g, None
+    except CadenaMulticadenaError as e:
+        return None, None, str(e)
+
+
+def politica_inicial(datos):
+    """La primera decisión viable de cada estado."""
+    modelo = como_modelo(datos)
+    return tuple(modelo.acciones[modelo.inicio[:-1]].tolist())
+
+
+def validar_politica(datos, pol):
+    """Lanza ValueError si `pol` no es una política viable del modelo."""
+    modelo = como_modelo(datos)
+    pol = tuple(int(a) for a in pol)
+    if len(pol) != modelo.n:
+        raise ValueError(f"La política debe tener {modelo.n} decisiones.")
+    for i, a in enumerate(pol):
+        if a not in modelo.decisiones(i):
+            raise ValueError(f"La decisión {a} no es viable en el estado {i}.")
+    return pol
+
+
+def _cota_semillas(modelo, semillas, k):
+    """E(C_R) de la k-ésima mejor de las políticas unicadena de `semillas`
+    (None si no llegan a k)."""
+    gs = []
+    for pol in set(validar_politica(modelo, p) for p in semillas):
+        _, g, _ = _estacionaria(modelo, pol)
+        if g is not None:
+            gs.append(g)
+    if len(gs) < k:
+        return None
+    return sorted(gs, reverse=modelo.maximizar)[k - 1]
+
+
+def resolver_enumeracion(datos, k=10, procesos=1, podar=True, semillas=None):
+    """Enumeración exhaustiva; devuelve la mejor política y las k mejores.
+
+    semillas: políticas ya conocidas (por ejemplo, las k mejores de una
+    versión anterior del modelo); reevaluadas, la k-ésima mejor sirve de
+    cota para podar desde el principio.
+    """
+    modelo = como_modelo(datos)
+    t0 = time.perf_counter()
+    cota = _cota_semillas(modelo, semillas, k) if semillas else None
+    mejores, stats = enumerar_politicas(modelo, k=k, procesos=procesos,
+                                        podar=podar, cota_inicial=cota)
+    tiempo = time.perf_counter() - t0
+    if not mejores:
+        return ResultadoEnumeracion(
+            "enumeracion", None, None, None, None, stats["evaluadas"], False,
+            tiempo, aviso="Ninguna política tiene un vector estacionario único.",
+            estadisticas=stats)
+    pol, pi, g = mejores[0]
+    return ResultadoEnumeracion("enumeracion", pol, None, g, pi,
+                                stats["evaluadas"], True, tiempo,
+                                mejores=mejores, estadisticas=stats)
+
+
+def _lp_desde_politica(modelo, pol, iter_max=ITER_LP_PREVIA):
+    """y óptimo del LP a partir de una política previa, sin resolverlo.
+
+    Se corre iteración de políticas desde pol (con una solución previa
+    casi óptima, una o dos iteraciones). La política final cumple las
+    ecuaciones de optimalidad en todos los estados, así que (g, v) es
+    factible en el dual y y_{i,pol(i)} = π_i es un vértice óptimo.
+    Devuelve (y, iteraciones), o None si alguna política es multicadena
+    o no converge en iter_max iteraciones.
+    """
+    try:
+        costo_medio_politica(modelo, pol)
+        res = iterar_politicas(modelo, pol, iter_max=iter_max)
+        if not res["convergio"]:
+            return None
+        pi, _ = costo_medio_politica(modelo, res["politica"])
+    except CadenaMulticadenaError:
+        return None
+    y = np.zeros(modelo.num_pares)
+    y[modelo.indices_politica(res["politica"])] = pi
+    return y, res["iteraciones"]
+
+
+def resolver_lp(datos, backend="auto", traza=None, pol0=None):
+    """LP de costo medio con PuLP/CBC o HiGHS ("auto" elige por tamaño).
+
+    pol0: solución previa (por ejemplo, de antes de editar el modelo).
+    Con ella se intenta llegar al óptimo por iteración de políticas y
+    armar y sin resolver el LP (backend "previa", con las iteraciones de
+    PI); si no se puede, se resuelve el LP completo.
+    """
+    modelo = como_modelo(datos)
+    if backend == "auto":
+        backend = "pulp" if modelo.num_pares <= MAX_PARES_PULP else "highs"
+    if backend not in ("pulp", "highs"):
+        raise ValueError(f"Backend de LP desconocido: {backend}")
+    t0 = time.perf_counter()
+    if pol0 is not None:
+        previa = _lp_desde_politica(modelo, validar_politica(modelo, pol0))
+        if previa is not None:
+            y, iteraciones = previa
+            pol, pi, g = politica_de_lp(modelo, y)
+            return ResultadoLP("lp", pol, None, g, pi, iteraciones, True,
+                               time.perf_counter() - t0, y=y,
+                               estado="Optimal", backend="previa")
+    resolver = resolver_lp_pulp if backend == "pulp" else resolver_lp_highs
+    y, estado = resolver(modelo, traza)
+    pol, pi, g = politica_de_lp(modelo, y)
+    return ResultadoLP("lp", pol, None, g, pi, None, estado == "Optimal",
+                       time.perf_counter() - t0, y=y, estado=estado,
+                       backend=backend)
+
+
+def resolver_pi(datos, pol0=None, iter_max=None, traza=None):
+    """Mejoramiento de políticas sin descuento (costo medio)."""
+    modelo = como_modelo(datos)
+    pol0 = politica_inicial(modelo) if pol0 is None else validar_politica(modelo, pol0)
+    t0 = time.perf_counter()
+    res = iterar_politicas(modelo, pol0, iter_max=iter_max, traza=traza)
+    pi, _, aviso = _estacionaria(modelo, res["politica"])
+    return ResultadoPI("pi", res["politica"], res["v"], float(res["g"]), pi,
+                       res["iteraciones"], res["convergio"],
+                       time.perf_counter() - t0, aviso,
+                       refactorizaciones=res["refactorizaciones"],
+                       actualizaciones=res["actualizaciones"])
+
+
+def resolver_pi_desc(datos, alpha, pol0=None, iter_max=None, traza=None,
+                     eliminar=False):
+    """Mejoramiento de políticas con descuento α (con eliminar=True,
+    descartando los pares que no pueden ser óptimos)."""
+    _validar_alpha(alpha)
+    modelo = como_modelo(datos)
+    pol0 = politica_inicial(modelo) if pol0 is None else validar_politica(modelo, pol0)
+    t0 = time.perf_counter()
+    res = iterar_politicas(modelo, pol0, alpha, iter_max=iter_max, traza=traza,
+                           eliminar=eliminar)
+    pi, g, aviso = _estacionaria(modelo, res["politica"])
+    return ResultadoPI("pi_desc", res["politica"], res["v"], g, pi,
+                       res["iteraciones"], res["convergio"],
+                       time.perf_counter() - t0, aviso, alpha=alpha,
+                       refactorizaciones=res["refactorizaciones"],
+                       actualizaciones=res["actualizaciones"],
+                       eliminados=res.get("eliminados"))
+
+
+def resolver_vi(datos, alpha, tol, iter_max=100_000, variante="jacobi",
+                criterio="sup", k_parcial=5, v0=None, traza=None,
+                procesos=1, asincrono=False, eliminar=False, orden=None,
+                agregacion=None):
+    """Aproximaciones sucesivas con descuento α.
+
+    Con procesos > 1 (o None: uno por CPU) o asincrono=True se usa el
+    motor de `paralelo.py` (Jacobi por bloques; sin traza). eliminar=True
+    descarta los pares que no pueden ser óptimos (solo Jacobi serial).
+    orden: orden de barrido de Gauss-Seidel ("cfc" o una permutación).
+    agregacion: corrección por agregación–desagregación (jacobi y mpi):
+    "residuo", "valor", un arreglo con el grupo de cada estado o un
+    `agregacion.Agregador` ya configurado.
+    """
+    _validar_alpha(alpha)
+    _validar_tol(tol)
+    modelo = como_modelo(datos)
+    if procesos != 1 or asincrono:
+        if variante != "jacobi" or eliminar or orden is not None \
+                or agregacion is not None:
+            raise ValueError("El motor paralelo solo tiene la variante jacobi"
+                             " sin eliminación, orden ni agregación.")
+        res = iterar_valores_paralelo(modelo, alpha, iter_max, tol, criterio,
+                                      procesos, asincrono, v0=v0)
+    else:
+        agregador = agregacion
+        if agregacion is not None and not isinstance(agregacion, Agregador):
+            agregador = Agregador(modelo, alpha, agregacion)
+        res = iterar_valores(modelo, alpha, iter_max, tol, variante, criterio,
+                             k_parcial, v0=v0, traza=traza, eliminar=eliminar,
+                             orden=orden, agregador=agregador)
+    pi, g, aviso = _estacionaria(modelo, res["politica"])
+    return ResultadoVI("vi", res["politica"], res["v"], g, pi,
+                       res["iteraciones"], res["convergio"], res["tiempo"],
+                       aviso, alpha=alpha, variante=res["variante"],
+                       backups=res["backups"],
+                       cota_inferior=res["cota_inferior"],
+                       cota_superior=res["cota_superior"],
+                       epsilon=res["epsilon"], eliminados=res.get("eliminados"),
+                       correcciones=res.get("correcciones", 0))
+
+
+def resolver_rvi(datos, tol, iter_max=100_000, tau=1.0, h0=None, traza=None):
+    """Iteración de valores relativos (costo medio)."""
+    _validar_tol(tol)
+    modelo = como_modelo(datos)
+    res = iterar_valores_relativos(modelo, iter_max, tol, tau, h0=h0,
+                                   traza=traza)
+    pi, _, aviso = _estacionaria(modelo, res["politica"])
+    return ResultadoRVI("rvi", res["politica"], res["h"], res["g"], pi,
+                        res["iteraciones"], res["convergio"], res["tiempo"],
+                        aviso, tau=tau, cota_inferior=res["cota_inferior"],
+                        cota_superior=res["cota_superior"])
+
+
+def resolver_barrido(datos, alphas, motor="pi", tol=1e-8, tol_quiebre=None,
+                     iter_max=None):
+    """Barrido de α con iteración de políticas en caliente ("pi") o con
+    aproximaciones sucesivas sobre la matriz (estados × α) ("vi").
+
+    tol es la tolerancia de VI; con tol_quiebre los cambios de política
+    se refinan por bisección.
+    """
+    modelo = como_modelo(datos)
+    t0 = time.perf_counter()
+    if motor == "pi":
+        res = barrido_politicas(modelo, alphas, iter_max=iter_max, tol=tol_quiebre)
+    elif motor == "vi":
+        _validar_tol(tol)
+        res = iterar_valores_alphas(modelo, alphas, iter_max or 100_000, tol)
+        res["quiebres"] = puntos_de_quiebre(modelo, res["alphas"],
+                                            res["politicas"], tol_quiebre)
+    else:
+        raise ValueError(f"Motor de barrido desconocido: {motor}")
+    return ResultadoBarrido(motor, res["alphas"], res["politicas"], res["V"],
+                            res["iteraciones"], res["quiebres"],
+                            time.perf_counter() - t0)
+
+
+RESOLVEDORES = {
+    "enumeracion": resolver_enumeracion,
+    "lp": resolver_lp,
+    "pi": resolver_pi,
+    "pi_desc": resolver_pi_desc,
+    "vi": resolver_vi,
+    "rvi": resolver_rvi,
+    "barrido": resolver_barrido,
+}
+
+
+def resolver(datos, metodo, **parametros):
+    """Despacha a `RESOLVEDORES[metodo]` con los parámetros dados."""
+    if metodo not in RESOLVEDORES:
+        raise ValueError(f"Método desconocido: {metodo}")
+    return RESOLVEDORES[metodo](datos, **parametros)
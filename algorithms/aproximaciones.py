@@ -8,105 +8,355 @@ Ecuación de iteración:
   v^{k+1}_i = min_{a∈D(i)} [ c_{i,a} + α ∑_j P_a[i,j] · v^k_j ]
 (o max si problema es de maximizar).
 
-El usuario introduce:
-  • α (0 ≤ α < 1)
-  • iter_max (número máximo de iteraciones)
-  • tol (tolerancia para detenerse)
+Parámetros: α (0 ≤ α < 1), iter_max y tol. Cada iteración se reporta a
+la traza (el menú de `main.py` imprime v⁽ᵏ⁾_0…v⁽ᵏ⁾_{n-1}); al final se
+extrae la política π(i)=argmin_a[…].
 
-En cada iteración se imprimen v⁽ᵏ⁾_0…v⁽ᵏ⁾_{n-1}. Al final, se extrae
-la política π(i)=argmin_a[…], se muestra y se termina.
+Los Q-valores de todos los pares (i, a) se calculan en bloque con el
+motor de `bellman.py` (un producto matriz-vector + reducción segmentada).
+
+Variantes disponibles en `iterar_valores`:
+  • "jacobi"   : barridos síncronos (el método clásico)
+  • "gs"       : Gauss-Seidel, cada v_i nuevo se usa en el mismo barrido
+  • "prioridad": barrido priorizado; se actualiza primero el estado con
+                 mayor residuo de Bellman y se recalculan los residuos de
+                 sus predecesores (cada recálculo cuenta como un backup)
+  • "mpi"      : iteración de políticas modificada, con k_parcial barridos
+                 de evaluación parcial v ← c^π + αP^π v entre mejoras
+  • "topologica": por niveles de las componentes fuertemente conexas del
+                 grafo unión (`grafos.py`), de las cerradas hacia atrás;
+                 cada nivel se itera (Jacobi) hasta su propio residuo < tol
+                 antes de pasar al siguiente, que ya usa sus valores
+                 finales. Solo con el criterio "sup"
+
+Con agregador (un `agregacion.Agregador`, variantes jacobi y mpi) se
+aplica cada tantos barridos una corrección por agregación–desagregación
+que acelera las componentes suaves del error cuando α está cerca de 1.
+
+Con variante="gs", orden="cfc" barre los estados en el orden de
+evaluación de esas componentes (cada estado después de sus sucesores en
+otras componentes); también se puede pasar una permutación de estados.
+
+Criterios de paro:
+  • "sup" : ‖v^{k+1} – v^k‖_∞ < tol
+  • "span": sp(v^{k+1} – v^k) < tol·(1–α)/α, con lo que la política
+            codiciosa es tol-óptima (Puterman, Teo. 6.6.6)
+
+Con eliminar=True (solo Jacobi) se aplica en cada barrido la prueba de
+MacQueen de `bellman.EliminadorAcciones` con las cotas de ese barrido:
+los pares (i, a) que no pueden ser óptimos se descartan para siempre y
+los barridos siguientes solo recorren los sobrevivientes. La traza
+recibe en cada evento los pares eliminados en esa iteración.
+
+Al terminar se aplica un backup de Jacobi adicional d = Tv – v para dar
+las cotas  Tv + α/(1–α)·min d ≤ v* ≤ Tv + α/(1–α)·max d.
+Con el criterio "span" el iterado v puede estar lejos de v* aunque la
+política ya sea buena, así que se devuelve como v el punto medio de las
+cotas.
 """
 
+import heapq
+import time
+from functools import partial
 import numpy as np
-from read import leer_datos_manualmente
-from lim_pant import limpiar_pantalla
-
-def metodo_value_iteration(datos):
-    limpiar_pantalla()
-    problema_tipo = datos["problema_tipo"].lower()  # “maximizar” o “minimizar”
-    n             = datos["num_estados"]
-    politicas     = datos["politicas"]              # dict: acción→[estados]
-    probs         = datos["probabilidades"]         # dict: acción→matriz n×n
-    costos        = datos["costos"]                 # dict: acción→{i:c_{i,a}}
-
-    # 1) Leer α, iter_max, tol
-    while True:
-        try:
-            alpha = float(input("Ingrese factor de descuento α (0 ≤ α < 1): ").strip())
-            if 0 <= alpha < 1: break
-        except:
-            pass
-        print("α inválido; debe ser 0 ≤ α < 1.")
-    while True:
-        try:
-            iter_max = int(input("Ingrese número máximo de iteraciones: ").strip())
-            if iter_max > 0: break
-        except:
-            pass
-        print("iter_max inválido; debe ser entero positivo.")
-    while True:
-        try:
-            tol = float(input("Ingrese tolerancia tol (>0): ").strip())
-            if tol > 0: break
-        except:
-            pass
-        print("tol inválida; debe ser número positivo.")
-
-    # Construir D(i)
-    D = {i: [] for i in range(n)}
-    for a, estados in politicas.items():
-        for i in estados:
-            D[i].append(a)
-
-    # 2) Inicializar v
-    v = np.zeros(n)
-    print("\n--- Valores de la iteración ---")
-    for k in range(1, iter_max+1):
-        v_new = np.zeros(n)
-        for i in range(n):
-            valores = []
-            for a in D[i]:
-                q = costos[a][i] + alpha * np.dot(probs[a][i], v)
-                valores.append(q)
-            if problema_tipo.startswith("max"):
-                v_new[i] = max(valores)
-            else:
-                v_new[i] = min(valores)
-        # Imprimir iteración
-        print(f"\nIteración {k}:")
-        for i, vi in enumerate(v_new):
-            print(f" v_{i} = {vi:.6f}")
-        # Chequear convergencia
-        if np.max(np.abs(v_new - v)) < tol:
-            print(f"\nConvergió por tol={tol} en {k} iteraciones.")
-            v = v_new
+from modelo import como_modelo
+from bellman import (backup, politica_greedy, q_valores, argoptimo, reducir,
+                     bloques_por_estado, umbral_parada, medida_residuo,
+                     EliminadorAcciones)
+from grafos import Descomposicion, grafo_union, orden_barrido
+from traza import como_traza, evento
+
+VARIANTES = ("jacobi", "gs", "prioridad", "mpi", "topologica")
+CRITERIOS = ("sup", "span")
+
+
+def iterar_valores(datos, alpha, iter_max, tol, variante="jacobi",
+                   criterio="sup", k_parcial=5, v0=None, traza=None,
+                   eliminar=False, orden=None, agregador=None):
+    """Aproximaciones sucesivas con la variante y el criterio indicados.
+
+    traza (ver `traza.py`) recibe un evento "vi" después de cada
+    iteración (barrido, mejora o n actualizaciones, según la variante)
+    con el residuo medido por el criterio de paro.
+
+    Devuelve un diccionario con v, la política codiciosa, iteraciones,
+    backups de estado realizados, tiempo (s), si convergió, y las cotas
+    de v* con el ε de optimalidad de la política. Con criterio="span",
+    v es el punto medio de las cotas (el iterado queda en "v_iterada").
+    Con eliminar=True incluye además "eliminados" (pares descartados en
+    cada iteración) y "pares_vivos"; con agregador, "correcciones".
+    """
+    modelo = como_modelo(datos)
+    if variante not in VARIANTES:
+        raise ValueError(f"Variante desconocida: {variante}")
+    if eliminar and variante != "jacobi":
+        raise ValueError("La eliminación de acciones solo está en la variante jacobi.")
+    if variante == "topologica" and criterio != "sup":
+        raise ValueError("La variante topologica solo admite el criterio sup.")
+    if orden is not None and variante != "gs":
+        raise ValueError("El orden de barrido solo se aplica a la variante gs.")
+    if agregador is not None and (variante not in ("jacobi", "mpi") or eliminar):
+        raise ValueError("La agregación solo está en las variantes jacobi y mpi"
+                         " sin eliminación.")
+    umbral = umbral_parada(criterio, tol, alpha)
+    v = np.zeros(modelo.n) if v0 is None else np.array(v0, dtype=float)
+    traza = como_traza(traza)
+
+    t0 = time.perf_counter()
+    def notificar(k, v, residuo, eliminados=None):
+        traza.iteracion(evento("vi", k, t0, residuo=residuo,
+                               valores=v if traza.valores else None,
+                               eliminados=eliminados))
+
+    al_iterar = None
+    if traza.activa:
+        traza.inicio("vi", {"alpha": alpha, "variante": variante,
+                            "criterio": criterio, "n": modelo.n})
+        al_iterar = notificar
+
+    extra = {}
+    if eliminar:
+        v, k, backups, convergio, extra = _jacobi_eliminando(
+            modelo, v, alpha, iter_max, criterio, umbral, al_iterar)
+    else:
+        iterar = {"jacobi": _jacobi, "gs": _gauss_seidel,
+                  "prioridad": _prioridad, "mpi": _mpi,
+                  "topologica": _topologica}[variante]
+        if orden is not None:
+            iterar = partial(_gauss_seidel, orden=_orden_barrido(modelo, orden))
+        if agregador is not None:
+            iterar = partial(iterar, agregador=agregador)
+        v, k, backups, convergio = iterar(modelo, v, alpha, iter_max, criterio,
+                                          umbral, k_parcial, al_iterar)
+        if agregador is not None:
+            extra = {"correcciones": agregador.correcciones}
+    tiempo = time.perf_counter() - t0
+    if traza.activa:
+        traza.fin({"metodo": "vi", "iteraciones": k, "backups": backups,
+                   "tiempo": tiempo, "convergio": convergio})
+
+    # Cotas de v* con un backup de Jacobi adicional
+    Tv = backup(modelo, v, alpha)
+    d = Tv - v
+    factor = alpha / (1 - alpha)
+    inferior = Tv + factor * d.min()
+    superior = Tv + factor * d.max()
+    return {
+        "v": 0.5 * (inferior + superior) if criterio == "span" else v,
+        "v_iterada": v,
+        "politica": politica_greedy(modelo, v, alpha),
+        "variante": variante,
+        "iteraciones": k,
+        "backups": backups,
+        "tiempo": tiempo,
+        "convergio": convergio,
+        "cota_inferior": inferior,
+        "cota_superior": superior,
+        "epsilon": factor * float(d.max() - d.min()),
+        **extra,
+    }
+
+
+def _jacobi(modelo, v, alpha, iter_max, criterio, umbral, k_parcial, al_iterar,
+            agregador=None):
+    for k in range(1, iter_max + 1):
+        # Backup de Bellman para todos los pares en un solo producto (con
+        # los pares codiciosos si toca corregir por agregación)
+        corregir = agregador is not None and agregador.toca(k)
+        if corregir:
+            q = q_valores(modelo, v, alpha)
+            kopt = argoptimo(modelo, q)
+            v_new = q[kopt]
+        else:
+            v_new = backup(modelo, v, alpha)
+        residuo = medida_residuo(criterio, v_new - v)
+        if al_iterar:
+            al_iterar(k, v_new, residuo)
+        if agregador is not None:
+            agregador.vigilar(residuo)
+        if residuo < umbral:
+            return v_new, k, k * modelo.n, True
+        v = agregador.corregir(v, v_new, kopt, residuo) if corregir else v_new
+    return v, iter_max, iter_max * modelo.n, False
+
+
+def _jacobi_eliminando(modelo, v, alpha, iter_max, criterio, umbral,
+                       al_iterar):
+    """Jacobi con eliminación de acciones de MacQueen en cada barrido.
+
+    La política final sale del backup completo de `iterar_valores`, así
+    que coincide con la de Jacobi sin eliminación.
+    """
+    elim = EliminadorAcciones(modelo)
+    factor = alpha / (1 - alpha)
+    eliminados = []
+    convergio = False
+    for k in range(1, iter_max + 1):
+        q = elim.q_valores(v, alpha)
+        v_new = reducir(elim.modelo, q)
+        d = v_new - v
+        residuo = medida_residuo(criterio, d)
+        # Cotas de v*: del lado del óptimo, Tv + α/(1–α)·(max o min) d
+        if modelo.maximizar:
+            cota, holgura = v_new + factor * d.min(), factor * d.max()
+        else:
+            cota, holgura = v_new + factor * d.max(), -factor * d.min()
+        eliminados.append(elim.eliminar(q, cota, holgura))
+        if al_iterar:
+            al_iterar(k, v_new, residuo, eliminados[-1])
+        v = v_new
+        if residuo < umbral:
+            convergio = True
             break
+    extra = {"eliminados": np.array(eliminados), "pares_vivos": elim.vivos}
+    return v, k, k * modelo.n, convergio, extra
+
+
+def _orden_barrido(modelo, orden):
+    """Permutación de estados para Gauss-Seidel ("cfc" o explícita)."""
+    if isinstance(orden, str):
+        if orden != "cfc":
+            raise ValueError(f"Orden de barrido desconocido: {orden}")
+        return orden_barrido(modelo)
+    orden = np.asarray(orden, dtype=np.int64)
+    if not np.array_equal(np.sort(orden), np.arange(modelo.n)):
+        raise ValueError("El orden debe ser una permutación de los estados.")
+    return orden
+
+
+def _gauss_seidel(modelo, v, alpha, iter_max, criterio, umbral, k_parcial,
+                  al_iterar, orden=None):
+    maximizar = modelo.maximizar
+    bloques = bloques_por_estado(modelo)
+    orden = range(modelo.n) if orden is None else orden.tolist()
+    for k in range(1, iter_max + 1):
+        v_ant = v.copy()
+        for i in orden:
+            c, cols, B = bloques[i]
+            q = c + alpha * B.dot(v[cols])
+            v[i] = q.max() if maximizar else q.min()
+        residuo = medida_residuo(criterio, v - v_ant)
+        if al_iterar:
+            al_iterar(k, v, residuo)
+        if residuo < umbral:
+            return v, k, k * modelo.n, True
+    return v, iter_max, iter_max * modelo.n, False
+
+
+def _mpi(modelo, v, alpha, iter_max, criterio, umbral, k_parcial, al_iterar,
+         agregador=None):
+    backups = 0
+    for k in range(1, iter_max + 1):
+        # Mejora: backup completo y política codiciosa
+        q = q_valores(modelo, v, alpha)
+        kopt = argoptimo(modelo, q)
+        v_new = q[kopt]
+        backups += modelo.n
+        residuo = medida_residuo(criterio, v_new - v)
+        if al_iterar:
+            al_iterar(k, v_new, residuo)
+        if agregador is not None:
+            agregador.vigilar(residuo)
+        if residuo < umbral:
+            return v_new, k, backups, True
+        # Evaluación parcial de la política codiciosa
+        Ppol, cpol = modelo.P[kopt], modelo.costos[kopt]
+        v_ant = v
+        for _ in range(k_parcial):
+            v_ant, v_new = v_new, cpol + alpha * np.asarray(Ppol @ v_new).ravel()
+        backups += k_parcial * modelo.n
+        if agregador is not None and agregador.toca(k):
+            v_new = agregador.corregir(v_ant, v_new, kopt, residuo)
         v = v_new
-    else:
-        print(f"\nAlcanzado iter_max={iter_max} sin converger.")
-
-    # 3) Extraer política final
-    pi = []
-    for i in range(n):
-        candidatos = {}
-        for a in D[i]:
-            q = costos[a][i] + alpha * np.dot(probs[a][i], v)
-            candidatos[a] = q
-        mejor = (max if problema_tipo.startswith("max") else min)(
-            candidatos, key=candidatos.get)
-        pi.append(mejor)
-
-    # 4) Mostrar política lograda
-    print("\nLa política resultante es:", tuple(pi))
-    print("Valores finales v*:")
-    for i, vi in enumerate(v):
-        print(f" v*_{i} = {vi:.6f}")
-
-    pfin = np.zeros((n, n))
-    for i, a in enumerate(pi):
-        pfin[i, :] = probs[a][i]
-    A = pfin.T - np.eye(n); A[-1, :] = 1.0
-    b = np.zeros(n); b[-1] = 1.0
-    pi_est = np.linalg.solve(A, b)
-    costo_medio = sum(pi_est[i] * costos[pi[i]][i] for i in range(n))
-    print(f"\nCosto medio E[C_(R)] = {costo_medio:.6f}")
+    return v, iter_max, backups, False
+
+
+def _prioridad(modelo, v, alpha, iter_max, criterio, umbral, k_parcial,
+               al_iterar):
+    n = modelo.n
+    maximizar = modelo.maximizar
+    # Predecesores de cada estado j: estados p con algún P_a[p, j] > 0
+    Pcsc = modelo.matriz_csr().tocsc()
+    estados = modelo.estados
+    predecesores = [
+        np.unique(estados[Pcsc.indices[Pcsc.indptr[j]:Pcsc.indptr[j + 1]]])
+        for j in range(n)
+    ]
+    bloques = bloques_por_estado(modelo)
+
+    def mejor(i):
+        c, cols, B = bloques[i]
+        q = c + alpha * B.dot(v[cols])
+        return q.max() if maximizar else q.min()
+
+    # Residuos d_i = (Tv)_i – v_i, exactos en todo momento: al cambiar v_i
+    # solo cambian los de sus predecesores, que se recalculan (y cuentan
+    # como backups). La cola guarda |d_i| y se conserva entre iteraciones.
+    d = backup(modelo, v, alpha) - v
+    backups = n
+    cola = [(-abs(r), i) for i, r in enumerate(d.tolist()) if r != 0]
+    heapq.heapify(cola)
+    k = 0
+    fin_iteracion = backups + n
+    while True:
+        # Cada n backups cuentan como una iteración
+        if backups >= fin_iteracion or not cola:
+            k += 1
+            fin_iteracion += n
+            residuo = medida_residuo(criterio, d)
+            if al_iterar:
+                al_iterar(k, v, residuo)
+            if residuo < umbral:
+                return v, k, backups, True
+            if k >= iter_max or not cola:
+                return v, k, backups, False
+
+        r, i = heapq.heappop(cola)
+        if -r != abs(d[i]):
+            continue                       # entrada obsoleta
+        v[i] += d[i]
+        d[i] = 0.0
+        backups += 1
+        for p in predecesores[i].tolist():
+            d[p] = mejor(p) - v[p]
+            backups += 1
+            if d[p] != 0:
+                heapq.heappush(cola, (-abs(d[p]), p))
+
+
+def _topologica(modelo, v, alpha, iter_max, criterio, umbral, k_parcial,
+                al_iterar):
+    """VI topológica: Jacobi restringido a cada nivel de CFC del grafo
+    unión, en orden de evaluación. Cada n backups cuentan como una
+    iteración; iter_max acota el total."""
+    n = modelo.n
+    reducir_q = np.maximum if modelo.maximizar else np.minimum
+    desc = Descomposicion(grafo_union(modelo))
+    largos = np.diff(modelo.inicio)
+    backups, k, fin_iteracion = 0, 0, n
+    for L in range(desc.num_niveles):
+        S = desc.estados_nivel(L)
+        # Pares del nivel, agrupados por estado
+        cuantos = largos[S]
+        segmentos = np.concatenate(([0], np.cumsum(cuantos)[:-1]))
+        pares = (np.repeat(modelo.inicio[S] - segmentos, cuantos)
+                 + np.arange(int(cuantos.sum())))
+        PL, cL = modelo.P[pares], modelo.costos[pares]
+        # Un nivel sin ciclos queda exacto en un solo backup
+        ciclico = desc.ciclica[desc.etiqueta[S]].any()
+        while True:
+            nuevo = reducir_q.reduceat(
+                cL + alpha * np.asarray(PL @ v).ravel(), segmentos)
+            residuo = medida_residuo(criterio, nuevo - v[S])
+            v[S] = nuevo
+            backups += S.size
+            while backups >= fin_iteracion:
+                k += 1
+                fin_iteracion += n
+                if al_iterar:
+                    al_iterar(k, v, residuo)
+            if not ciclico or residuo < umbral:
+                break
+            if k >= iter_max:
+                return v, k, backups, False
+    return v, max(k, 1), backups, True
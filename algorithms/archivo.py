@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# algorithms/archivo.py
+
+"""
+Formato binario en disco para modelos PMD, con carga por memory-map.
+
+Un modelo se guarda en un directorio con:
+
+    cabecera.json   tipo de problema, n, m, número de pares y de no nulos
+    inicio.npy      desplazamientos CSR por estado (n+1)
+    acciones.npy    decisión de cada par estado-acción
+    costos.npy      c_{i,a} de cada par
+    P_data.npy      probabilidades no nulas (CSR de pares × estados)
+    P_indices.npy   columna de cada probabilidad
+    P_indptr.npy    desplazamientos CSR de cada par
+
+Los arreglos se abren con np.load(mmap_mode="r"), así que un modelo de
+varios GB se abre al instante y solo se leen de disco las páginas que
+realmente se usan.
+
+Con precision="float32" (o si el modelo ya es compacto) se guardan
+costos y probabilidades en float32 y las columnas en uint16 cuando
+n ≤ 65 536; al abrirlo, P queda como `compacto.MatrizCompacta` sobre los
+arreglos mapeados, sin convertirlos.
+"""
+
+import json
+import os
+import numpy as np
+from scipy import sparse
+from modelo import ModeloPMD, como_modelo
+from compacto import (MatrizCompacta, PRECISIONES, tipo_indices,
+                      tipo_punteros)
+
+VERSION = 1
+CABECERA = "cabecera.json"
+ARREGLOS = ("inicio", "acciones", "costos", "P_data", "P_indices", "P_indptr")
+
+
+def _tipo_indice(maximo):
+    """int32 si alcanza (así scipy no copia los índices), si no int64."""
+    return np.int32 if maximo < np.iinfo(np.int32).max else np.int64
+
+
+def guardar_modelo(ruta, datos, precision=None):
+    """Escribe el modelo (diccionario de `read.py` o ModeloPMD) en `ruta`.
+
+    precision: "float64", "float32" o None (float32 compacto si el
+    modelo ya tiene P en MatrizCompacta, si no float64).
+    """
+    modelo = como_modelo(datos)
+    if precision is None:
+        precision = (str(modelo.P.dtype) if isinstance(modelo.P, MatrizCompacta)
+                     else "float64")
+    if precision not in PRECISIONES:
+        raise ValueError(f"Precisión desconocida: {precision}")
+    os.makedirs(ruta, exist_ok=True)
+
+    if precision == "float64":
+        P = modelo.matriz_csr()
+        P.sum_duplicates()
+        tipos = (np.float64, _tipo_indice(modelo.n), _tipo_indice(P.nnz))
+    else:
+        P = MatrizCompacta.desde(modelo.matriz_csr(), precision)
+        tipos = (PRECISIONES[precision], tipo_indices(modelo.n),
+                 tipo_punteros(P.nnz))
+    arreglos = {
+        "inicio": modelo.inicio.astype(np.int64),
+        "acciones": modelo.acciones.astype(np.int64),
+        "costos": modelo.costos.astype(tipos[0]),
+        "P_data": P.data.astype(tipos[0]),
+        "P_indices": P.indices.astype(tipos[1]),
+        "P_indptr": P.indptr.astype(tipos[2]),
+    }
+    for nombre, arr in arreglos.items():
+        np.save(os.path.join(ruta, nombre + ".npy"), arr)
+
+    cabecera = {
+        "formato": "pmd",
+        "version": VERSION,
+        "problema_tipo": modelo.problema_tipo,
+        "num_estados": modelo.n,
+        "num_decisiones": modelo.num_decisiones,
+        "num_pares": modelo.num_pares,
+        "nnz": int(P.nnz),
+        "precision": precision,
+    }
+    with open(os.path.join(ruta, CABECERA), "w", encoding="utf-8") as f:
+        json.dump(cabecera, f, indent=2, ensure_ascii=False)
+
+
+def leer_cabecera(ruta):
+    with open(os.path.join(ruta, CABECERA), encoding="utf-8") as f:
+        cabecera = json.load(f)
+    if cabecera.get("formato") != "pmd" or cabecera.get("version") != VERSION:
+        raise ValueError(f"{ruta} no es un modelo PMD versión {VERSION}.")
+    return cabecera
+
+
+def cargar_modelo(ruta, mmap=True, verificar=True):
+    """Abre un modelo guardado con `guardar_modelo` como ModeloPMD.
+
+    Con mmap=True los arreglos quedan mapeados en memoria (solo lectura)
+    y se cargan perezosamente; con mmap=False se leen completos. Con
+    verificar=False no se rechazan estados sin decisiones (para poder
+    pasarlo a `validar_modelo`). Los modelos guardados en float32 (o con
+    columnas uint16) se abren con P en MatrizCompacta.
+    """
+    cabecera = leer_cabecera(ruta)
+    modo = "r" if mmap else None
+    arr = {nombre: np.load(os.path.join(ruta, nombre + ".npy"), mmap_mode=modo)
+           for nombre in ARREGLOS}
+
+    n, pares = cabecera["num_estados"], cabecera["num_pares"]
+    if arr["inicio"].shape != (n + 1,) or arr["P_indptr"].shape != (pares + 1,):
+        raise ValueError(f"Arreglos de {ruta} inconsistentes con la cabecera.")
+    if arr["P_data"].dtype == np.float32 or arr["P_indices"].dtype == np.uint16:
+        P = MatrizCompacta(arr["P_data"], arr["P_indices"], arr["P_indptr"],
+                           (pares, n))
+    else:
+        P = sparse.csr_matrix((arr["P_data"], arr["P_indices"], arr["P_indptr"]),
+                              shape=(pares, n), copy=False)
+    return ModeloPMD(n, arr["inicio"], arr["acciones"], arr["costos"], P,
+                     problema_tipo=cabecera["problema_tipo"],
+                     num_decisiones=cabecera["num_decisiones"],
+                     verificar=verificar)
+
+
+def cargar_datos(ruta):
+    """Carga el modelo con la misma estructura que `leer_datos_manualmente`."""
+    return cargar_modelo(ruta, mmap=False).a_datos()
+
+
+def validar_modelo(datos, tol=1e-3):
+    """Validación vectorizada de un modelo (ModeloPMD o diccionario).
+
+    Devuelve un diccionario con los índices problemáticos (vacío si todo
+    está bien):
+      • "filas_suma_invalida"  : pares k cuya fila no suma 1 (± tol)
+      • "entradas_negativas"   : pares k con alguna probabilidad negativa
+      • "decisiones_invalidas" : pares k con decisión fuera de 1..m
+      • "decisiones_repetidas" : pares k que repiten decisión en su estado
+      • "estados_sin_decisiones": estados sin ninguna decisión viable
+
+    Para que el último caso llegue a reportarse, los modelos de disco
+    deben abrirse con `cargar_modelo(ruta, verificar=False)`.
+    """
+    if isinstance(datos, ModeloPMD):
+        modelo = datos
+    else:
+        modelo = ModeloPMD.desde_datos(datos, formato="disperso", verificar=False)
+    P = modelo.matriz_csr()
+    pares = modelo.num_pares
+
+    largo = np.diff(P.indptr)
+    sumas = np.zeros(pares)
+    con_datos = largo > 0
+    if P.nnz:
+        sumas[con_datos] = np.add.reduceat(P.data, P.indptr[:-1][con_datos])
+    negativas = np.zeros(pares, dtype=bool)
+    if P.nnz:
+        fila = np.repeat(np.arange(pares), largo)
+        negativas[fila[P.data < 0]] = True
+
+    acciones = np.asarray(modelo.acciones)
+    fuera = (acciones < 1) | (acciones > modelo.num_decisiones)
+    clave = modelo.estados * (modelo.num_decisiones + 1) + acciones
+    _, primera = np.unique(clave, return_index=True)
+    repetidas = np.ones(pares, dtype=bool)
+    repetidas[primera] = False
+
+    problemas = {
+        "filas_suma_invalida": np.flatnonzero(np.abs(sumas - 1.0) > tol),
+        "entradas_negativas": np.flatnonzero(negativas),
+        "decisiones_invalidas": np.flatnonzero(fuera),
+        "decisiones_repetidas": np.flatnonzero(repetidas),
+        "estados_sin_decisiones": np.flatnonzero(np.diff(modelo.inicio) == 0),
+    }
+    return {clave: idx for clave, idx in problemas.items() if idx.size}
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# algorithms/barrido.py
+
+"""
+Barrido de factores de descuento α.
+
+Para estudiar la sensibilidad de la política óptima a α no hace falta
+resolver cada α desde cero:
+
+  • `iterar_valores_alphas` hace aproximaciones sucesivas para todos los
+    α a la vez sobre una matriz V de (estados × α): cada barrido es un
+    solo producto P·V y una reducción segmentada por columnas. Las
+    columnas que ya convergieron salen del producto.
+  • `barrido_politicas` recorre los α en orden y arranca la iteración de
+    políticas de cada uno desde la política óptima del α vecino, que
+    suele diferir en pocos estados (pocas iteraciones y, con el
+    evaluador incremental, actualizaciones de rango bajo).
+  • `puntos_de_quiebre` localiza los intervalos de α donde cambia la
+    política óptima y, con `tol`, los refina por bisección.
+
+Criterio de paro de VI por columna: sp(V^{k+1} – V^k) < tol·(1–α)/α,
+como el criterio "span" de `aproximaciones.py`; se devuelve el punto
+medio de las cotas.
+"""
+
+import time
+import numpy as np
+from modelo import como_modelo
+from bellman import reducir
+from pol_mejoradas import iterar_politicas
+
+
+def _validar_alphas(alphas):
+    alphas = np.sort(np.asarray(alphas, dtype=float).ravel())
+    if alphas.size == 0 or alphas[0] < 0 or alphas[-1] >= 1:
+        raise ValueError("Los α deben cumplir 0 ≤ α < 1.")
+    return alphas
+
+
+def _argoptimo_columnas(modelo, Q, mejor):
+    """Primer par óptimo de cada estado para cada columna de Q."""
+    posiciones = np.where(Q == mejor[modelo.estados],
+                          np.arange(modelo.num_pares)[:, None], modelo.num_pares)
+    return np.minimum.reduceat(posiciones, modelo.inicio[:-1], axis=0)
+
+
+def _q_columnas(modelo, V, alphas):
+    return modelo.costos[:, None] + alphas * np.asarray(modelo.P @ V)
+
+
+def iterar_valores_alphas(datos, alphas, iter_max=100_000, tol=1e-8, V0=None):
+    """Aproximaciones sucesivas para varios α con una matriz de valores.
+
+    Devuelve un diccionario con alphas (ordenados), V (n × α, punto medio
+    de las cotas), la política codiciosa de cada α, iteraciones por α,
+    convergio por α y tiempo (s).
+    """
+    modelo = como_modelo(datos)
+    alphas = _validar_alphas(alphas)
+    n, A = modelo.n, alphas.size
+    V = np.zeros((n, A)) if V0 is None else np.array(V0, dtype=float)
+    with np.errstate(divide="ignore"):
+        umbral = np.where(alphas > 0, tol * (1 - alphas) / alphas, np.inf)
+    iteraciones = np.zeros(A, dtype=int)
+    convergio = np.zeros(A, dtype=bool)
+
+    t0 = time.perf_counter()
+    activas = np.arange(A)
+    for k in range(1, iter_max + 1):
+        Va = V[:, activas]
+        nueva = reducir(modelo, _q_columnas(modelo, Va, alphas[activas]))
+        d = nueva - Va
+        V[:, activas] = nueva
+        iteraciones[activas] = k
+        listas = d.max(axis=0) - d.min(axis=0) < umbral[activas]
+        convergio[activas[listas]] = True
+        activas = activas[~listas]
+        if activas.size == 0:
+            break
+    tiempo = time.perf_counter() - t0
+
+    # Cotas con un backup adicional (todas las columnas juntas)
+    Q = _q_columnas(modelo, V, alphas)
+    TV = reducir(modelo, Q)
+    d = TV - V
+    factor = alphas / (1 - alphas)
+    V = TV + 0.5 * factor * (d.min(axis=0) + d.max(axis=0))
+    k = _argoptimo_columnas(modelo, Q, TV)
+    politicas = [tuple(modelo.acciones[k[:, j]].tolist()) for j in range(A)]
+    return {
+        "alphas": alphas,
+        "V": V,
+        "politicas": politicas,
+        "iteraciones": iteraciones,
+        "convergio": convergio,
+        "tiempo": tiempo,
+    }
+
+
+def barrido_politicas(datos, alphas, pol0=None, iter_max=None, tol=None):
+    """Iteración de políticas para cada α, en orden y con arranque en caliente.
+
+    pol0 es la política inicial del α más pequeño (por defecto, la
+    primera decisión de cada estado). Con tol se refinan los puntos de
+    quiebre por bisección hasta intervalos de ancho < tol.
+
+    Devuelve un diccionario con alphas, V (n × α), politicas,
+    iteraciones por α, quiebres y tiempo (s).
+    """
+    modelo = como_modelo(datos)
+    alphas = _validar_alphas(alphas)
+    pol = (tuple(modelo.acciones[modelo.inicio[:-1]].tolist()) if pol0 is None
+           else tuple(pol0))
+
+    t0 = time.perf_counter()
+    V = np.empty((modelo.n, alphas.size))
+    politicas, iteraciones = [], []
+    for j, alpha in enumerate(alphas):
+        res = iterar_politicas(modelo, pol, alpha, iter_max=iter_max)
+        pol = res["politica"]
+        V[:, j] = res["v"]
+        politicas.append(pol)
+        iteraciones.append(res["iteraciones"])
+
+    quiebres = puntos_de_quiebre(modelo, alphas, politicas, tol, iter_max)
+    return {
+        "alphas": alphas,
+        "V": V,
+        "politicas": politicas,
+        "iteraciones": np.array(iteraciones),
+        "quiebres": quiebres,
+        "tiempo": time.perf_counter() - t0,
+    }
+
+
+def puntos_de_quiebre(datos, alphas, politicas, tol=None, iter_max=None):
+    """Intervalos (α_izq, α_der, política_izq, política_der) donde cambia
+    la política óptima.
+
+    Sin tol se reportan los α consecutivos de la malla. Con tol cada
+    intervalo se reduce por bisección (iteración de políticas arrancada
+    desde la política de la izquierda) hasta ancho < tol; si entre dos α
+    de la malla hay varios cambios, se localiza el primero.
+    """
+    modelo = como_modelo(datos)
+    quiebres = []
+    for j in range(len(alphas) - 1):
+        izq, der = politicas[j], politicas[j + 1]
+        if izq == der:
+            continue
+        a, b = float(alphas[j]), float(alphas[j + 1])
+        if tol is not None:
+            while b - a >= tol:
+                medio = 0.5 * (a + b)
+                pol = iterar_politicas(modelo, izq, medio,
+                                       iter_max=iter_max)["politica"]
+                if pol == izq:
+                    a = medio
+                else:
+                    b, der = medio, pol
+        quiebres.append((a, b, izq, der))
+    return quiebres
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# algorithms/bellman.py
+
+"""
+Motor vectorizado del operador de Bellman sobre un ModeloPMD.
+
+Todas las Q de una iteración salen de un único producto matriz-vector
+sobre la matriz apilada de pares estado-acción:
+
+  q_k = c_k + α · (P v)_k        para todo par k = (i, a)
+
+y la minimización (o maximización) por estado se hace con una reducción
+segmentada sobre los desplazamientos `inicio` del modelo:
+
+  v_i = min_{inicio[i] ≤ k < inicio[i+1]} q_k
+
+En caso de empate se elige la primera acción de D(i), igual que hacían
+los bucles `min(candidatos, key=candidatos.get)` de los métodos.
+
+`umbral_parada` y `medida_residuo` son los criterios de paro ("sup" y
+"span") que comparten las variantes de aproximaciones sucesivas.
+
+`EliminadorAcciones` aplica la prueba de MacQueen con descuento α: si
+L ≤ v* ≤ U, el par (i, a) no es óptimo cuando c_{i,a} + α P_a[i]·L > U_i
+(al minimizar). Con v* ≥ v + min d/(1–α), d = T'v – v, eso se reduce a
+
+  q_{i,a} – U_i > –α·min d/(1–α)
+
+con q = c + αPv. Los pares eliminados no vuelven a evaluarse: el
+operador T' restringido a los sobrevivientes tiene el mismo punto fijo
+v*, porque ningún par óptimo se elimina.
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+def q_valores(modelo, v, alpha=1.0):
+    """Vector de Q-valores c + α·P·v para todos los pares estado-acción."""
+    return modelo.costos + alpha * modelo.producto(v)
+
+
+def bloques_por_estado(modelo):
+    """Para barridos estado por estado: lista de (c_i, columnas_i, B_i).
+
+    q_i = c_i + α · B_i @ v[columnas_i], con B_i el bloque denso de las
+    filas del estado i restringido a las columnas no nulas. Evita pagar
+    el corte de la matriz dispersa en cada actualización.
+    """
+    bloques = []
+    for i in range(modelo.n):
+        ini, fin = modelo.inicio[i], modelo.inicio[i + 1]
+        filas = modelo.P[ini:fin]
+        if sparse.issparse(filas):
+            filas = sparse.csr_matrix(filas)
+            columnas = np.unique(filas.indices)
+            B = filas[:, columnas].toarray()
+        else:
+            columnas, B = slice(None), np.asarray(filas)
+        bloques.append((modelo.costos[ini:fin], columnas, B))
+    return bloques
+
+
+def reducir(modelo, q):
+    """Reducción segmentada: mejor valor por estado (min o max)."""
+    ufunc = np.maximum if modelo.maximizar else np.minimum
+    return ufunc.reduceat(q, modelo.inicio[:-1])
+
+
+def argoptimo(modelo, q, mejor=None):
+    """Índice k del primer par óptimo de cada estado (empates: primer a)."""
+    if mejor is None:
+        mejor = reducir(modelo, q)
+    posiciones = np.where(q == mejor[modelo.estados],
+                          np.arange(modelo.num_pares), modelo.num_pares)
+    return np.minimum.reduceat(posiciones, modelo.inicio[:-1])
+
+
+def backup(modelo, v, alpha=1.0):
+    """Una aplicación del operador de Bellman: devuelve T·v."""
+    return reducir(modelo, q_valores(modelo, v, alpha))
+
+
+def politica_greedy(modelo, v, alpha=1.0):
+    """Política codiciosa respecto a v como tupla de decisiones."""
+    k = argoptimo(modelo, q_valores(modelo, v, alpha))
+    return tuple(modelo.acciones[k].tolist())
+
+
+def umbral_parada(criterio, tol, alpha):
+    """Umbral sobre la medida de la diferencia v_{k+1} – v_k según el
+    criterio de paro ("sup" o "span")."""
+    if criterio == "sup":
+        return tol
+    if criterio == "span":
+        return np.inf if alpha == 0 else tol * (1 - alpha) / alpha
+    raise ValueError(f"Criterio de paro desconocido: {criterio}")
+
+
+def medida_residuo(criterio, d):
+    """‖d‖_∞ o sp(d) = max d – min d."""
+    if criterio == "sup":
+        return float(np.max(np.abs(d)))
+    return float(np.max(d) - np.min(d))
+
+
+# Holgura relativa de la prueba de eliminación (redondeo de q)
+TOL_ELIMINACION = 1e-12
+# Se reconstruye el submodelo cuando los eliminados pendientes superan
+# esta fracción de los pares vivos; mientras tanto solo se enmascaran
+FRACCION_RECONSTRUIR = 0.05
+
+
+class EliminadorAcciones:
+    """Pares vivos de un modelo durante la eliminación de acciones.
+
+    `modelo` es siempre el submodelo con los pares que siguen vivos (más
+    algunos ya eliminados que se enmascaran con ±inf hasta la siguiente
+    reconstrucción).
+    """
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.eliminados = 0
+        self._muertos = np.zeros(modelo.num_pares, dtype=bool)
+        self._peor = -np.inf if modelo.maximizar else np.inf
+
+    @property
+    def vivos(self):
+        return self.modelo.num_pares - int(self._muertos.sum())
+
+    def q_valores(self, v, alpha):
+        """q = c + αPv sobre los pares vivos (±inf en los enmascarados)."""
+        q = q_valores(self.modelo, v, alpha)
+        q[self._muertos] = self._peor
+        return q
+
+    def eliminar(self, q, cota, holgura):
+        """Elimina los pares con q peor que cota_i por más de `holgura`.
+
+        cota es la cota de v* del lado del óptimo (U al minimizar, L al
+        maximizar). Devuelve cuántos pares se eliminaron.
+        """
+        ref = cota[self.modelo.estados]
+        brecha = ref - q if self.modelo.maximizar else q - ref
+        fuera = brecha > holgura + TOL_ELIMINACION * (1.0 + np.abs(ref))
+        fuera &= ~self._muertos
+        nuevos = int(fuera.sum())
+        if nuevos:
+            self._muertos |= fuera
+            self.eliminados += nuevos
+            if self._muertos.sum() >= FRACCION_RECONSTRUIR * self.modelo.num_pares:
+                self.modelo = self.modelo.submodelo(np.flatnonzero(~self._muertos))
+                self._muertos = np.zeros(self.modelo.num_pares, dtype=bool)
+        return nuevos
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# algorithms/benchmark.py
+
+"""
+Banco de pruebas de desempeño de los cinco métodos.
+
+Para cada generador de `generadores.py` y cada tamaño (n, m) se corre,
+sin pantalla ni input():
+
+  • enumeracion : `enumerar_politicas` (solo si hay ≤ MAX_POLITICAS_ENUM)
+  • lp          : LP de costo medio con HiGHS
+  • pi          : mejoramiento de políticas sin descuento
+  • pi_desc     : mejoramiento de políticas con descuento α
+  • vi          : aproximaciones sucesivas con descuento α
+
+y se registra tiempo de pared, memoria pico (tracemalloc, en una segunda
+corrida para no inflar el tiempo), iteraciones y valor óptimo: g* para
+los tres primeros y Σ v*_i para los descontados. Después se comprueba
+que los métodos coinciden (g* entre sí, v* de pi_desc dentro de las
+cotas de vi) y todo se guarda en JSON.
+
+Uso:
+    python benchmark.py --generadores aleatorio cola --estados 50 200 \\
+        --acciones 3 --alpha 0.95 --salida resultados.json
+    python benchmark.py ... --comparar resultados_anteriores.json
+"""
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import scipy
+from generadores import GENERADORES
+from modelo import como_modelo
+from enumeration import enumerar_politicas
+from pro_lineal import resolver_lp_highs, politica_de_lp
+from traza import Traza
+from aproximaciones import iterar_valores
+from pol_mejoradas import iterar_politicas
+
+MAX_POLITICAS_ENUM = 100_000
+ITER_MAX_PI = 1000
+ITER_MAX_VI = 100_000
+TOL_VI = 1e-8
+# Diferencia relativa admitida entre métodos; supone el LP resuelto con
+# pro_lineal.TOL_HIGHS (con las tolerancias por omisión de HiGHS, g* trae
+# errores de hasta ~3e-6)
+TOL_ACUERDO = 1e-6
+METODOS = ("enumeracion", "lp", "pi", "pi_desc", "vi")
+
+
+# ----------------------------------------------------------------------
+# Métodos sin interacción
+# ----------------------------------------------------------------------
+def _enumeracion(modelo, alpha):
+    mejores, stats = enumerar_politicas(modelo, k=1)
+    pol, _, g = mejores[0]
+    return {"valor": g, "iteraciones": stats["evaluadas"], "politica": pol}
+
+
+class _Iteraciones(Traza):
+    """Guarda las iteraciones que reporta el método al terminar."""
+
+    iteraciones = None
+
+    def fin(self, resumen):
+        self.iteraciones = resumen.get("iteraciones")
+
+
+def _lp(modelo, alpha):
+    traza = _Iteraciones()
+    y, _ = resolver_lp_highs(modelo, traza)
+    pol, _, g = politica_de_lp(modelo, y)
+    return {"valor": g, "iteraciones": traza.iteraciones, "politica": pol}
+
+
+def _pi(modelo, alpha):
+    pol = modelo.acciones[modelo.inicio[:-1]].tolist()
+    res = iterar_politicas(modelo, pol, iter_max=ITER_MAX_PI)
+    return {"valor": float(res["g"]), "iteraciones": res["iteraciones"],
+            "politica": res["politica"]}
+
+
+def _pi_desc(modelo, alpha):
+    pol = modelo.acciones[modelo.inicio[:-1]].tolist()
+    res = iterar_politicas(modelo, pol, alpha, iter_max=ITER_MAX_PI)
+    return {"valor": float(res["v"].sum()), "iteraciones": res["iteraciones"],
+            "politica": res["politica"], "v": res["v"]}
+
+
+def _vi(modelo, alpha):
+    res = iterar_valores(modelo, alpha, ITER_MAX_VI, TOL_VI, criterio="span")
+    return {"valor": float(res["v"].sum()), "iteraciones": res["iteraciones"],
+            "politica": res["politica"], "v": res["v"],
+            "cotas": (res["cota_inferior"], res["cota_superior"])}
+
+
+SOLVERS = {"enumeracion": _enumeracion, "lp": _lp, "pi": _pi,
+           "pi_desc": _pi_desc, "vi": _vi}
+
+
+# ----------------------------------------------------------------------
+# Medición
+# ----------------------------------------------------------------------
+def medir(solver, modelo, alpha, memoria=True):
+    """Corre `solver` y devuelve su resultado con tiempo y memoria pico."""
+    t0 = time.perf_counter()
+    res = solver(modelo, alpha)
+    res["tiempo"] = time.perf_counter() - t0
+    res["memoria_pico"] = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            solver(modelo, alpha)
+            res["memoria_pico"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return res
+
+
+def _num_politicas(modelo):
+    return int(np.prod(np.diff(modelo.inicio), dtype=object))
+
+
+def verificar_acuerdo(resultados):
+    """Diferencias entre métodos; devuelve (coinciden, detalle)."""
+    detalle = {}
+    medios = [r["valor"] for nombre, r in resultados.items()
+              if nombre in ("enumeracion", "lp", "pi") and "valor" in r]
+    if len(medios) > 1:
+        escala = 1.0 + max(abs(g) for g in medios)
+        detalle["g"] = (max(medios) - min(medios)) / escala
+    if "pi_desc" in resultados and "vi" in resultados:
+        v = resultados["pi_desc"]["v"]
+        inferior, superior = resultados["vi"]["cotas"]
+        fuera = np.maximum(inferior - v, v - superior).max()
+        detalle["v"] = float(max(0.0, fuera) / (1.0 + np.abs(v).max()))
+    coinciden = all(d <= TOL_ACUERDO for d in detalle.values())
+    return coinciden, detalle
+
+
+def correr_caso(generador, n, m, semilla=0, alpha=0.95, metodos=METODOS,
+                memoria=True):
+    """Genera el modelo, corre los métodos pedidos y verifica el acuerdo."""
+    modelo = como_modelo(GENERADORES[generador](n, m, semilla=semilla))
+    caso = {
+        "generador": generador, "n": n, "m": m, "semilla": semilla,
+        "alpha": alpha, "pares": modelo.num_pares,
+        "nnz": int(modelo.P.nnz if modelo.es_disperso
+                   else np.count_nonzero(modelo.P)),
+        "resultados": {},
+    }
+    for nombre in metodos:
+        if nombre == "enumeracion" and _num_politicas(modelo) > MAX_POLITICAS_ENUM:
+            caso["resultados"][nombre] = {"omitido": "demasiadas políticas"}
+            continue
+        caso["resultados"][nombre] = medir(SOLVERS[nombre], modelo, alpha, memoria)
+
+    validos = {k: r for k, r in caso["resultados"].items() if "omitido" not in r}
+    caso["coinciden"], caso["discrepancia"] = verificar_acuerdo(validos)
+    for r in validos.values():
+        r.pop("v", None)
+        r.pop("cotas", None)
+        r.pop("politica", None)
+    return caso
+
+
+def correr(generadores, estados, acciones, semilla=0, alpha=0.95,
+           metodos=METODOS, memoria=True, al_terminar=None):
+    """Corre todos los casos y devuelve el documento que se guarda en JSON."""
+    casos = []
+    for generador in generadores:
+        for n in estados:
+            for m in acciones:
+                caso = correr_caso(generador, n, m, semilla, alpha, metodos,
+                                   memoria)
+                casos.append(caso)
+                if al_terminar:
+                    al_terminar(caso)
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "plataforma": platform.platform(),
+        "casos": casos,
+    }
+
+
+def comparar(anterior, actual, factor=1.2, minimo=0.01):
+    """Casos/métodos cuyo tiempo creció más de `factor` veces (y más de
+    `minimo` segundos, para no reportar ruido) o cuyo valor óptimo
+    cambió. Devuelve una lista de líneas de texto.
+    """
+    clave = lambda c: (c["generador"], c["n"], c["m"], c["semilla"], c["alpha"])
+    previos = {clave(c): c for c in anterior["casos"]}
+    avisos = []
+    for caso in actual["casos"]:
+        previo = previos.get(clave(caso))
+        if previo is None:
+            continue
+        for nombre, r in caso["resultados"].items():
+            p = previo["resultados"].get(nombre, {})
+            if "tiempo" not in r or "tiempo" not in p:
+                continue
+            nombre_caso = f"{caso['generador']} n={caso['n']} m={caso['m']} {nombre}"
+            if r["tiempo"] > max(factor * p["tiempo"], p["tiempo"] + minimo):
+                avisos.append(f"{nombre_caso}: {p['tiempo']:.4f} s → {r['tiempo']:.4f} s")
+            if abs(r["valor"] - p["valor"]) > TOL_ACUERDO * (1 + abs(p["valor"])):
+                avisos.append(f"{nombre_caso}: valor {p['valor']:.6f} → {r['valor']:.6f}")
+    return avisos
+
+
+def _imprimir_caso(caso):
+    print(f"\n{caso['generador']}  n={caso['n']}  m={caso['m']}  "
+          f"pares={caso['pares']}  nnz={caso['nnz']}")
+    for nombre, r in caso["resultados"].items():
+        if "omitido" in r:
+            print(f"  {nombre:<12} omitido ({r['omitido']})")
+            continue
+        memoria = ("" if r["memoria_pico"] is None
+                   else f"  {r['memoria_pico'] / 2**20:8.2f} MiB")
+        print(f"  {nombre:<12} {r['tiempo']:9.4f} s{memoria}  "
+              f"{r['iteraciones']:>8} it  valor = {r['valor']:.6f}")
+    print("  Coinciden" if caso["coinciden"]
+          else f"  NO coinciden: {caso['discrepancia']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas de métodos PMD")
+    parser.add_argument("--generadores", nargs="+", default=list(GENERADORES),
+                        choices=list(GENERADORES))
+    parser.add_argument("--estados", nargs="+", type=int, default=[10, 100])
+    parser.add_argument("--acciones", nargs="+", type=int, default=[3])
+    parser.add_argument("--metodos", nargs="+", default=list(METODOS),
+                        choices=list(METODOS))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=0.95)
+    parser.add_argument("--sin-memoria", action="store_true",
+                        help="no medir memoria pico (una sola corrida)")
+    parser.add_argument("--salida", default="benchmark.json")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    doc = correr(args.generadores, args.estados, args.acciones, args.semilla,
+                 args.alpha, args.metodos, not args.sin_memoria,
+                 al_terminar=_imprimir_caso)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            avisos = comparar(json.load(f), doc)
+        print(f"\nCambios respecto a {args.comparar}:" if avisos
+              else f"\nSin regresiones respecto a {args.comparar}.")
+        for aviso in avisos:
+            print(" ", aviso)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# algorithms/checkpoint.py
+
+"""
+Puntos de control (checkpoints) para corridas largas de VI, PI y RVI.
+
+`TrazaCheckpoint` es una traza (ver `traza.py`): recibe los eventos de
+iteración de los motores y, cada `intervalo` iteraciones o cada
+`intervalo_s` segundos, escribe en un solo archivo el vector de valores,
+la política actual, el contador de iteraciones y la historia de
+residuos. Se combina con otras trazas mediante TrazaMultiple.
+
+Formato del archivo:
+
+    MAGIA (8 bytes) | largo de la cabecera (uint64) | cabecera JSON
+    | arreglos alineados a 64 bytes (v, politica, residuos)
+
+La cabecera guarda método, iteración, parámetros, tiempo, si la corrida
+terminó y la posición, tipo y forma de cada arreglo. `cargar_checkpoint`
+los abre con np.memmap, sin leerlos completos. Cada escritura va a
+`ruta.tmp`, se sincroniza a disco y reemplaza al archivo anterior con
+os.replace: si el proceso muere a mitad de una escritura queda intacto
+el checkpoint previo.
+
+`resolver_reanudable` corre un método de `api` con checkpoints y, si ya
+existe uno del mismo método, continúa desde ahí (v0, pol0 o h0 y la
+cuenta de iteraciones). `arranque_en_caliente` toma una solución previa
+(checkpoint o resultado de `api`) de un modelo parecido —mismos estados,
+otros costos o probabilidades— y la adapta como punto de partida.
+"""
+
+import json
+import os
+import time
+import numpy as np
+from modelo import como_modelo
+from bellman import politica_greedy
+from traza import Traza, TrazaMultiple
+from api import resolver
+
+MAGIA = b"PMDCKPT1"
+ALINEACION = 64
+# Parámetro de arranque de cada método de `api` que admite reanudación
+ARRANQUES = {"vi": "v0", "pi": "pol0", "pi_desc": "pol0", "rvi": "h0"}
+
+
+def _alinear(x):
+    return -(-x // ALINEACION) * ALINEACION
+
+
+def _a_json(x):
+    if isinstance(x, np.generic):
+        return x.item()
+    if isinstance(x, (np.ndarray, tuple)):
+        return list(x)
+    return str(x)
+
+
+def guardar_checkpoint(ruta, cabecera, arreglos):
+    """Escribe cabecera y arreglos en `ruta` de forma atómica."""
+    arreglos = {k: np.ascontiguousarray(a) for k, a in arreglos.items()
+                if a is not None}
+    # Las posiciones dependen del largo de la cabecera y viceversa: se
+    # repite hasta que la cabecera quepa antes del primer arreglo
+    inicio = ALINEACION
+    while True:
+        offset, indice = inicio, []
+        for nombre, a in arreglos.items():
+            indice.append({"nombre": nombre, "dtype": a.dtype.str,
+                           "forma": list(a.shape), "offset": offset})
+            offset = _alinear(offset + a.nbytes)
+        texto = json.dumps(dict(cabecera, arreglos=indice), default=_a_json,
+                           ensure_ascii=False).encode()
+        if len(MAGIA) + 8 + len(texto) <= inicio:
+            break
+        inicio = _alinear(len(MAGIA) + 8 + len(texto))
+
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIA)
+        f.write(np.uint64(len(texto)).tobytes())
+        f.write(texto)
+        for info, a in zip(indice, arreglos.values()):
+            f.seek(info["offset"])
+            a.tofile(f)
+        f.truncate(offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, ruta)
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directorio, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def cargar_checkpoint(ruta, mmap=True):
+    """Cabecera del checkpoint con sus arreglos (memmap de solo lectura
+    con mmap=True; copias en memoria si no)."""
+    with open(ruta, "rb") as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es un checkpoint PMD.")
+        largo = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        cabecera = json.loads(f.read(largo).decode())
+    for info in cabecera.pop("arreglos"):
+        forma = tuple(info["forma"])
+        if int(np.prod(forma)) == 0:
+            a = np.empty(forma, dtype=info["dtype"])
+        else:
+            a = np.memmap(ruta, dtype=info["dtype"], mode="r",
+                          offset=info["offset"], shape=forma)
+            if not mmap:
+                a = np.array(a)
+        cabecera[info["nombre"]] = a
+    return cabecera
+
+
+class TrazaCheckpoint(Traza):
+    """Traza que guarda checkpoints periódicos en `ruta`.
+
+    intervalo: cada cuántas iteraciones (None: solo por tiempo y al
+    final). intervalo_s: además, si pasaron tantos segundos desde el
+    último. Con reanudar=True y un checkpoint existente, las iteraciones
+    y los residuos continúan su cuenta (ver `base`). Con `modelo`, en los
+    métodos que no reportan la política (VI) se guarda la codiciosa.
+    """
+
+    valores = True
+
+    def __init__(self, ruta, intervalo=100, intervalo_s=None, reanudar=True,
+                 modelo=None):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.intervalo_s = intervalo_s
+        self.modelo = modelo
+        self.previo = None
+        self.base = 0
+        self.escrituras = 0
+        self._residuos = []
+        if reanudar and os.path.exists(ruta):
+            self.previo = cargar_checkpoint(ruta, mmap=False)
+            self.base = int(self.previo["iteracion"])
+            self._residuos = self.previo["residuos"].tolist()
+        self._metodo = None
+        self._parametros = {}
+        self._ultimo = None
+        self._t_guardado = time.perf_counter()
+
+    def inicio(self, metodo, parametros):
+        if self.previo is not None and self.previo["metodo"] != metodo:
+            raise ValueError(f"El checkpoint {self.ruta} es de "
+                             f"{self.previo['metodo']}, no de {metodo}.")
+        self._metodo = metodo
+        self._parametros = parametros
+        self._t0 = time.perf_counter()
+
+    def iteracion(self, evento):
+        self._ultimo = evento
+        self._residuos.append(np.nan if evento.get("residuo") is None
+                              else float(evento["residuo"]))
+        k = evento["iteracion"]
+        por_iteracion = self.intervalo is not None and k % self.intervalo == 0
+        por_tiempo = (self.intervalo_s is not None and
+                      time.perf_counter() - self._t_guardado >= self.intervalo_s)
+        if por_iteracion or por_tiempo:
+            self.guardar(completo=False)
+
+    def fin(self, resumen):
+        if self._ultimo is not None:
+            self.guardar(completo=True, convergio=resumen.get("convergio"))
+
+    def guardar(self, completo=False, convergio=None):
+        evento = self._ultimo
+        v = evento.get("valores")
+        politica = evento.get("politica")
+        if politica is None and v is not None and self.modelo is not None \
+                and "alpha" in self._parametros:
+            politica = politica_greedy(self.modelo, v, self._parametros["alpha"])
+        cabecera = {
+            "metodo": self._metodo,
+            "iteracion": self.base + evento["iteracion"],
+            "parametros": {k: p for k, p in self._parametros.items()
+                           if np.isscalar(p) or p is None},
+            "tiempo": time.perf_counter() - self._t0,
+            "guardado": time.time(),
+            "completo": completo,
+            "convergio": convergio,
+        }
+        guardar_checkpoint(self.ruta, cabecera, {
+            "v": None if v is None else np.asarray(v, dtype=np.float64),
+            "politica": None if politica is None else np.asarray(politica, dtype=np.int32),
+            "residuos": np.asarray(self._residuos, dtype=np.float64),
+        })
+        self.escrituras += 1
+        self._t_guardado = time.perf_counter()
+
+
+# ----------------------------------------------------------------------
+# Reanudación y arranque en caliente
+# ----------------------------------------------------------------------
+def arranque_en_caliente(fuente, datos, alpha=None):
+    """Punto de partida para `datos` a partir de una solución previa.
+
+    fuente: ruta de un checkpoint o un resultado de `api`. Devuelve
+    {"v0", "pol0"}: los valores tal cual y la política previa, donde en
+    cada estado cuya decisión ya no es viable se toma la codiciosa
+    respecto a v (con alpha) o la primera viable.
+    """
+    modelo = como_modelo(datos)
+    if isinstance(fuente, (str, os.PathLike)):
+        previo = cargar_checkpoint(os.fspath(fuente), mmap=False)
+        v, pol = previo.get("v"), previo.get("politica")
+    else:
+        v, pol = getattr(fuente, "v", None), getattr(fuente, "politica", None)
+    if v is not None:
+        v = np.array(v, dtype=np.float64)
+        if v.shape != (modelo.n,):
+            raise ValueError(f"La solución previa tiene {v.size} estados, "
+                             f"el modelo {modelo.n}.")
+    if pol is not None:
+        pol = np.array(pol, dtype=np.int64)
+        if pol.shape != (modelo.n,):
+            raise ValueError(f"La política previa tiene {pol.size} estados, "
+                             f"el modelo {modelo.n}.")
+        tabla = modelo.tabla_indices()
+        en_rango = (pol >= 0) & (pol <= modelo.num_decisiones)
+        viable = en_rango.copy()
+        viable[en_rango] = tabla[np.flatnonzero(en_rango), pol[en_rango]] >= 0
+        if not viable.all():
+            if v is not None and alpha is not None:
+                respaldo = np.array(politica_greedy(modelo, v, alpha))
+            else:
+                respaldo = modelo.acciones[modelo.inicio[:-1]]
+            pol = np.where(viable, pol, respaldo)
+        pol = tuple(pol.tolist())
+    return {"v0": v, "pol0": pol}
+
+
+def resolver_reanudable(datos, metodo, ruta, intervalo=100, intervalo_s=None,
+                        traza=None, **parametros):
+    """`api.resolver` con checkpoints en `ruta`, continuando si ya hay uno.
+
+    Si el checkpoint existente terminó (completo), se devuelve a correr
+    desde su solución, lo que normalmente converge en una iteración.
+    El resultado trae iteraciones totales (las previas más las nuevas).
+    """
+    if metodo not in ARRANQUES:
+        raise ValueError(f"El método {metodo} no admite reanudación.")
+    modelo = como_modelo(datos)
+    ck = TrazaCheckpoint(ruta, intervalo, intervalo_s, modelo=modelo)
+    arranque = ARRANQUES[metodo]
+    if ck.previo is not None and parametros.get(arranque) is None:
+        previo = ck.previo
+        if arranque == "pol0":
+            if previo.get("politica") is not None:
+                parametros["pol0"] = tuple(previo["politica"].tolist())
+        elif previo.get("v") is not None:
+            if previo["v"].shape != (modelo.n,):
+                raise ValueError(f"El checkpoint {ruta} es de otro modelo.")
+            parametros[arranque] = previo["v"]
+    res = resolver(modelo, metodo, traza=TrazaMultiple(ck, traza) if traza else ck,
+                   **parametros)
+    if res.iteraciones is not None:
+        res.iteraciones += ck.base
+    return res
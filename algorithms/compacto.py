@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# algorithms/compacto.py
+
+"""
+Almacenamiento compacto de la matriz de transición.
+
+`MatrizCompacta` guarda P (pares × estados) en CSR con tipos reducidos:
+
+  • data    : float32 (o float64)
+  • indices : uint16 si n ≤ 65 536, si no int32
+  • indptr  : int32 si nnz < 2³¹, si no int64
+
+scipy no admite índices uint16 y, con datos float32 y un vector float64,
+convierte la matriz entera a float64 en cada producto. Por eso el
+producto P @ x se hace aquí, por tramos de filas de a lo más TAM_TRAMO
+no nulos: el producto elemento a elemento data·x[indices] ya sale en
+float64 y la suma por fila (np.add.reduceat) se acumula en float64, sin
+copiar nunca la matriz completa.
+
+La matriz implementa lo que usan los motores de una matriz dispersa:
+shape, nnz, P @ x (vector o matriz), selección de filas P[k], P[a:b] y
+P[idx] (devuelven csr_matrix float64, pequeñas), getrow, toarray y tocsr.
+
+En float32 las filas suman 1 solo hasta ~3e-8. Para los métodos
+iterativos da igual, pero las n+1 igualdades de flujo del LP quedan
+levemente inconsistentes y el solver termina "óptimo" en un vértice
+equivocado. Por eso, al pasar filas a float64 (selección, getrow, tocsr
+y, con ellas, ModeloPMD.matriz_csr y fila) cada fila se reescala para
+sumar 1 en float64.
+
+`compactar` devuelve un ModeloPMD con esta matriz (y costos float32 si
+se pide), que sirve tal cual para todos los métodos; `archivo.py` puede
+guardarlo y abrirlo con memory-map sin perder los tipos reducidos.
+`reporte_memoria` compara los bytes de cada modo de almacenamiento y
+`verificar_precision` mide el error de las soluciones (VI y LP) con el
+modelo compacto respecto al de float64.
+"""
+
+import sys
+import numpy as np
+from scipy import sparse
+from modelo import ModeloPMD, como_modelo
+from aproximaciones import iterar_valores
+from pro_lineal import resolver_lp_highs, politica_de_lp
+
+# No nulos por tramo en el producto (limita los temporales float64)
+TAM_TRAMO = 1 << 20
+PRECISIONES = {"float32": np.float32, "float64": np.float64}
+
+
+def tipo_indices(n):
+    """uint16 si caben las columnas, si no int32 (o int64)."""
+    if n <= np.iinfo(np.uint16).max + 1:
+        return np.uint16
+    return np.int32 if n <= np.iinfo(np.int32).max else np.int64
+
+
+def tipo_punteros(nnz):
+    return np.int32 if nnz <= np.iinfo(np.int32).max else np.int64
+
+
+class MatrizCompacta:
+    """CSR con datos float32/float64 e índices uint16/int32."""
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = (int(shape[0]), int(shape[1]))
+        if indptr.shape != (self.shape[0] + 1,) or data.shape != indices.shape:
+            raise ValueError("Arreglos CSR inconsistentes.")
+        # Límites de los tramos de filas del producto
+        self._tramos = np.unique(np.append(
+            np.searchsorted(indptr, np.arange(0, self.nnz, TAM_TRAMO),
+                            side="right") - 1,
+            self.shape[0]))
+        self._tramos[0] = 0
+
+    @classmethod
+    def desde(cls, P, precision="float32"):
+        """Compacta una matriz densa o dispersa de scipy."""
+        if precision not in PRECISIONES:
+            raise ValueError(f"Precisión desconocida: {precision}")
+        P = sparse.csr_matrix(P)
+        P.sum_duplicates()
+        P.eliminate_zeros()
+        return cls(P.data.astype(PRECISIONES[precision]),
+                   P.indices.astype(tipo_indices(P.shape[1])),
+                   P.indptr.astype(tipo_punteros(P.nnz)), P.shape)
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def memoria(self):
+        """Bytes de los tres arreglos."""
+        return self.data.nbytes + self.indices.nbytes + self.indptr.nbytes
+
+    # ------------------------------------------------------------------
+    # Producto
+    # ------------------------------------------------------------------
+    def __matmul__(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        salida = np.zeros((self.shape[0],) + x.shape[1:])
+        for r0, r1 in zip(self._tramos[:-1], self._tramos[1:]):
+            p0, p1 = int(self.indptr[r0]), int(self.indptr[r1])
+            if p0 == p1:
+                continue
+            datos = self.data[p0:p1]
+            if x.ndim > 1:
+                datos = datos[:, None]
+            producto = x[self.indices[p0:p1]] * datos       # float64
+            inicios = self.indptr[r0:r1] - p0
+            llenas = self.indptr[r0 + 1:r1 + 1] > self.indptr[r0:r1]
+            salida[r0:r1][llenas] = np.add.reduceat(
+                producto, inicios[llenas], axis=0)
+        return salida
+
+    # ------------------------------------------------------------------
+    # Filas y conversiones
+    # ------------------------------------------------------------------
+    def _a_float64(self, data, largos):
+        """data en float64; si estaba en float32, con cada fila (de
+        `largos` no nulos) reescalada para sumar 1."""
+        data = data.astype(np.float64)
+        if self.dtype == np.float64:
+            return data
+        fila = np.repeat(np.arange(largos.size), largos)
+        sumas = np.bincount(fila, weights=data, minlength=largos.size)
+        sumas[sumas == 0] = 1.0
+        return data / sumas[fila]
+
+    def _filas(self, filas):
+        """csr_matrix float64 con las filas indicadas (en ese orden)."""
+        filas = np.asarray(filas, dtype=np.int64)
+        ini, fin = self.indptr[filas], self.indptr[filas + 1]
+        largos = (fin - ini).astype(np.int64)
+        indptr = np.zeros(filas.size + 1, dtype=np.int64)
+        np.cumsum(largos, out=indptr[1:])
+        pos = np.repeat(ini.astype(np.int64) - indptr[:-1], largos) \
+            + np.arange(indptr[-1])
+        return sparse.csr_matrix(
+            (self._a_float64(self.data[pos], largos),
+             self.indices[pos].astype(np.int32), indptr),
+            shape=(filas.size, self.shape[1]))
+
+    def __getitem__(self, clave):
+        if isinstance(clave, slice):
+            return self._filas(np.arange(self.shape[0])[clave])
+        if np.isscalar(clave):
+            return self._filas([clave])
+        return self._filas(clave)
+
+    def getrow(self, k):
+        return self._filas([k])
+
+    def tocsr(self, reescalar=True):
+        """csr_matrix float64; reescalar=False deja los datos tal cual
+        (para volver a compactar sin redondear dos veces)."""
+        indptr = self.indptr.astype(np.int64)
+        data = (self._a_float64(self.data, np.diff(indptr)) if reescalar
+                else self.data.astype(np.float64))
+        return sparse.csr_matrix(
+            (data, self.indices.astype(np.int32), indptr), shape=self.shape)
+
+    def toarray(self):
+        return self.tocsr().toarray()
+
+
+def compactar(datos, precision="float32"):
+    """ModeloPMD con P en MatrizCompacta y costos en `precision`."""
+    modelo = como_modelo(datos)
+    if precision not in PRECISIONES:
+        raise ValueError(f"Precisión desconocida: {precision}")
+    return ModeloPMD(modelo.n, modelo.inicio, modelo.acciones,
+                     modelo.costos.astype(PRECISIONES[precision]),
+                     MatrizCompacta.desde(modelo.matriz_csr(), precision),
+                     problema_tipo=modelo.problema_tipo,
+                     num_decisiones=modelo.num_decisiones)
+
+
+# ----------------------------------------------------------------------
+# Reporte de memoria y verificación de precisión
+# ----------------------------------------------------------------------
+def _tamano_objeto(x, vistos=None):
+    """Bytes de un objeto de Python con todo lo que contiene."""
+    vistos = set() if vistos is None else vistos
+    if id(x) in vistos:
+        return 0
+    vistos.add(id(x))
+    tam = sys.getsizeof(x)
+    if isinstance(x, dict):
+        tam += sum(_tamano_objeto(k, vistos) + _tamano_objeto(v, vistos)
+                   for k, v in x.items())
+    elif isinstance(x, (list, tuple)):
+        tam += sum(_tamano_objeto(v, vistos) for v in x)
+    return tam
+
+
+def reporte_memoria(datos):
+    """Bytes del modelo en cada modo de almacenamiento.
+
+    Si `datos` es el diccionario de `read.py` se incluye su tamaño real
+    como objetos de Python. Devuelve {modo: bytes}.
+    """
+    modelo = como_modelo(datos)
+    P = modelo.matriz_csr()
+    pares, n, nnz = modelo.num_pares, modelo.n, P.nnz
+    indice = np.dtype(tipo_indices(n)).itemsize
+    puntero = np.dtype(tipo_punteros(nnz)).itemsize
+    base = modelo.inicio.nbytes + modelo.acciones.nbytes
+    reporte = {}
+    if isinstance(datos, dict):
+        reporte["dict read.py"] = _tamano_objeto(datos)
+    reporte.update({
+        "densa float64": base + pares * 8 + pares * n * 8,
+        "csr float64/int32": base + pares * 8 + nnz * (8 + 4) + (pares + 1) * 8,
+        "compacta float64": base + pares * 8 + nnz * (8 + indice) + (pares + 1) * puntero,
+        "compacta float32": base + pares * 4 + nnz * (4 + indice) + (pares + 1) * puntero,
+    })
+    return reporte
+
+
+def verificar_precision(datos, precision="float32", alpha=0.95, tol=1e-10):
+    """Compara el modelo float64 con el compacto: VI con descuento α y el
+    LP de costo medio (HiGHS).
+
+    Devuelve el error máximo absoluto y relativo en v*, si coinciden las
+    políticas de VI y los estados donde difieren, y para el LP la g* de
+    cada modelo, su error relativo y si coinciden sus políticas.
+    """
+    modelo = como_modelo(datos)
+    compacto = compactar(modelo, precision)
+    exacto = iterar_valores(modelo, alpha, 1_000_000, tol, criterio="span")
+    aprox = iterar_valores(compacto, alpha, 1_000_000, tol, criterio="span")
+    error = np.abs(exacto["v"] - aprox["v"])
+    difieren = [i for i, (a, b) in enumerate(zip(exacto["politica"],
+                                                 aprox["politica"])) if a != b]
+    lp = {}
+    for nombre, m in (("exacto", modelo), ("compacto", compacto)):
+        y, _ = resolver_lp_highs(m)
+        lp[nombre] = politica_de_lp(m, y)
+    g, g_compacto = lp["exacto"][2], lp["compacto"][2]
+    return {
+        "error_v": float(error.max()),
+        "error_relativo": float(error.max() / max(np.abs(exacto["v"]).max(), 1e-300)),
+        "misma_politica": not difieren,
+        "estados_distintos": difieren,
+        "g_lp": g,
+        "g_lp_compacto": g_compacto,
+        "error_relativo_lp": abs(g - g_compacto) / max(abs(g), 1e-300),
+        "misma_politica_lp": lp["exacto"][0] == lp["compacto"][0],
+    }
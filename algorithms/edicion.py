@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# algorithms/edicion.py
+
+"""
+Ediciones puntuales de un PMD y nueva resolución en caliente.
+
+`EdicionModelo` registra cambios sobre un modelo base —costos c_{i,a} y
+filas P_a[i, :]— y los pares (i, a) que tocan; `aplicar` devuelve un
+ModeloPMD nuevo (el base no se modifica) con la misma estructura de
+pares, en el mismo formato de P (densa, CSR o compacta).
+`diferencia_modelos` da los mismos pares comparando dos versiones.
+
+`ResolucionIncremental` guarda el último resultado de cada método de
+`api` y, tras cada edición, lo usa como punto de partida:
+
+  • "vi"          : v0 = v anterior
+  • "rvi"         : h0 = h anterior
+  • "pi", "pi_desc": pol0 = política óptima anterior
+  • "lp"          : pol0 = política anterior; unas pocas iteraciones de
+                    PI desde ella dan un vértice óptimo y sin resolver el LP
+  • "enumeracion" : las k mejores anteriores, reevaluadas, dan la cota
+                    inicial de la poda
+
+Los parámetros que se pasen explícitamente tienen prioridad.
+"""
+
+import numpy as np
+from scipy import sparse
+from modelo import ModeloPMD, como_modelo
+from compacto import MatrizCompacta
+from api import resolver
+
+TOL_FILA = 1e-9
+
+
+class EdicionModelo:
+    """Cambios de costos y filas de transición sobre un modelo base."""
+
+    def __init__(self, datos):
+        self.base = como_modelo(datos)
+        self._costos = {}           # par k → costo nuevo
+        self._filas = {}            # par k → fila densa nueva
+
+    def _par(self, i, a):
+        tabla = self.base.tabla_indices()
+        if not (0 <= i < self.base.n and 0 <= a <= self.base.num_decisiones) \
+                or tabla[i, a] < 0:
+            raise ValueError(f"La decisión {a} no es viable en el estado {i}.")
+        return int(tabla[i, a])
+
+    def cambiar_costo(self, i, a, costo):
+        """c_{i,a} ← costo."""
+        self._costos[self._par(i, a)] = float(costo)
+        return self
+
+    def cambiar_fila(self, i, a, fila):
+        """P_a[i, :] ← fila (lista de n probabilidades o dict {j: p})."""
+        k = self._par(i, a)
+        n = self.base.n
+        if isinstance(fila, dict):
+            densa = np.zeros(n)
+            for j, p in fila.items():
+                if not 0 <= j < n:
+                    raise ValueError(f"Estado de llegada fuera de rango: {j}")
+                densa[j] = p
+        else:
+            densa = np.array(fila, dtype=np.float64)
+            if densa.shape != (n,):
+                raise ValueError(f"La fila debe tener {n} probabilidades.")
+        if np.any(densa < 0) or abs(densa.sum() - 1.0) > TOL_FILA:
+            raise ValueError(f"La fila de ({i}, {a}) no es una distribución.")
+        self._filas[k] = densa
+        return self
+
+    @property
+    def pares(self):
+        """Pares k cambiados (ordenados)."""
+        return np.array(sorted(set(self._costos) | set(self._filas)),
+                        dtype=np.int64)
+
+    @property
+    def estados(self):
+        """Estados con algún par cambiado."""
+        return np.unique(self.base.estados[self.pares])
+
+    def __len__(self):
+        return self.pares.size
+
+    def aplicar(self):
+        """ModeloPMD con los cambios (el base queda intacto)."""
+        base = self.base
+        costos = base.costos.copy()
+        for k, c in self._costos.items():
+            costos[k] = c
+        P = base.P
+        if self._filas:
+            filas = np.array(sorted(self._filas), dtype=np.int64)
+            nuevas = np.array([self._filas[k] for k in filas.tolist()])
+            if isinstance(P, np.ndarray):
+                P = P.copy()
+                P[filas] = nuevas
+            else:
+                # Se anulan las filas viejas y se suman las nuevas
+                quedan = np.ones(base.num_pares)
+                quedan[filas] = 0.0
+                reemplazo = sparse.csr_matrix(
+                    (np.ones(filas.size), (filas, np.arange(filas.size))),
+                    shape=(base.num_pares, filas.size)) @ sparse.csr_matrix(nuevas)
+                # La compacta, sin reescalar: sus filas intactas vuelven
+                # a float32 sin cambiar
+                actual = (P.tocsr(reescalar=False) if isinstance(P, MatrizCompacta)
+                          else base.matriz_csr())
+                csr = sparse.diags(quedan).tocsr() @ actual + reemplazo
+                csr.eliminate_zeros()
+                if isinstance(P, MatrizCompacta):
+                    precision = ("float32" if P.dtype == np.float32
+                                 else "float64")
+                    P = MatrizCompacta.desde(csr, precision)
+                else:
+                    P = csr.astype(P.dtype)
+        return ModeloPMD(base.n, base.inicio, base.acciones, costos, P,
+                         problema_tipo=base.problema_tipo,
+                         num_decisiones=base.num_decisiones)
+
+
+def diferencia_modelos(anterior, nuevo, tol=0.0):
+    """Pares k cuyo costo o fila de transición cambió entre dos versiones
+    con los mismos pares (i, a); ValueError si la estructura difiere."""
+    anterior, nuevo = como_modelo(anterior), como_modelo(nuevo)
+    if (anterior.n != nuevo.n or not np.array_equal(anterior.inicio, nuevo.inicio)
+            or not np.array_equal(anterior.acciones, nuevo.acciones)):
+        raise ValueError("Los modelos no tienen los mismos pares (i, a).")
+    cambia = np.abs(anterior.costos.astype(np.float64) - nuevo.costos) > tol
+    D = abs(anterior.matriz_csr() - nuevo.matriz_csr()).tocsr()
+    D.data[D.data <= tol] = 0.0
+    D.eliminate_zeros()
+    cambia |= np.diff(D.indptr) > 0
+    return np.flatnonzero(cambia)
+
+
+class ResolucionIncremental:
+    """Versiones sucesivas de un modelo resueltas en caliente.
+
+    resultados guarda el último resultado de cada método e historia los
+    pares cambiados en cada edición.
+    """
+
+    def __init__(self, datos):
+        self.modelo = como_modelo(datos)
+        self.resultados = {}
+        self.historia = []
+
+    def editar(self):
+        """Edición nueva sobre la versión actual (ver `aplicar`)."""
+        return EdicionModelo(self.modelo)
+
+    def aplicar(self, cambios):
+        """Pasa a la versión editada: una EdicionModelo o el modelo nuevo
+        completo. Devuelve los pares cambiados."""
+        if isinstance(cambios, EdicionModelo):
+            if cambios.base is not self.modelo:
+                raise ValueError("La edición no es sobre la versión actual.")
+            pares, nuevo = cambios.pares, cambios.aplicar()
+        else:
+            nuevo = como_modelo(cambios)
+            pares = diferencia_modelos(self.modelo, nuevo)
+        self.modelo = nuevo
+        self.historia.append(pares)
+        return pares
+
+    def arranque(self, metodo):
+        """Parámetros de arranque que aporta el resultado previo de `metodo`."""
+        previo = self.resultados.get(metodo)
+        if previo is None:
+            return {}
+        if metodo == "vi" and previo.v is not None:
+            return {"v0": previo.v}
+        if metodo == "rvi" and previo.v is not None:
+            return {"h0": previo.v}
+        if metodo in ("pi", "pi_desc", "lp") and previo.politica is not None:
+            return {"pol0": previo.politica}
+        if metodo == "enumeracion" and previo.mejores:
+            return {"semillas": [pol for pol, _, _ in previo.mejores]}
+        return {}
+
+    def resolver(self, metodo, **parametros):
+        """`api.resolver` sobre la versión actual, en caliente si hay un
+        resultado previo del mismo método."""
+        parametros = dict(self.arranque(metodo), **parametros)
+        res = resolver(self.modelo, metodo, **parametros)
+        self.resultados[metodo] = res
+        return res
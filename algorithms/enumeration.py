@@ -1,59 +1,227 @@
 #!/usr/bin/env python3
 # algorithms/enumerate_policies.py
 
+"""
+Enumeración exhaustiva de políticas para PMD de costo medio.
+
+Para cada política R se resuelve πᵀP^R = πᵀ, Σπ = 1 y se calcula
+E(C_R) = Σ_i π_i · c_{i,R(i)}. El motor no recorre el producto de
+decisiones política por política:
+
+  • Las políticas se agrupan en bloques: un prefijo fijo (primeros
+    estados) × todas las combinaciones del sufijo. Cada bloque se apila
+    en un arreglo (B, n, n) y se resuelve con un solo np.linalg.solve
+    (`estacionaria.distribuciones_lote`); las multicadena se descartan
+    al comprobar las clases recurrentes de las que entran al top-k.
+  • Los bloques pueden repartirse en un pool de procesos.
+  • Solo se conserva un montículo acotado con las k mejores políticas.
+  • Con `podar=True` se descartan subárboles de prefijos que no pueden
+    mejorar a la k-ésima mejor política. Hay dos cotas:
+      - la trivial E(C_R) ≥ min_i c_{i,R(i)} (π es una distribución), con
+        los costos del prefijo y el mejor costo de cada estado libre. Es
+        gratis, pero solo poda cuando todos los costos son altos;
+      - la del LP de costo medio restringido a los pares del subárbol
+        (acciones del prefijo fijas, sufijo libre): la π de cualquier
+        política del subárbol es factible en ese LP, así que su óptimo
+        acota E(C_R). Se resuelve con HiGHS solo en los nodos cuyo
+        subárbol abarca al menos MIN_BLOQUES_LP bloques.
+"""
+
+import heapq
 import numpy as np
 from itertools import product
-from lim_pant import limpiar_pantalla
+from concurrent.futures import ProcessPoolExecutor
+from scipy.optimize import linprog
+from modelo import como_modelo
+from pro_lineal import matriz_restricciones
+from estacionaria import (distribucion_estacionaria, distribuciones_lote,
+                          es_unicadena, cache_de)
+
+# Tamaño máximo (en políticas y en bytes) de cada bloque apilado
+TAM_BLOQUE = 4096
+MEMORIA_BLOQUE = 64 * 2**20
+# La cota LP se calcula en nodos con al menos estos bloques por debajo
+MIN_BLOQUES_LP = 4
 
 def calcular_vector_estacionario(P):
-    n = P.shape[0]
-    A = P.T - np.eye(n)
-    A[-1, :] = 1.0
-    b = np.zeros(n)
-    b[-1] = 1.0
-    return np.linalg.solve(A, b)
-
-def metodo_enumeracion(datos):
-    limpiar_pantalla()
-    problema_tipo = datos["problema_tipo"]
-    n = datos["num_estados"]
-    politicas = datos["politicas"]
-    costos_data = datos["costos"]
-    probs = datos["probabilidades"]
-
-    # Construir decisiones viables por estado
-    decisiones_por_estado = {i: [] for i in range(n)}
-    for j, estados in politicas.items():
-        for i in estados:
-            decisiones_por_estado[i].append(j)
-
-    print("\n=== ENUMERACIÓN EXHAUSTIVA DE POLÍTICAS ===\n")
-    resultados = []
-    for pol in product(*(decisiones_por_estado[i] for i in range(n))):
-        # Matriz de transición P^pol
-        P_pol = np.zeros((n, n))
-        for i, dj in enumerate(pol):
-            P_pol[i, :] = probs[dj][i]
-
-        # Vector estacionario y costo medio
-        pi = calcular_vector_estacionario(P_pol)
-        c_pol = np.array([costos_data[dj][i] for i, dj in enumerate(pol)], dtype=float)
-        g = float(pi.dot(c_pol))
-        resultados.append((pol, pi, g))
-
-        print(f"Política: {pol}")
-        print("  π =", np.round(pi, 6).tolist())
-        print(f"  Costo medio = {g:.6f}\n")
-
-    # Selección óptima
-    if problema_tipo.lower().startswith("max"):
-        pol_opt, pi_opt, g_opt = max(resultados, key=lambda x: x[2])
+    return distribucion_estacionaria(P, "lu")
+
+
+# ----------------------------------------------------------------------
+# Evaluación de bloques (también en procesos hijos)
+# ----------------------------------------------------------------------
+_P = None
+_C = None
+
+def _iniciar_trabajador(P, C):
+    global _P, _C
+    _P, _C = P, C
+
+def _evaluar_bloque(K, signo, k):
+    """Evalúa las políticas del bloque (filas de K = índices de pares).
+
+    Devuelve las k mejores del bloque como (posiciones, g, π) y el número
+    de políticas omitidas por ser singulares o multicadena. La estructura
+    de clases solo se comprueba en las candidatas a quedar entre las k
+    mejores, en orden, hasta reunir k unicadena.
+    """
+    pis, validos = distribuciones_lote(_P[K])
+    g = np.einsum("bi,bi->b", pis, _C[K])
+    puntaje = np.where(validos, signo * g, np.inf)
+    omitidas = int((~validos).sum())
+    mejores = []
+    for r in np.argsort(puntaje, kind="stable").tolist():
+        if len(mejores) == k or not np.isfinite(puntaje[r]):
+            break
+        if es_unicadena(_P[K[r]]):
+            mejores.append(r)
+        else:
+            omitidas += 1
+    mejores = np.array(mejores, dtype=np.int64)
+    return mejores, g[mejores], pis[mejores], omitidas
+
+
+# ----------------------------------------------------------------------
+# Motor de enumeración
+# ----------------------------------------------------------------------
+def enumerar_politicas(datos, k=10, procesos=1, podar=True,
+                       tam_bloque=TAM_BLOQUE, decisiones=None,
+                       cota_inicial=None):
+    """Enumera las políticas y devuelve las k mejores.
+
+    decisiones: lista opcional D(i) por estado para restringir la
+    enumeración (por defecto, todas las decisiones viables).
+    cota_inicial: E(C_R) de la k-ésima mejor de k políticas ya conocidas
+    (por ejemplo, las k mejores antes de editar el modelo, reevaluadas);
+    con podar=True se poda desde el principio todo lo que sea peor.
+
+    Devuelve (mejores, estadisticas), donde mejores es una lista de
+    (pol, π, g) ordenada de mejor a peor y estadisticas un diccionario
+    con las políticas evaluadas, podadas, omitidas por no ser unicadena
+    y el número de LPs de cota resueltos. Los π de las k mejores quedan en la caché del modelo.
+    """
+    modelo = como_modelo(datos)
+    n = modelo.n
+    signo = -1.0 if modelo.maximizar else 1.0
+    tabla = modelo.tabla_indices()
+    if decisiones is None:
+        decisiones = [modelo.decisiones(i) for i in range(n)]
+    pares = [tabla[i, decisiones[i]] for i in range(n)]
+    tamanos = [len(p) for p in pares]
+    total = int(np.prod(tamanos, dtype=object))
+
+    P = modelo.P.toarray() if modelo.es_disperso else np.asarray(modelo.P)
+    C = modelo.costos
+
+    # Prefijo/sufijo: el sufijo se enumera completo dentro de cada bloque
+    max_bloque = max(1, min(tam_bloque, MEMORIA_BLOQUE // (8 * n * n)))
+    corte, tam_sufijo = n, 1
+    while corte > 0 and tam_sufijo * tamanos[corte - 1] <= max_bloque:
+        corte -= 1
+        tam_sufijo *= tamanos[corte]
+    sufijo = np.array(list(product(*pares[corte:])), dtype=np.int64)
+    sufijo = sufijo.reshape(tam_sufijo, n - corte)
+
+    # Cotas para la poda: mejor costo posible de cada estado
+    mejor_c = np.array([(signo * C[p]).min() for p in pares])
+    cota_libre = np.append(np.minimum.accumulate(mejor_c[::-1])[::-1], np.inf)
+
+    # Cota LP: columnas del prefijo elegido + todos los pares libres
+    A_eq, b_eq = matriz_restricciones(modelo)
+    A_eq = A_eq.tocsc()
+    libres = [np.concatenate(pares[nivel:] or [np.zeros(0, dtype=np.int64)])
+              for nivel in range(n + 1)]
+
+    def cota_lp(elegido, nivel):
+        cols = np.concatenate([np.asarray(elegido, dtype=np.int64), libres[nivel]])
+        res = linprog(signo * C[cols], A_eq=A_eq[:, cols], b_eq=b_eq,
+                      bounds=(0, None), method="highs")
+        stats["cotas_lp"] += 1
+        return res.fun if res.status == 0 else -np.inf
+
+    # Montículo con las k mejores: (-puntaje, -orden, rango, posición, π)
+    monticulo = []
+    stats = {"total": total, "evaluadas": 0, "podadas": 0, "singulares": 0,
+             "cotas_lp": 0}
+
+    # Las políticas iguales a la cota siguen entrando (desempate por orden)
+    techo = (np.inf if cota_inicial is None else
+             signo * cota_inicial + 1e-12 * (1 + abs(cota_inicial)))
+
+    def peor_aceptado():
+        peor = -monticulo[0][0] if len(monticulo) >= k else np.inf
+        return min(peor, techo)
+
+    def prefijos(nivel, elegido, rango, cota):
+        """Recorre en orden lexicográfico los prefijos que no se podan."""
+        subarbol = int(np.prod(tamanos[nivel:], dtype=object))
+        peor = peor_aceptado()
+        if podar and min(cota, cota_libre[nivel]) >= peor:
+            stats["podadas"] += subarbol
+            return
+        if (podar and np.isfinite(peor)
+                and subarbol >= MIN_BLOQUES_LP * tam_sufijo
+                and cota_lp(elegido, nivel) - 1e-9 * (1 + abs(peor)) >= peor):
+            stats["podadas"] += subarbol
+            return
+        if nivel == corte:
+            yield list(elegido), rango
+            return
+        for r, kp in enumerate(pares[nivel]):
+            elegido.append(kp)
+            yield from prefijos(nivel + 1, elegido,
+                                rango * tamanos[nivel] + r,
+                                min(cota, signo * C[kp]))
+            elegido.pop()
+
+    def incorporar(rango, resultado):
+        pos, gs, pis, singulares = resultado
+        stats["evaluadas"] += tam_sufijo
+        stats["singulares"] += singulares
+        for p, g, pi in zip(pos.tolist(), gs.tolist(), pis):
+            orden = rango * tam_sufijo + p
+            entrada = (-signo * g, -orden, rango, p, pi)
+            if len(monticulo) < k:
+                heapq.heappush(monticulo, entrada)
+            elif entrada > monticulo[0]:
+                heapq.heapreplace(monticulo, entrada)
+
+    def bloque(prefijo):
+        K = np.empty((tam_sufijo, n), dtype=np.int64)
+        K[:, :corte] = prefijo
+        K[:, corte:] = sufijo
+        return K
+
+    if procesos > 1:
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador,
+                                 initargs=(P, C)) as pool:
+            pendientes = []
+            for prefijo, rango in prefijos(0, [], 0, np.inf):
+                pendientes.append((rango, pool.submit(
+                    _evaluar_bloque, bloque(prefijo), signo, k)))
+                if len(pendientes) >= 2 * procesos:
+                    rango, fut = pendientes.pop(0)
+                    incorporar(rango, fut.result())
+            for rango, fut in pendientes:
+                incorporar(rango, fut.result())
     else:
-        pol_opt, pi_opt, g_opt = min(resultados, key=lambda x: x[2])
-
-    print("="*60)
-    print("POLÍTICA ÓPTIMA".center(60))
-    print("="*60)
-    print(f"R* = {pol_opt}")
-    print("π* =", np.round(pi_opt, 6).tolist())
-    print(f"E(C_{{R*}}) = {g_opt:.6f}\n")
+        _iniciar_trabajador(P, C)
+        for prefijo, rango in prefijos(0, [], 0, np.inf):
+            incorporar(rango, _evaluar_bloque(bloque(prefijo), signo, k))
+
+    mejores = []
+    cache = cache_de(modelo)
+    for _, _, rango, p, pi in sorted(monticulo, reverse=True):
+        K = bloque(_prefijo_de_rango(pares, tamanos, corte, rango))[p]
+        pol = tuple(modelo.acciones[K].tolist())
+        cache.guardar(pol, pi)
+        mejores.append((pol, pi, float(pi @ C[K])))
+    return mejores, stats
+
+def _prefijo_de_rango(pares, tamanos, corte, rango):
+    """Reconstruye los índices del prefijo a partir de su rango mixto."""
+    prefijo = []
+    for nivel in reversed(range(corte)):
+        rango, r = divmod(rango, tamanos[nivel])
+        prefijo.append(pares[nivel][r])
+    return prefijo[::-1]
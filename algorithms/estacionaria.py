@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# algorithms/estacionaria.py
+
+"""
+Distribución estacionaria de la cadena inducida por una política.
+
+Sustituye a las copias de "agregar la fila de normalización y resolver"
+que había en cada método. Primero se buscan las clases recurrentes de P
+(componentes fuertemente conexas cerradas): si hay más de una, la cadena
+es multicadena, π no es única y se lanza CadenaMulticadenaError en lugar
+de devolver en silencio una de tantas soluciones. Si hay una sola, π se
+calcula sobre esa clase (π = 0 en los estados transitorios) con:
+
+  • "lu"       : sistema denso (Pᵀ – I, fila de unos), cadenas pequeñas
+  • "gth"      : eliminación de Grassmann–Taksar–Heyman, sin restas, la
+                 opción más precisa para cadenas mal condicionadas
+  • "potencia" : iteración de potencia sobre ½(I + P), solo productos
+  • "iterativo": sistema disperso con `sistemas.resolver_sistema`
+                 (π_{n-1} = 1 fijo y luego normalizado)
+  • "auto"     : "lu" hasta N_DENSO_MAX estados, "iterativo" después
+
+`estacionaria_politica(modelo, pol)` guarda los resultados en una caché
+LRU por modelo, indexada por la tupla de la política. Las cachés se
+buscan por la huella del contenido (ModeloPMD.huella), así que también
+aciertan con el diccionario de `read.py`, que se convierte en un modelo
+nuevo en cada llamada; se conservan las de los MAX_MODELOS_CACHE modelos
+usados más recientemente.
+"""
+
+from collections import OrderedDict
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from modelo import como_modelo
+from sistemas import resolver_sistema
+
+N_DENSO_MAX = 1000
+CAPACIDAD_CACHE = 1024
+MAX_MODELOS_CACHE = 8
+TOL_POTENCIA = 1e-13
+ITER_POTENCIA = 100_000
+
+
+class CadenaMulticadenaError(ValueError):
+    """La cadena tiene varias clases recurrentes; π no es única."""
+
+    def __init__(self, clases):
+        self.clases = clases
+        resumen = "; ".join(str(c[:10].tolist()) + ("…" if c.size > 10 else "")
+                            for c in clases)
+        super().__init__(f"La cadena es multicadena: {len(clases)} clases "
+                         f"recurrentes ({resumen}).")
+
+
+# ----------------------------------------------------------------------
+# Estructura de la cadena
+# ----------------------------------------------------------------------
+def clases_recurrentes(P):
+    """Lista de clases recurrentes (arreglos de estados ordenados)."""
+    G = sparse.csr_matrix(P)
+    G.eliminate_zeros()
+    num, etiqueta = csgraph.connected_components(G, directed=True,
+                                                 connection="strong")
+    # Una componente es cerrada si ninguna arista sale de ella
+    filas = np.repeat(np.arange(G.shape[0]), np.diff(G.indptr))
+    sale = etiqueta[filas] != etiqueta[G.indices]
+    abierta = np.zeros(num, dtype=bool)
+    abierta[etiqueta[filas[sale]]] = True
+    return [np.flatnonzero(etiqueta == c) for c in np.flatnonzero(~abierta)]
+
+
+def es_unicadena(P):
+    """True si la cadena tiene una sola clase recurrente."""
+    return len(clases_recurrentes(P)) == 1
+
+
+# ----------------------------------------------------------------------
+# Métodos
+# ----------------------------------------------------------------------
+def _lu(P):
+    n = P.shape[0]
+    A = P.T - np.eye(n)
+    A[-1, :] = 1.0
+    b = np.zeros(n)
+    b[-1] = 1.0
+    return np.linalg.solve(A, b)
+
+
+def _gth(P):
+    A = np.array(P, dtype=float)
+    n = A.shape[0]
+    for k in range(n - 1, 0, -1):
+        s = A[k, :k].sum()
+        A[:k, k] /= s
+        A[:k, :k] += np.outer(A[:k, k], A[k, :k])
+    pi = np.zeros(n)
+    pi[0] = 1.0
+    for k in range(1, n):
+        pi[k] = pi[:k] @ A[:k, k]
+    return pi / pi.sum()
+
+
+def _potencia(P, tol=TOL_POTENCIA, iter_max=ITER_POTENCIA):
+    n = P.shape[0]
+    PT = P.T.tocsr() if sparse.issparse(P) else P.T
+    pi = np.full(n, 1.0 / n)
+    for _ in range(iter_max):
+        nuevo = 0.5 * (pi + PT @ pi)     # ½(I + P) es aperiódica
+        nuevo /= nuevo.sum()
+        if np.abs(nuevo - pi).sum() < tol:
+            return nuevo
+        pi = nuevo
+    return pi
+
+
+def _iterativo(P):
+    # Fijando π_{n-1} = 1 queda (I – Pᵀ) sin última fila ni columna, que es
+    # dispersa (la fila de unos estropearía LU y precondicionadores).
+    n = P.shape[0]
+    if not sparse.issparse(P) or n == 1:
+        return _lu(np.asarray(P.todense()) if sparse.issparse(P) else P)
+    PT = sparse.csr_matrix(P).T.tocsr()
+    A = (sparse.identity(n - 1, format="csr") - PT[:n - 1, :n - 1]).tocsr()
+    b = PT[:n - 1, n - 1].toarray().ravel()
+    pi = np.append(resolver_sistema(A, b), 1.0)
+    return pi / pi.sum()
+
+
+METODOS = {"lu": _lu, "gth": _gth, "potencia": _potencia,
+           "iterativo": _iterativo}
+
+
+def distribucion_estacionaria(P, metodo="auto"):
+    """π con πᵀP = πᵀ, Σπ = 1 para una cadena unicadena.
+
+    Lanza CadenaMulticadenaError si hay más de una clase recurrente.
+    """
+    n = P.shape[0]
+    clases = clases_recurrentes(P)
+    if len(clases) > 1:
+        raise CadenaMulticadenaError(clases)
+    clase = clases[0]
+    Pc = P if clase.size == n else P[clase][:, clase]
+
+    if metodo == "auto":
+        metodo = "lu" if clase.size <= N_DENSO_MAX else "iterativo"
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo}")
+    if metodo in ("lu", "gth") and sparse.issparse(Pc):
+        Pc = Pc.toarray()
+
+    pi = np.zeros(n)
+    pi[clase] = METODOS[metodo](Pc)
+    return pi
+
+
+def distribuciones_lote(Ps):
+    """Versión apilada para (B, n, n): devuelve (π, válidos).
+
+    Las políticas con sistema singular quedan marcadas como no válidas
+    en lugar de abortar el lote. Una multicadena puede no dar un sistema
+    numéricamente singular; comprobar las clases de todo el lote cuesta
+    más que resolverlo, así que quien use los π debe confirmar con
+    `es_unicadena` solo las políticas que conserve.
+    """
+    B, n, _ = Ps.shape
+    A = np.transpose(Ps, (0, 2, 1)) - np.eye(n)
+    A[:, -1, :] = 1.0
+    b = np.zeros((B, n, 1))
+    b[:, -1, 0] = 1.0
+    try:
+        pis = np.linalg.solve(A, b)[:, :, 0]
+        validos = np.isfinite(pis).all(axis=1)
+    except np.linalg.LinAlgError:
+        pis = np.zeros((B, n))
+        validos = np.ones(B, dtype=bool)
+        for r in range(B):
+            try:
+                pis[r] = np.linalg.solve(A[r], b[r, :, 0])
+            except np.linalg.LinAlgError:
+                validos[r] = False
+    pis[~validos] = 0.0
+    return pis, validos
+
+
+# ----------------------------------------------------------------------
+# Caché por política
+# ----------------------------------------------------------------------
+class CacheEstacionaria:
+    """Caché LRU de π por tupla de política para un modelo."""
+
+    def __init__(self, datos, capacidad=CAPACIDAD_CACHE, metodo="auto"):
+        self.modelo = como_modelo(datos)
+        self.capacidad = capacidad
+        self.metodo = metodo
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+
+    def __call__(self, pol):
+        clave = tuple(int(a) for a in pol)
+        if clave in self._datos:
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return self._datos[clave]
+        self.fallos += 1
+        pi = distribucion_estacionaria(self.modelo.matriz_politica(clave),
+                                       self.metodo)
+        self.guardar(clave, pi)
+        return pi
+
+    def guardar(self, pol, pi):
+        """Agrega un π ya calculado (por ejemplo, en la enumeración)."""
+        clave = tuple(int(a) for a in pol)
+        pi = np.asarray(pi)
+        pi.setflags(write=False)
+        self._datos[clave] = pi
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+
+
+_caches = OrderedDict()       # huella del modelo → CacheEstacionaria
+
+
+def cache_de(modelo):
+    """Caché compartida de los modelos con el contenido de `modelo` (se
+    crea al primer uso)."""
+    clave = modelo.huella()
+    if clave in _caches:
+        _caches.move_to_end(clave)
+        return _caches[clave]
+    _caches[clave] = cache = CacheEstacionaria(modelo)
+    while len(_caches) > MAX_MODELOS_CACHE:
+        _caches.popitem(last=False)
+    return cache
+
+
+def estacionaria_politica(datos, pol):
+    """π de la política `pol`, con caché LRU por modelo."""
+    return cache_de(como_modelo(datos))(pol)
+
+
+def costo_medio_politica(datos, pol):
+    """(π, E[C_R]) de la política `pol`."""
+    modelo = como_modelo(datos)
+    pi = estacionaria_politica(modelo, pol)
+    return pi, float(pi @ modelo.costos_politica(pol))
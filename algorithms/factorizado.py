@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# algorithms/factorizado.py
+
+"""
+PMD factorizado: K componentes independientes (máquinas, colas,
+artículos de inventario) cuyo estado conjunto es s = (s_1, …, s_K).
+
+Cada componente k es un PMD pequeño (ModeloPMD o diccionario de
+`read.py`) con n_k estados y decisiones 1..m_k. Una decisión conjunta j
+es una tupla (a_1, …, a_K) de decisiones de los componentes; la lista
+`acciones_conjuntas` define cuáles existen (por omisión, todas las
+combinaciones), lo que permite expresar restricciones de acoplamiento
+como "a lo más r reparaciones a la vez". Entonces
+
+  P_j = P_1[a_1] ⊗ P_2[a_2] ⊗ … ⊗ P_K[a_K]
+  c_j(s) = Σ_k c_k(s_k, a_k) + costos_accion[j]
+
+y j es viable en s si cada a_k es viable en s_k.
+
+La matriz conjunta (N × N con N = Π n_k, por cada j) nunca se arma:
+P_j·v se calcula tratando v como un tensor n_1 × … × n_K y contrayendo
+cada eje con su matriz n_k × n_k (matmul sobre un reshape), en
+O(N · Σ n_k) operaciones y memoria O(N). Las decisiones conjuntas se
+recorren ordenadas por su sufijo (a_k, …, a_K), de modo que las
+contracciones de los últimos ejes se reutilizan entre decisiones que
+los comparten.
+
+Los estados conjuntos se numeran en orden C (np.ravel_multi_index sobre
+`forma`) y las políticas son arreglos de N etiquetas de decisión
+conjunta (1..m), no tuplas.
+
+  • iterar_valores_factorizado   : aproximaciones sucesivas (Jacobi)
+  • evaluar_politica_factorizado : v = c_π + α P_π v con GMRES sin matriz
+  • iterar_politicas_factorizado : iteración de políticas con descuento
+  • materializar                 : ModeloPMD plano equivalente (para
+                                   verificar con los otros métodos en
+                                   modelos chicos)
+"""
+
+import itertools
+import time
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, gmres
+from modelo import ModeloPMD, como_modelo
+from bellman import umbral_parada, medida_residuo
+from traza import como_traza, evento
+
+
+class ModeloFactorizado:
+    """PMD con estado producto de componentes independientes."""
+
+    def __init__(self, componentes, acciones_conjuntas=None,
+                 costos_accion=None):
+        componentes = [como_modelo(c) for c in componentes]
+        if not componentes:
+            raise ValueError("Hace falta al menos un componente.")
+        tipos = {c.maximizar for c in componentes}
+        if len(tipos) > 1:
+            raise ValueError("Todos los componentes deben minimizar o todos maximizar.")
+        self.maximizar = tipos.pop()
+        self.problema_tipo = componentes[0].problema_tipo
+        self.forma = tuple(c.n for c in componentes)
+        self.n = int(np.prod(self.forma, dtype=np.int64))
+
+        # Por componente: P_k[a-1] (n_k × n_k) y c_k[a-1] (n_k), con
+        # ±inf donde la decisión no es viable
+        peor = -np.inf if self.maximizar else np.inf
+        self.P_comp, self.c_comp = [], []
+        for c in componentes:
+            m = c.num_decisiones
+            P = np.zeros((m, c.n, c.n))
+            costo = np.full((m, c.n), peor)
+            a, i = c.acciones - 1, c.estados
+            P[a, i] = c.matriz_csr().toarray()
+            costo[a, i] = c.costos
+            self.P_comp.append(P)
+            self.c_comp.append(costo)
+
+        if acciones_conjuntas is None:
+            acciones_conjuntas = itertools.product(
+                *(range(1, P.shape[0] + 1) for P in self.P_comp))
+        self.acciones = [tuple(int(a) for a in t) for t in acciones_conjuntas]
+        for t in self.acciones:
+            if len(t) != len(self.forma) or any(
+                    not 1 <= a <= P.shape[0] for a, P in zip(t, self.P_comp)):
+                raise ValueError(f"Decisión conjunta inválida: {t}")
+        self.costos_accion = (np.zeros(len(self.acciones)) if costos_accion is None
+                              else np.asarray(costos_accion, dtype=float))
+        if self.costos_accion.shape != (len(self.acciones),):
+            raise ValueError("costos_accion debe tener una entrada por decisión conjunta.")
+        # Orden por sufijo invertido: comparten las contracciones finales
+        self._orden = sorted(range(len(self.acciones)),
+                             key=lambda j: self.acciones[j][::-1])
+
+    @property
+    def num_decisiones(self):
+        return len(self.acciones)
+
+    @property
+    def num_componentes(self):
+        return len(self.forma)
+
+    def estado(self, s):
+        """Tupla (s_1, …, s_K) del estado conjunto s."""
+        return tuple(int(x) for x in np.unravel_index(s, self.forma))
+
+    # ------------------------------------------------------------------
+    # Contracciones
+    # ------------------------------------------------------------------
+    def _contraer(self, M, X, eje):
+        """Aplica M (n_k × n_k) sobre el eje k de X (forma conjunta)."""
+        antes = int(np.prod(self.forma[:eje], dtype=np.int64))
+        despues = int(np.prod(self.forma[eje + 1:], dtype=np.int64))
+        if despues == 1:
+            # Último eje: un solo producto (antes × n_k)·M^T
+            Y = X.reshape(antes, self.forma[eje]) @ M.T
+        else:
+            # einsum("ij,ajb->aib") como matmul por lotes (usa BLAS)
+            Y = np.matmul(M, X.reshape(antes, self.forma[eje], despues))
+        return Y.reshape(self.forma)
+
+    def esperanzas(self, v, decisiones=None):
+        """Genera (j, P_j v) para cada decisión conjunta j (índice 0..m-1).
+
+        Con `decisiones` solo se recorren esas. Los vectores devueltos
+        son planos (N,).
+        """
+        X = np.asarray(v, dtype=np.float64).reshape(self.forma)
+        K = self.num_componentes
+        if decisiones is None:
+            orden = self._orden
+        else:
+            elegidas = set(int(j) for j in decisiones)
+            orden = [j for j in self._orden if j in elegidas]
+        # pila[k] = X contraído en los ejes k..K-1 con las decisiones actual[k:]
+        pila, actual = [None] * K, [None] * K
+        for j in orden:
+            t = self.acciones[j]
+            r = K
+            while r > 0 and actual[r - 1] == t[r - 1]:
+                r -= 1
+            for k in range(r - 1, -1, -1):
+                base = X if k == K - 1 else pila[k + 1]
+                pila[k] = self._contraer(self.P_comp[k][t[k] - 1], base, k)
+                actual[k] = t[k]
+            yield j, pila[0].ravel()
+
+    def costo(self, j):
+        """c_j sobre todos los estados conjuntos (±inf si no es viable)."""
+        # Suma exterior eje por eje: ~N·(1 + 1/n_K + …) sumas en vez de K·N
+        total = np.float64(self.costos_accion[j])
+        for k, a in enumerate(self.acciones[j]):
+            total = np.add.outer(total, self.c_comp[k][a - 1])
+        return total.ravel()
+
+    def backup(self, v, alpha):
+        """(T v, política codiciosa); empates: la decisión conjunta menor."""
+        mejor = np.full(self.n, -np.inf if self.maximizar else np.inf)
+        pol = np.zeros(self.n, dtype=np.int64)
+        for j, E in self.esperanzas(v):
+            q = self.costo(j)
+            q += alpha * E
+            mejora = (q > mejor) if self.maximizar else (q < mejor)
+            igual = q == mejor
+            igual &= pol > j + 1
+            mejora |= igual
+            np.copyto(mejor, q, where=mejora)
+            np.copyto(pol, j + 1, where=mejora)
+        if np.any(pol == 0):
+            vacios = np.flatnonzero(pol == 0)[:10].tolist()
+            raise ValueError(f"Estados conjuntos sin decisiones viables: {vacios}")
+        return mejor, pol
+
+    def producto_politica(self, pol, v):
+        """P_π v sin armar P_π."""
+        pol = np.asarray(pol)
+        salida = np.zeros(self.n)
+        for j, E in self.esperanzas(v, np.unique(pol) - 1):
+            sel = pol == j + 1
+            salida[sel] = E[sel]
+        return salida
+
+    def costos_politica(self, pol):
+        pol = np.asarray(pol)
+        salida = np.zeros(self.n)
+        for j in np.unique(pol) - 1:
+            sel = pol == j + 1
+            salida[sel] = self.costo(j)[sel]
+        return salida
+
+    # ------------------------------------------------------------------
+    # Modelo plano equivalente
+    # ------------------------------------------------------------------
+    def materializar(self):
+        """ModeloPMD con las N filas de cada decisión conjunta viable.
+
+        Solo para modelos chicos: arma las matrices de Kronecker."""
+        filas, cvec, acciones, estados = [], [], [], []
+        for j, t in enumerate(self.acciones):
+            c = self.costo(j)
+            viables = np.flatnonzero(np.isfinite(c))
+            if viables.size == 0:
+                continue
+            Pj = sparse.csr_matrix(self.P_comp[0][t[0] - 1])
+            for k in range(1, self.num_componentes):
+                Pj = sparse.kron(Pj, self.P_comp[k][t[k] - 1], format="csr")
+            filas.append(Pj[viables])
+            cvec.append(c[viables])
+            acciones.append(np.full(viables.size, j + 1))
+            estados.append(viables)
+        estados = np.concatenate(estados)
+        orden = np.lexsort((np.concatenate(acciones), estados))
+        P = sparse.vstack(filas, format="csr")[orden]
+        inicio = np.zeros(self.n + 1, dtype=np.int64)
+        inicio[1:] = np.cumsum(np.bincount(estados, minlength=self.n))
+        return ModeloPMD(self.n, inicio, np.concatenate(acciones)[orden],
+                         np.concatenate(cvec)[orden], P,
+                         problema_tipo=self.problema_tipo,
+                         num_decisiones=self.num_decisiones)
+
+
+# ----------------------------------------------------------------------
+# Métodos de solución
+# ----------------------------------------------------------------------
+def iterar_valores_factorizado(modelo, alpha, iter_max, tol, criterio="sup",
+                               v0=None, traza=None):
+    """Aproximaciones sucesivas (Jacobi) sobre el modelo factorizado.
+
+    Mismo criterio de paro y mismas cotas que `aproximaciones.iterar_valores`.
+    Devuelve un diccionario con v, politica (arreglo de N decisiones
+    conjuntas), iteraciones, tiempo (s), convergio, cotas y epsilon.
+    """
+    umbral = umbral_parada(criterio, tol, alpha)
+    v = np.zeros(modelo.n) if v0 is None else np.array(v0, dtype=float)
+    traza = como_traza(traza)
+    if traza.activa:
+        traza.inicio("vi_factorizado", {"alpha": alpha, "criterio": criterio,
+                                        "n": modelo.n, "forma": modelo.forma})
+
+    t0 = time.perf_counter()
+    convergio = False
+    for k in range(1, iter_max + 1):
+        v_new, _ = modelo.backup(v, alpha)
+        residuo = medida_residuo(criterio, v_new - v)
+        if traza.activa:
+            traza.iteracion(evento("vi_factorizado", k, t0, residuo=residuo))
+        v = v_new
+        if residuo < umbral:
+            convergio = True
+            break
+    tiempo = time.perf_counter() - t0
+    if traza.activa:
+        traza.fin({"metodo": "vi_factorizado", "iteraciones": k,
+                   "tiempo": tiempo, "convergio": convergio})
+
+    Tv, pol = modelo.backup(v, alpha)
+    d = Tv - v
+    factor = alpha / (1 - alpha)
+    inferior = Tv + factor * d.min()
+    superior = Tv + factor * d.max()
+    return {
+        "v": 0.5 * (inferior + superior) if criterio == "span" else v,
+        "politica": pol,
+        "iteraciones": k,
+        "tiempo": tiempo,
+        "convergio": convergio,
+        "cota_inferior": inferior,
+        "cota_superior": superior,
+        "epsilon": factor * float(d.max() - d.min()),
+    }
+
+
+def evaluar_politica_factorizado(modelo, pol, alpha, tol=1e-10, iter_max=1000,
+                                 v0=None):
+    """Resuelve (I – α P_π) v = c_π con GMRES; P_π solo se aplica.
+
+    Devuelve un diccionario con v, productos (aplicaciones de P_π) y
+    convergio.
+    """
+    pol = np.asarray(pol)
+    if pol.shape != (modelo.n,):
+        raise ValueError(f"La política debe tener {modelo.n} decisiones.")
+    c = modelo.costos_politica(pol)
+    if not np.all(np.isfinite(c)):
+        raise ValueError("La política usa decisiones no viables.")
+    productos = [0]
+
+    def aplicar(x):
+        productos[0] += 1
+        return x - alpha * modelo.producto_politica(pol, np.ravel(x))
+
+    A = LinearOperator((modelo.n, modelo.n), matvec=aplicar, dtype=np.float64)
+    v, info = gmres(A, c, x0=v0, rtol=tol, atol=0.0, maxiter=iter_max)
+    return {"v": v, "productos": productos[0], "convergio": info == 0}
+
+
+def iterar_politicas_factorizado(modelo, alpha, pol0=None, iter_max=100,
+                                 tol=1e-10):
+    """Iteración de políticas con descuento α sobre el modelo factorizado.
+
+    La mejora solo cambia la decisión de un estado si gana más que
+    tol·max(1, |v|), para no ciclar entre empates. pol0 por omisión es
+    la política codiciosa de v = 0.
+    """
+    t0 = time.perf_counter()
+    pol = modelo.backup(np.zeros(modelo.n), alpha)[1] if pol0 is None \
+        else np.asarray(pol0, dtype=np.int64)
+    v = None
+    productos = 0
+    convergio = False
+    for k in range(1, iter_max + 1):
+        ev = evaluar_politica_factorizado(modelo, pol, alpha, tol, v0=v)
+        v, productos = ev["v"], productos + ev["productos"]
+        Tv, nueva = modelo.backup(v, alpha)
+        margen = tol * np.maximum(1.0, np.abs(v))
+        gana = (Tv > v + margen) if modelo.maximizar else (Tv < v - margen)
+        if not gana.any():
+            convergio = True
+            break
+        pol = np.where(gana, nueva, pol)
+    return {
+        "politica": pol,
+        "v": v,
+        "iteraciones": k,
+        "productos": productos,
+        "tiempo": time.perf_counter() - t0,
+        "convergio": convergio,
+    }
+
+
+# ----------------------------------------------------------------------
+# Ejemplo
+# ----------------------------------------------------------------------
+def maquinas(num_maquinas, n, semilla=0, cuadrillas=None):
+    """K máquinas que se deterioran en 0..n-1 (n-1 = descompuesta, n ≥ 2).
+
+    Decisión 1: operar (costo creciente con el deterioro; descompuesta
+    sigue así y paga la pérdida de producción). Decisión 2: reparar
+    (vuelve a 0 con probabilidad 0.9, a 1 si no).
+    Con `cuadrillas` solo se admiten las decisiones conjuntas que
+    reparan a lo más esa cantidad de máquinas a la vez.
+    """
+    if n < 2:
+        raise ValueError("Cada máquina necesita al menos 2 estados.")
+    rng = np.random.default_rng(semilla)
+    componentes = []
+    for _ in range(num_maquinas):
+        p = rng.uniform(0.1, 0.4)
+        costo_op = np.linspace(0, rng.uniform(5, 15), n)
+        costo_op[-1] = rng.uniform(50, 80)
+        costo_rep = rng.uniform(20, 40)
+        operar = np.zeros((n, n))
+        for s in range(n - 1):
+            operar[s, s], operar[s, s + 1] = 1 - p, p
+        operar[n - 1, n - 1] = 1.0
+        reparar = np.zeros((n, n))
+        reparar[:, 0], reparar[:, 1] = 0.9, 0.1
+        componentes.append({
+            "problema_tipo": "Minimizar",
+            "num_estados": n,
+            "num_decisiones": 2,
+            "politicas": {1: list(range(n)), 2: list(range(n))},
+            "costos": {1: {s: float(costo_op[s]) for s in range(n)},
+                       2: {s: float(costo_rep) for s in range(n)}},
+            "probabilidades": {1: operar.tolist(), 2: reparar.tolist()},
+        })
+    acciones = None
+    if cuadrillas is not None:
+        acciones = [t for t in itertools.product((1, 2), repeat=num_maquinas)
+                    if t.count(2) <= cuadrillas]
+    return ModeloFactorizado(componentes, acciones)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# algorithms/generadores.py
+
+"""
+Generadores reproducibles de PMD sintéticos para pruebas de desempeño.
+
+Todos devuelven un ModeloPMD y reciben una semilla, de modo que el mismo
+llamado produce siempre el mismo modelo:
+
+  • aleatorio_disperso : n estados, m acciones, `nnz` destinos aleatorios
+                         por fila (cadenas que mezclan rápido)
+  • inventario         : stock 0..S, pedir q unidades, demanda Poisson;
+                         filas con banda (estructura local)
+  • cola               : cola de capacidad N en tiempo discreto, la acción
+                         elige la tasa de servicio (matriz tridiagonal)
+  • denso              : todas las transiciones positivas, el peor caso
+                         para los métodos dispersos
+
+GENERADORES asocia cada nombre con su función; los parámetros comunes son
+(n, m, semilla).
+"""
+
+import math
+import numpy as np
+from scipy import sparse
+from modelo import ModeloPMD
+
+# Cola de la demanda que se desprecia en el inventario
+TOL_DEMANDA = 1e-12
+
+
+def _modelo(n, inicio, acciones, costos, P, problema_tipo="Minimizar"):
+    return ModeloPMD(n, inicio, acciones, costos, P,
+                     problema_tipo=problema_tipo)
+
+
+def aleatorio_disperso(n, m, semilla=0, nnz=5):
+    """PMD con m acciones por estado y `nnz` destinos aleatorios por par."""
+    rng = np.random.default_rng(semilla)
+    pares = n * m
+    nnz = min(nnz, n)
+    columnas = rng.integers(0, n, size=(pares, nnz))
+    valores = rng.random((pares, nnz)) + 1e-3
+    valores /= valores.sum(axis=1, keepdims=True)
+    P = sparse.csr_matrix(
+        (valores.ravel(), columnas.ravel(), np.arange(0, pares * nnz + 1, nnz)),
+        shape=(pares, n))
+    P.sum_duplicates()
+    return _modelo(n, np.arange(0, pares + 1, m), np.tile(np.arange(1, m + 1), n),
+                   rng.uniform(0, 100, pares), P)
+
+
+def _poisson(media, maximo):
+    """pmf de Poisson(media) en 0..maximo, truncada donde la cola < tol."""
+    pmf = []
+    p = math.exp(-media)
+    acumulada = 0.0
+    for d in range(maximo + 1):
+        pmf.append(p)
+        acumulada += p
+        if 1 - acumulada < TOL_DEMANDA:
+            break
+        p *= media / (d + 1)
+    return np.array(pmf)
+
+
+def inventario(n, m, semilla=0, demanda_media=None):
+    """Inventario con capacidad S = n-1 y pedidos q = 0..m-1 (acción q+1).
+
+    El pedido q es factible en el stock s si s + q ≤ S. Con demanda D el
+    siguiente estado es max(s + q – D, 0). Costo esperado por periodo:
+    fijo K si q > 0, c·q, h por unidad sobrante y p por unidad faltante.
+    La semilla solo sortea los coeficientes de costo.
+    """
+    rng = np.random.default_rng(semilla)
+    S = n - 1
+    K, c, h, p = rng.uniform([5, 1, 0.1, 5], [20, 3, 1, 15])
+    media = max(1.0, S / 4) if demanda_media is None else demanda_media
+    pmf = _poisson(media, S + m)
+    dmax = pmf.size - 1
+
+    inicio, acciones, costos = [0], [], []
+    filas, cols, vals = [], [], []
+    k = 0
+    for s in range(n):
+        for q in range(min(m, S - s + 1)):
+            nivel = s + q
+            # Destinos nivel – d para d < nivel; el resto de la masa va a 0
+            d = np.arange(min(nivel, dmax + 1))
+            destinos = nivel - d
+            probs = pmf[d]
+            masa_cero = max(0.0, 1.0 - probs.sum())
+            sobrante = probs @ destinos
+            faltante = max(0.0, media - nivel + sobrante)
+            filas.extend([k] * (destinos.size + 1))
+            cols.extend(destinos.tolist() + [0])
+            vals.extend(probs.tolist() + [masa_cero])
+            costos.append((K if q else 0.0) + c * q + h * sobrante + p * faltante)
+            acciones.append(q + 1)
+            k += 1
+        inicio.append(k)
+    P = sparse.csr_matrix((vals, (filas, cols)), shape=(k, n))
+    P.sum_duplicates()
+    P.eliminate_zeros()
+    return _modelo(n, np.array(inicio), np.array(acciones), np.array(costos), P)
+
+
+def cola(n, m, semilla=0, llegada=0.4):
+    """Cola de capacidad N = n-1; la acción a elige la tasa de servicio μ_a.
+
+    En cada periodo llega un cliente con probabilidad λ = `llegada` y se
+    atiende uno con probabilidad μ_a. Costo: h·s por espera más κ·μ_a por
+    servicio. La semilla sortea las tasas y los coeficientes.
+    """
+    rng = np.random.default_rng(semilla)
+    mu = np.sort(rng.uniform(0.2, 0.95, m))
+    h, kappa = rng.uniform([0.5, 2], [2, 10])
+    lam = llegada
+
+    s = np.repeat(np.arange(n), m)
+    a = np.tile(np.arange(m), n)
+    sube = np.where(s < n - 1, lam * (1 - mu[a]), 0.0)
+    baja = np.where(s > 0, mu[a] * (1 - lam), 0.0)
+    queda = 1.0 - sube - baja
+    pares = n * m
+    k = np.arange(pares)
+    filas = np.concatenate([k, k, k])
+    cols = np.concatenate([s, np.minimum(s + 1, n - 1), np.maximum(s - 1, 0)])
+    P = sparse.csr_matrix((np.concatenate([queda, sube, baja]), (filas, cols)),
+                          shape=(pares, n))
+    P.sum_duplicates()
+    P.eliminate_zeros()
+    return _modelo(n, np.arange(0, pares + 1, m), a + 1, h * s + kappa * mu[a], P)
+
+
+def denso(n, m, semilla=0):
+    """Todas las transiciones positivas (Dirichlet), matriz densa."""
+    rng = np.random.default_rng(semilla)
+    pares = n * m
+    P = rng.gamma(1.0, size=(pares, n)) + 1e-9
+    P /= P.sum(axis=1, keepdims=True)
+    return _modelo(n, np.arange(0, pares + 1, m), np.tile(np.arange(1, m + 1), n),
+                   rng.uniform(0, 100, pares), P)
+
+
+GENERADORES = {
+    "aleatorio": aleatorio_disperso,
+    "inventario": inventario,
+    "cola": cola,
+    "denso": denso,
+}
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# algorithms/grafos.py
+
+"""
+Componentes fuertemente conexas (CFC) de las cadenas de un PMD.
+
+El grafo de una política tiene una arista i → j si P^π[i, j] > 0; el
+grafo unión del PMD, si P_a[i, j] > 0 para alguna a ∈ D(i).
+`Descomposicion` calcula las CFC y las numera en orden de evaluación:
+toda arista va de una componente a sí misma o a otra de número menor, así
+que las primeras son las cerradas (sin aristas de salida) y, al recorrer
+las componentes de 0 a K–1, los sucesores de cada una ya están resueltos.
+Las componentes se agrupan además en niveles (el nivel 0 son las
+cerradas; el nivel L, las que solo salen hacia niveles < L): entre
+componentes del mismo nivel no hay aristas, así que cada nivel es un
+sistema diagonal por bloques.
+
+En el grafo de una política, las CFC cerradas son las clases recurrentes
+y el resto de los estados son transitorios. En el grafo unión:
+
+  • una sola CFC: el PMD es comunicante
+  • varias CFC cerradas: toda política es multicadena (ninguna acción
+    sale de una CFC cerrada, así que cada una contiene al menos una
+    clase recurrente de cualquier política)
+
+Decidir si todas las políticas son unicadena es NP-difícil en general;
+`estructura_modelo` reporta solo lo que garantiza el grafo unión.
+
+`evaluar_bloques` evalúa una política nivel por nivel: cada nivel es un
+sistema del tamaño de sus componentes con el lado derecho ya conocido.
+Sin descuento da la ganancia g_i de cada estado (constante en cada clase
+recurrente; en los transitorios, el promedio de las ganancias de las
+clases a las que llegan) y el sesgo h, con h = 0 en el último estado de
+cada clase recurrente, así que sirve también para cadenas multicadena.
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from modelo import como_modelo
+from sistemas import resolver_sistema
+
+
+def _grafo(P):
+    G = P.tocsr() if hasattr(P, "tocsr") else sparse.csr_matrix(P)
+    G = sparse.csr_matrix(G, copy=True)
+    G.eliminate_zeros()
+    return G
+
+
+class Descomposicion:
+    """CFC de un grafo dirigido de n estados, en orden de evaluación.
+
+    etiqueta[i]: componente del estado i. orden: estados agrupados por
+    componente (la 0 primero, estados crecientes dentro de cada una);
+    orden[limites[c]:limites[c+1]] son los estados de la componente c y
+    orden[limites_nivel[L]:limites_nivel[L+1]] los del nivel L.
+    nivel[c], cerrada[c] (sin aristas de salida) y ciclica[c] (más de un
+    estado o un lazo, es decir, hay que iterar dentro de ella).
+    """
+
+    def __init__(self, P):
+        G = _grafo(P)
+        self.n = n = G.shape[0]
+        num, etiqueta = csgraph.connected_components(G, directed=True,
+                                                     connection="strong")
+        filas = np.repeat(np.arange(n), np.diff(G.indptr))
+        origen, destino = etiqueta[filas], etiqueta[G.indices]
+        sale = origen != destino
+        # Grafo condensado invertido (de cada componente a sus predecesores),
+        # sin aristas repetidas
+        C = sparse.csr_matrix((np.ones(int(sale.sum())),
+                               (destino[sale], origen[sale])), shape=(num, num))
+        C.data[:] = 1.0
+        salidas = np.bincount(C.indices, minlength=num)
+        cerrada = salidas == 0
+
+        # Kahn por niveles, desde las cerradas hacia sus predecesores
+        nivel = np.full(num, -1, dtype=np.int64)
+        frente = np.flatnonzero(cerrada)
+        L = 0
+        while frente.size:
+            nivel[frente] = L
+            previas = C[frente].indices
+            salidas -= np.bincount(previas, minlength=num)
+            frente = np.unique(previas[salidas[previas] == 0])
+            L += 1
+
+        # Renumeración: por nivel y, dentro del nivel, por etiqueta original
+        perm = np.lexsort((np.arange(num), nivel))
+        rango = np.empty(num, dtype=np.int64)
+        rango[perm] = np.arange(num)
+        self.etiqueta = rango[etiqueta]
+        self.num_componentes = num
+        self.nivel = nivel[perm]
+        self.cerrada = cerrada[perm]
+        tamanos = np.bincount(self.etiqueta, minlength=num)
+        lazos = np.bincount(self.etiqueta, weights=G.diagonal() > 0,
+                            minlength=num)
+        self.ciclica = (tamanos > 1) | (lazos > 0)
+        self.orden = np.argsort(self.etiqueta, kind="stable")
+        self.limites = np.concatenate(([0], np.cumsum(tamanos)))
+        self.limites_nivel = self.limites[
+            np.searchsorted(self.nivel, np.arange(L + 1))]
+
+    @property
+    def num_niveles(self):
+        return self.limites_nivel.size - 1
+
+    @property
+    def tamanos(self):
+        return np.diff(self.limites)
+
+    def estados(self, c):
+        """Estados de la componente c."""
+        return self.orden[self.limites[c]:self.limites[c + 1]]
+
+    def estados_nivel(self, L):
+        """Estados de las componentes del nivel L."""
+        return self.orden[self.limites_nivel[L]:self.limites_nivel[L + 1]]
+
+    @property
+    def clases_recurrentes(self):
+        """Estados de cada componente cerrada."""
+        return [self.estados(c) for c in np.flatnonzero(self.cerrada)]
+
+    @property
+    def transitorios(self):
+        return np.flatnonzero(~self.cerrada[self.etiqueta])
+
+    @property
+    def es_unicadena(self):
+        return int(self.cerrada.sum()) == 1
+
+    def resumen(self):
+        """Diccionario con los tamaños de la descomposición."""
+        return {
+            "estados": self.n,
+            "componentes": self.num_componentes,
+            "niveles": self.num_niveles,
+            "cerradas": int(self.cerrada.sum()),
+            "transitorios": int(self.transitorios.size),
+            "tam_max": int(self.tamanos.max(initial=0)),
+            "ciclicas": int(self.ciclica.sum()),
+        }
+
+
+def descomponer(P):
+    """Descomposicion en CFC de la matriz (n × n) P."""
+    return Descomposicion(P)
+
+
+def grafo_union(datos):
+    """Matriz n × n con la probabilidad sumada sobre todas las acciones de
+    cada estado (su patrón es el grafo unión del PMD)."""
+    modelo = como_modelo(datos)
+    S = sparse.csr_matrix((np.ones(modelo.num_pares),
+                           (modelo.estados, np.arange(modelo.num_pares))),
+                          shape=(modelo.n, modelo.num_pares))
+    return (S @ modelo.matriz_csr()).tocsr()
+
+
+def estructura_politica(datos, pol):
+    """Descomposición del grafo de la política `pol`."""
+    modelo = como_modelo(datos)
+    return Descomposicion(modelo.matriz_politica(pol))
+
+
+def estructura_modelo(datos):
+    """Reporte del grafo unión: resumen de la descomposición más
+    comunicante, multicadena (toda política lo es) y las CFC cerradas."""
+    desc = Descomposicion(grafo_union(datos))
+    cerradas = desc.clases_recurrentes
+    return dict(desc.resumen(), comunicante=desc.num_componentes == 1,
+                multicadena=len(cerradas) > 1, clases_cerradas=cerradas,
+                descomposicion=desc)
+
+
+def orden_barrido(datos):
+    """Estados del PMD en orden de evaluación del grafo unión (para los
+    barridos de Gauss-Seidel: cada estado después de sus sucesores en
+    otras componentes)."""
+    return Descomposicion(grafo_union(datos)).orden
+
+
+# ----------------------------------------------------------------------
+# Evaluación por bloques
+# ----------------------------------------------------------------------
+def _resolver_nivel(PSS, factor, b):
+    """x con (I – factor·P_SS) x = b; directo si P_SS es diagonal."""
+    diagonal = PSS.diagonal()
+    if PSS.nnz == np.count_nonzero(diagonal):
+        return b / (1.0 - factor * diagonal)
+    A = sparse.identity(PSS.shape[0], format="csr") - factor * PSS
+    return resolver_sistema(A, b)
+
+
+def _clase_recurrente(PCC, cC):
+    """(g, h) de una clase recurrente: (I – P) h + g·1 = c, h_último = 0."""
+    m = PCC.shape[0]
+    A = sparse.identity(m, format="csr") - PCC
+    A = sparse.hstack([A[:, :m - 1], np.ones((m, 1))], format="csr")
+    x = resolver_sistema(A, cC)
+    return float(x[-1]), np.append(x[:m - 1], 0.0)
+
+
+def evaluar_bloques(datos, pol, alpha=None):
+    """Evalúa `pol` nivel por nivel en el orden de sus CFC.
+
+    Con descuento devuelve v = (I – αP^π)⁻¹ c^π; sin descuento (alpha
+    None), la ganancia g por estado y el sesgo en "v". El diccionario
+    trae además la descomposición, los sistemas resueltos y el tamaño
+    del mayor.
+    """
+    modelo = como_modelo(datos)
+    P = _grafo(modelo.matriz_politica(pol)).astype(np.float64)
+    c = np.asarray(modelo.costos_politica(pol), dtype=np.float64)
+    desc = Descomposicion(P)
+    v = np.zeros(modelo.n)
+    g = None if alpha is not None else np.zeros(modelo.n)
+    sistemas = 0
+
+    for L in range(desc.num_niveles):
+        S = desc.estados_nivel(L)
+        filas = P[S]
+        PSS = filas[:, S]
+        # v y g aún valen 0 en S: filas @ v es la parte ya resuelta
+        if alpha is not None:
+            v[S] = _resolver_nivel(PSS, alpha, c[S] + alpha * (filas @ v))
+        elif L == 0:
+            # Estados absorbentes: g = c, h = 0; el resto, clase por clase
+            g[S] = c[S]
+            for k in np.flatnonzero(desc.cerrada & (desc.tamanos > 1)):
+                C = desc.estados(k)
+                g[C], v[C] = _clase_recurrente(P[C][:, C], c[C])
+        else:
+            g[S] = _resolver_nivel(PSS, 1.0, filas @ g)
+            v[S] = _resolver_nivel(PSS, 1.0, c[S] - g[S] + filas @ v)
+        sistemas += 1
+
+    return {"v": v, "g": g, "descomposicion": desc, "sistemas": sistemas,
+            "tam_max": int(desc.tamanos.max(initial=0))}
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# algorithms/horizonte_finito.py
+
+"""
+Inducción hacia atrás para PMD de horizonte finito con datos por etapa.
+
+Con etapas t = 0, …, T–1, costos c^t y transiciones P^t propios de cada
+etapa y un valor terminal v_T (cero por omisión):
+
+  v_t(i) = min_{a∈D_t(i)} [ c^t_{i,a} + α Σ_j P^t_a[i,j] · v_{t+1}(j) ]
+  d_t(i) = argmin (empates: primera decisión de D_t(i))
+
+(o max si el problema es de maximizar). Cada etapa es un ModeloPMD (o el
+diccionario de `read.py`) con los mismos n estados; el backup es el de
+`bellman.py`: un producto matriz-vector y la reducción segmentada.
+
+Las etapas se leen de a una, de T–1 a 0, y se sueltan después de usarlas,
+así que la memoria es la de una etapa más el vector de valores actual,
+sin importar T. Pueden venir de:
+
+  • un directorio escrito con `guardar_etapas` (cada etapa en el formato
+    de `archivo.py`, abierta con memory-map)
+  • una función t → modelo, que puede generarlas al vuelo
+  • un iterable que las entrega en orden inverso (T–1 primero)
+
+Las reglas de decisión d_t se escriben en un .npy de T × n, uint8 si las
+etiquetas caben (≤ 255) y uint16 si no, abierto con memory-map: cada
+etapa se escribe en su fila y no queda en memoria.
+"""
+
+import json
+import os
+import time
+import numpy as np
+from numpy.lib.format import open_memmap
+from modelo import como_modelo
+from bellman import q_valores, reducir, argoptimo
+from archivo import guardar_modelo, cargar_modelo, leer_cabecera
+from traza import como_traza, evento
+
+HORIZONTE = "horizonte.json"
+
+
+def tipo_reglas(num_decisiones):
+    """uint8 o uint16 según la etiqueta de decisión más grande."""
+    if num_decisiones <= np.iinfo(np.uint8).max:
+        return np.uint8
+    if num_decisiones <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.int32
+
+
+def _ruta_etapa(ruta, t):
+    return os.path.join(ruta, f"etapa_{t:05d}")
+
+
+def guardar_etapas(ruta, etapas, precision=None):
+    """Escribe en `ruta` las etapas 0, 1, … que entrega el iterable.
+
+    Cada etapa se guarda apenas se recibe (no se acumulan en memoria).
+    Devuelve el número de etapas.
+    """
+    os.makedirs(ruta, exist_ok=True)
+    n, m, T = None, 0, 0
+    for t, datos in enumerate(etapas):
+        modelo = como_modelo(datos)
+        if n is None:
+            n = modelo.n
+        elif modelo.n != n:
+            raise ValueError(f"La etapa {t} tiene {modelo.n} estados, no {n}.")
+        guardar_modelo(_ruta_etapa(ruta, t), modelo, precision)
+        m = max(m, modelo.num_decisiones)
+        T = t + 1
+    with open(os.path.join(ruta, HORIZONTE), "w", encoding="utf-8") as f:
+        json.dump({"etapas": T, "num_estados": n, "num_decisiones": m,
+                   "problema_tipo": modelo.problema_tipo if T else None},
+                  f, indent=2, ensure_ascii=False)
+    return T
+
+
+def leer_horizonte(ruta):
+    with open(os.path.join(ruta, HORIZONTE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _fuente(etapas, horizonte):
+    """(T, iterador de (t, modelo) de T–1 a 0, máximo de decisiones o None)."""
+    if isinstance(etapas, (str, os.PathLike)):
+        ruta = os.fspath(etapas)
+        info = leer_horizonte(ruta)
+        T = info["etapas"] if horizonte is None else horizonte
+        if T > info["etapas"]:
+            raise ValueError(f"{ruta} tiene {info['etapas']} etapas, no {T}.")
+        m = max(leer_cabecera(_ruta_etapa(ruta, t))["num_decisiones"]
+                for t in range(T)) if T else 0
+        return T, ((t, cargar_modelo(_ruta_etapa(ruta, t)))
+                   for t in range(T - 1, -1, -1)), m
+    if horizonte is None:
+        raise ValueError("Hace falta el horizonte T.")
+    if callable(etapas):
+        return horizonte, ((t, etapas(t)) for t in range(horizonte - 1, -1, -1)), None
+    return horizonte, zip(range(horizonte - 1, -1, -1), etapas), None
+
+
+def induccion_hacia_atras(etapas, salida, horizonte=None, v_final=None,
+                          alpha=1.0, num_decisiones=None, traza=None):
+    """Resuelve el PMD de horizonte finito por inducción hacia atrás.
+
+    etapas: directorio de `guardar_etapas`, función t → modelo o iterable
+    en orden inverso. salida: ruta del .npy (T × n) con las reglas d_t.
+    num_decisiones fija el tipo de las reglas cuando las etapas no se
+    conocen de antemano (por omisión, el de la última etapa; si una
+    etapa anterior tiene etiquetas más grandes se lanza ValueError).
+
+    Devuelve un diccionario con v (valores de la etapa 0), reglas (el
+    memmap de solo lectura), etapas, tiempo (s) y la ruta de salida.
+    Cada etapa emite a `traza` un evento "hf" con iteracion = t.
+    """
+    T, iterador, m = _fuente(etapas, horizonte)
+    if T < 1:
+        raise ValueError("El horizonte debe tener al menos una etapa.")
+    m = num_decisiones if num_decisiones is not None else m
+    traza = como_traza(traza)
+    traza.inicio("hf", {"etapas": T, "alpha": alpha})
+
+    t0 = time.perf_counter()
+    reglas = None
+    v = None if v_final is None else np.array(v_final, dtype=np.float64)
+    esperada = T - 1
+    for t, datos in iterador:
+        if t != esperada:
+            raise ValueError(f"Se esperaba la etapa {esperada} y llegó la {t}.")
+        modelo = como_modelo(datos)
+        if reglas is None:
+            n = modelo.n
+            tipo = tipo_reglas(m if m is not None else modelo.num_decisiones)
+            reglas = open_memmap(salida, mode="w+", dtype=tipo, shape=(T, n))
+            if v is None:
+                v = np.zeros(n)
+        if modelo.n != reglas.shape[1] or v.shape != (modelo.n,):
+            raise ValueError(f"La etapa {t} tiene {modelo.n} estados, "
+                             f"no {reglas.shape[1]}.")
+        if modelo.num_decisiones > np.iinfo(reglas.dtype).max:
+            raise ValueError(f"La etapa {t} tiene decisiones hasta "
+                             f"{modelo.num_decisiones}; pase num_decisiones.")
+
+        # Backup de Bellman de la etapa (mismo motor que en horizonte infinito)
+        q = q_valores(modelo, v, alpha)
+        mejor = reducir(modelo, q)
+        reglas[t] = modelo.acciones[argoptimo(modelo, q, mejor)]
+        v = mejor
+        del modelo, q
+        if traza.activa:
+            traza.iteracion(evento("hf", t, t0,
+                                   valores=v if traza.valores else None))
+        esperada -= 1
+
+    if esperada != -1:
+        raise ValueError(f"Faltan las etapas 0..{esperada}.")
+    reglas.flush()
+    del reglas
+    tiempo = time.perf_counter() - t0
+    traza.fin({"metodo": "hf", "iteraciones": T, "tiempo": tiempo,
+               "convergio": True})
+    return {
+        "v": v,
+        "reglas": np.load(salida, mmap_mode="r"),
+        "etapas": T,
+        "tiempo": tiempo,
+        "salida": salida,
+    }
+
+
+def valor_reglas(etapas, reglas, horizonte=None, v_final=None, alpha=1.0):
+    """Valor esperado de aplicar las reglas d_0…d_{T–1} (también por
+    etapas, hacia atrás). Sirve para comparar reglas distintas."""
+    T, iterador, _ = _fuente(etapas, horizonte)
+    reglas = np.load(reglas, mmap_mode="r") if isinstance(reglas, str) else reglas
+    v = None if v_final is None else np.array(v_final, dtype=np.float64)
+    for t, datos in iterador:
+        modelo = como_modelo(datos)
+        v = np.zeros(modelo.n) if v is None else v
+        idx = modelo.indices_politica(reglas[t])
+        v = modelo.costos[idx] + alpha * np.asarray(modelo.P[idx] @ v).ravel()
+    return v
@@ -1,7 +1,10 @@
-import os 
+import sys
 
-def limpiar_pantalla():
-    
-    comando = 'cls' if os.name == 'nt' else 'clear'
+# Cursor al inicio y borrado de pantalla (VT100; Windows 10+ lo entiende)
+BORRAR = "\033[H\033[2J"
 
-    os.system(comando)
+def limpiar_pantalla():
+    # Sin lanzar un shell; solo si la salida es una terminal
+    if sys.stdout.isatty():
+        sys.stdout.write(BORRAR)
+        sys.stdout.flush()
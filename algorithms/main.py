@@ -1,17 +1,279 @@
 #!/usr/bin/env python3
 # algorithms/main.py
 
+"""
+Menú interactivo. Lee los parámetros de cada método por teclado, llama a
+la función correspondiente de `api.py` con una traza que imprime cada
+iteración y muestra el Resultado. Los motores no leen ni imprimen nada.
+"""
+
+import sys
+import numpy as np
 from read import leer_datos_manualmente
-from enumeration import metodo_enumeracion
-from pro_lineal import metodo_programacion_lineal
-from pol_mejoradas import metodo_policy_improvement
-from pol_mejoradas import metodo_policy_improvement_desc
-from aproximaciones import metodo_value_iteration
+from lim_pant import limpiar_pantalla
+from modelo import ModeloPMD, como_modelo
+from archivo import cargar_modelo, validar_modelo
+from traza import TrazaImpresora
+from estacionaria import CadenaMulticadenaError
+from aproximaciones import VARIANTES, CRITERIOS
+from pro_lineal import lineas_valores_y
+from api import (resolver_enumeracion, resolver_lp, resolver_pi,
+                 resolver_pi_desc, resolver_vi, resolver_rvi, resolver_barrido,
+                 validar_politica)
+
+
+# ----------------------------------------------------------------------
+# Lectura de parámetros
+# ----------------------------------------------------------------------
+def _leer(mensaje, convertir, valido, error, defecto=None):
+    while True:
+        try:
+            entrada = input(mensaje).strip()
+            valor = convertir(entrada) if entrada or defecto is None else defecto
+            if valido(valor):
+                return valor
+        except:
+            pass
+        print(error)
+
+
+def leer_alpha():
+    return _leer("Ingrese factor de descuento α (0 ≤ α < 1): ", float,
+                 lambda a: 0 <= a < 1, "α inválido; debe ser 0 ≤ α < 1.")
+
+
+def leer_iter_max():
+    return _leer("Ingrese número máximo de iteraciones: ", int,
+                 lambda k: k > 0, "iter_max inválido; debe ser entero positivo.")
+
+
+def leer_tol():
+    return _leer("Ingrese tolerancia tol (>0): ", float,
+                 lambda t: t > 0, "tol inválida; debe ser número positivo.")
+
+
+def leer_alphas():
+    """Lista de α separados por coma, o una malla inicio:fin:cantidad."""
+    def convertir(entrada):
+        if ":" in entrada:
+            inicio, fin, cantidad = entrada.split(":")
+            return np.linspace(float(inicio), float(fin), int(cantidad))
+        return np.array([float(a) for a in entrada.split(",")])
+    return _leer("Factores α (ej: 0.5,0.9,0.95 o 0.5:0.99:50): ", convertir,
+                 lambda a: a.size > 0 and a.min() >= 0 and a.max() < 1,
+                 "α inválidos; cada uno debe cumplir 0 ≤ α < 1.")
+
+
+def leer_politica(modelo):
+    while True:
+        entrada = input(f"Ingrese política inicial ({modelo.n} acciones, coma-sep.): ")
+        try:
+            return validar_politica(modelo, entrada.split(","))
+        except:
+            print("Política inválida, inténtalo de nuevo.")
+
+
+def _leer_opcion(mensaje, opciones, defecto, error):
+    opcion = input(f"{mensaje} {opciones} [{defecto}]: ").strip().lower() or defecto
+    while opcion not in opciones:
+        opcion = input(f"{error} {opciones}: ").strip().lower()
+    return opcion
+
+
+def _imprimir_costo_medio(res):
+    if res.aviso:
+        print(f"\n{res.aviso}")
+    else:
+        print(f"\nCosto medio E[C_(R)] = {res.g:.6f}")
+
+
+# ----------------------------------------------------------------------
+# Métodos del menú
+# ----------------------------------------------------------------------
+def metodo_enumeracion(datos, k=10, procesos=1, podar=True):
+    limpiar_pantalla()
+    print("\n=== ENUMERACIÓN EXHAUSTIVA DE POLÍTICAS ===\n")
+    res = resolver_enumeracion(datos, k=k, procesos=procesos, podar=podar)
+    if res.politica is None:
+        print(res.aviso)
+        return res
+
+    stats = res.estadisticas
+    print(f"Las {len(res.mejores)} mejores de {stats['total']} políticas:\n")
+    for pol, pi, g in res.mejores:
+        print(f"Política: {pol}")
+        print("  π =", np.round(pi, 6).tolist())
+        print(f"  Costo medio = {g:.6f}\n")
+    print(f"Evaluadas: {stats['evaluadas']} | Podadas: {stats['podadas']}"
+          f" | Omitidas (no unicadena): {stats['singulares']}"
+          f" | Cotas LP: {stats['cotas_lp']}\n")
+
+    print("="*60)
+    print("POLÍTICA ÓPTIMA".center(60))
+    print("="*60)
+    print(f"R* = {res.politica}")
+    print("π* =", np.round(res.pi, 6).tolist())
+    print(f"E(C_{{R*}}) = {res.g:.6f}\n")
+    return res
+
+
+def metodo_programacion_lineal(datos, backend="auto", traza=None):
+    limpiar_pantalla()
+    modelo = como_modelo(datos)
+    traza = traza or TrazaImpresora()
+
+    res = resolver_lp(modelo, backend, traza)
+    print(f"\nEstado de la solución: {res.estado}\n")
+    traza.detalle("lp", lambda: lineas_valores_y(modelo, res.y))
+
+    print("\n" + "=" * 60)
+    print("POLÍTICA ÓPTIMA (LP)".center(60))
+    print("=" * 60)
+    print(f"R* = {res.politica}")
+    print("π* =", [round(v, 6) for v in res.pi.tolist()])
+    print(f"E(C_{{R*}}) = {res.g:.6f}\n")
+    return res
+
+
+def _imprimir_pi(res, titulo):
+    print(f"\nConvergió en {res.iteraciones} iteraciones "
+          f"({res.refactorizaciones} factorizaciones, "
+          f"{res.actualizaciones} actualizaciones de rango bajo).")
+    print(f"Política Óptima ({titulo}):", res.politica)
+
+
+def metodo_policy_improvement(datos, traza=None):
+    limpiar_pantalla()
+    """Mejoramiento de Políticas SIN descuento."""
+    modelo = como_modelo(datos)
+    pol = leer_politica(modelo)
+
+    try:
+        res = resolver_pi(modelo, pol, traza=traza or TrazaImpresora())
+    except CadenaMulticadenaError as e:
+        print(f"\n{e} Sin descuento el método supone cadenas unicadena.")
+        return None
+    _imprimir_pi(res, "sin descuento")
+    print(f" g* = {res.g:.6f}")
+    for i, vi in enumerate(res.v):
+        print(f" v*_{i} = {vi:.6f}")
+    _imprimir_costo_medio(res)
+    return res
+
+
+def metodo_policy_improvement_desc(datos, traza=None):
+    limpiar_pantalla()
+    """Mejoramiento de Políticas CON descuento."""
+    modelo = como_modelo(datos)
+    alpha = leer_alpha()
+    pol = leer_politica(modelo)
+
+    res = resolver_pi_desc(modelo, alpha, pol, traza=traza or TrazaImpresora())
+    _imprimir_pi(res, "con descuento")
+    print("Valores finales v*: ")
+    for i, vi in enumerate(res.v):
+        print(f" v*_{i} = {vi:.6f}")
+    _imprimir_costo_medio(res)
+    return res
+
+
+def metodo_value_iteration(datos, traza=None):
+    limpiar_pantalla()
+    modelo = como_modelo(datos)
+
+    # 1) Leer α, iter_max, tol, variante y criterio
+    alpha = leer_alpha()
+    iter_max = leer_iter_max()
+    tol = leer_tol()
+    variante = _leer_opcion("Variante", VARIANTES, "jacobi",
+                            "Variante inválida; elija una de")
+    k_parcial = 5
+    if variante == "mpi":
+        k_parcial = _leer("Barridos de evaluación parcial k [5]: ", int,
+                          lambda k: k >= 0,
+                          "k inválido; debe ser entero no negativo.", defecto=5)
+    criterio = _leer_opcion("Criterio de paro", CRITERIOS, "sup",
+                            "Criterio inválido; elija uno de")
+
+    # 2) Iterar desde v = 0 (por defecto se imprime cada iteración)
+    res = resolver_vi(modelo, alpha, tol, iter_max, variante, criterio,
+                      k_parcial, traza=traza or TrazaImpresora())
+    if res.convergio:
+        print(f"\nConvergió por tol={tol} en {res.iteraciones} iteraciones.")
+    else:
+        print(f"\nAlcanzado iter_max={iter_max} sin converger.")
+    print(f"Variante {variante}: {res.iteraciones} iteraciones, "
+          f"{res.backups} actualizaciones de estado, {res.tiempo:.4f} s")
+    print(f"La política es ε-óptima con ε = {res.epsilon:.6g}")
+
+    # 3) Política lograda
+    print("\nLa política resultante es:", res.politica)
+    print("Valores finales v*:")
+    for i, vi in enumerate(res.v):
+        print(f" v*_{i} = {vi:.6f}")
+    _imprimir_costo_medio(res)
+    return res
+
+
+def metodo_value_iteration_relativa(datos, traza=None):
+    limpiar_pantalla()
+    """Iteración de valores relativos (costo medio)."""
+    modelo = como_modelo(datos)
+    iter_max = leer_iter_max()
+    tol = leer_tol()
+    tau = _leer("Factor de aperiodicidad τ (0 < τ ≤ 1) [1]: ", float,
+                lambda t: 0 < t <= 1, "τ inválido; debe ser 0 < τ ≤ 1.",
+                defecto=1.0)
+
+    res = resolver_rvi(modelo, tol, iter_max, tau,
+                       traza=traza or TrazaImpresora())
+    if res.convergio:
+        print(f"\nConvergió en {res.iteraciones} iteraciones "
+              f"({res.tiempo:.4f} s).")
+    else:
+        print(f"\nAlcanzado iter_max={iter_max} sin converger.")
+    print("Política Óptima (valores relativos):", res.politica)
+    print(f" g* = {res.g:.6f}")
+    for i, vi in enumerate(res.v):
+        print(f" v*_{i} = {vi:.6f}")
+    return res
+
+
+def metodo_barrido_alpha(datos):
+    limpiar_pantalla()
+    """Barrido de factores de descuento (iteración de políticas en caliente)."""
+    modelo = como_modelo(datos)
+    alphas = leer_alphas()
+    res = resolver_barrido(modelo, alphas, "pi", tol_quiebre=1e-6)
+
+    print(f"\n{'α':>10}  {'iter':>5}  política óptima")
+    for alpha, it, pol in zip(res.alphas, res.iteraciones, res.politicas):
+        print(f"{alpha:>10.6f}  {it:>5}  {pol}")
+    if res.quiebres:
+        print("\nCambios de la política óptima:")
+        for a, b, izq, der in res.quiebres:
+            estados = [i for i, (x, y) in enumerate(zip(izq, der)) if x != y]
+            print(f"  α ∈ ({a:.6f}, {b:.6f}): cambian los estados {estados}")
+    else:
+        print("\nLa política óptima es la misma para todos los α.")
+    print(f"\n{res.iteraciones.sum()} iteraciones en total, {res.tiempo:.4f} s")
+    return res
 
 
 def main():
-    print("=== LECTURA DE DATOS PARA PMD ===\n")
-    datos = leer_datos_manualmente()
+    if len(sys.argv) > 1:
+        # python main.py <directorio del modelo guardado con archivo.py>
+        print(f"=== CARGA DEL MODELO {sys.argv[1]} ===\n")
+        datos = cargar_modelo(sys.argv[1], verificar=False)
+        problemas = validar_modelo(datos)
+        for problema, indices in problemas.items():
+            print(f"Advertencia: {problema} ({indices.size}): {indices[:10].tolist()}")
+        if "estados_sin_decisiones" in problemas:
+            print("El modelo no se puede resolver: hay estados sin decisiones.")
+            sys.exit(1)
+    else:
+        print("=== LECTURA DE DATOS PARA PMD ===\n")
+        datos = ModeloPMD.desde_datos(leer_datos_manualmente())
 
     while True:
         print("\n=== MENÚ PRINCIPAL ===")
@@ -20,6 +282,8 @@ def main():
         print("3) Mejoramiento de políticas")
         print("4) Mejoramiento de políticas con descuento")
         print("5) Aproximaciones sucesivas")
+        print("6) Iteración de valores relativos (costo medio)")
+        print("7) Barrido de factores de descuento α")
         print("Q) Salir")
         opc = input("Elige una opción: ").strip().lower()
 
@@ -33,6 +297,10 @@ def main():
             metodo_policy_improvement_desc(datos)
         elif opc == '5':
             metodo_value_iteration(datos)
+        elif opc == '6':
+            metodo_value_iteration_relativa(datos)
+        elif opc == '7':
+            metodo_barrido_alpha(datos)
         elif opc in ('q', 'salir'):
             print("¡Hasta luego!")
             break
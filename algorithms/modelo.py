@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# algorithms/modelo.py
+
+"""
+Modelo compacto de un PMD indexado por pares estado-acción.
+
+En lugar del diccionario anidado que devuelve `leer_datos_manualmente`,
+cada par factible (i, a) ocupa una fila k de un índice plano al estilo CSR:
+
+    inicio[i] ≤ k < inicio[i+1]   ⇔   el par k pertenece al estado i
+
+Sobre ese índice viven:
+  • acciones[k] : etiqueta de la decisión a (la misma que en `politicas`)
+  • estados[k]  : estado i al que pertenece el par
+  • costos[k]   : c_{i,a}
+  • P[k, :]     : fila de transición P_a[i, :] (matriz densa, CSR de scipy
+                  o `compacto.MatrizCompacta` con float32 e índices uint16)
+
+Los pares (i, a) infactibles no se almacenan. El orden de las acciones
+dentro de cada estado es el de `politicas`, de modo que D(i) coincide con
+el que construían los métodos a mano.
+"""
+
+import hashlib
+import numpy as np
+from scipy import sparse
+
+# Por debajo de este número de estados, o por encima de esta densidad,
+# conviene guardar la matriz de transición densa.
+N_DENSO_MAX = 2000
+DENSIDAD_DENSA = 0.1
+
+
+class ModeloPMD:
+    """PMD con índice plano de pares estado-acción y un único tensor P."""
+
+    def __init__(self, num_estados, inicio, acciones, costos, P,
+                 problema_tipo="Minimizar", num_decisiones=None,
+                 verificar=True):
+        self.n = int(num_estados)
+        self.inicio = np.asarray(inicio, dtype=np.int64)
+        self.acciones = np.asarray(acciones, dtype=np.int64)
+        self.costos = np.asarray(costos)
+        if self.costos.dtype not in (np.float32, np.float64):
+            self.costos = self.costos.astype(np.float64)
+        self.P = P
+        self.problema_tipo = problema_tipo
+        self.maximizar = problema_tipo.lower().startswith("max")
+        self.num_decisiones = (int(self.acciones.max(initial=0))
+                               if num_decisiones is None
+                               else int(num_decisiones))
+        self._estados = None
+        self._tabla = None
+        self._huella = None
+
+        if self.inicio.shape != (self.n + 1,) or self.inicio[0] != 0:
+            raise ValueError("inicio debe tener n+1 entradas y empezar en 0.")
+        # verificar=False solo para `archivo.validar_modelo`, que reporta
+        # estos estados en lugar de abortar
+        if verificar and np.any(np.diff(self.inicio) == 0):
+            vacios = np.flatnonzero(np.diff(self.inicio) == 0).tolist()
+            raise ValueError(f"Estados sin decisiones viables: {vacios}")
+        if P.shape != (self.num_pares, self.n):
+            raise ValueError("P debe tener forma (pares, estados).")
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+    @classmethod
+    def desde_datos(cls, datos, formato="auto", verificar=True):
+        """Construye el modelo a partir del diccionario de `read.py`.
+
+        formato: "denso", "disperso" o "auto" (según tamaño y densidad).
+        """
+        n = datos["num_estados"]
+        politicas = datos["politicas"]
+        costos = datos["costos"]
+        probs = datos["probabilidades"]
+
+        # D(i) en el mismo orden en que lo construían los métodos
+        D = {i: [] for i in range(n)}
+        for a, estados in politicas.items():
+            for i in estados:
+                D[i].append(a)
+
+        inicio = np.zeros(n + 1, dtype=np.int64)
+        inicio[1:] = np.cumsum([len(D[i]) for i in range(n)])
+        acciones = [a for i in range(n) for a in D[i]]
+        cvec = [costos[a][i] for i in range(n) for a in D[i]]
+        filas = [probs[a][i] for i in range(n) for a in D[i]]
+
+        P = np.array(filas, dtype=float).reshape(len(filas), n)
+        if formato == "auto":
+            densidad = np.count_nonzero(P) / max(P.size, 1)
+            formato = ("denso" if n <= N_DENSO_MAX or densidad > DENSIDAD_DENSA
+                       else "disperso")
+        if formato == "disperso":
+            P = sparse.csr_matrix(P)
+        elif formato != "denso":
+            raise ValueError(f"Formato desconocido: {formato}")
+
+        return cls(n, inicio, acciones, cvec, P,
+                   problema_tipo=datos["problema_tipo"],
+                   num_decisiones=datos.get("num_decisiones"),
+                   verificar=verificar)
+
+    def a_datos(self):
+        """Devuelve el diccionario con la forma de `leer_datos_manualmente`."""
+        n = self.n
+        politicas = {j: [] for j in range(1, self.num_decisiones + 1)}
+        costos = {j: {} for j in range(1, self.num_decisiones + 1)}
+        probabilidades = {j: [[0.0] * n for _ in range(n)]
+                          for j in range(1, self.num_decisiones + 1)}
+        for k in range(self.num_pares):
+            i, a = int(self.estados[k]), int(self.acciones[k])
+            politicas[a].append(i)
+            costos[a][i] = float(self.costos[k])
+            probabilidades[a][i] = self.fila(k).tolist()
+        return {
+            "problema_tipo": self.problema_tipo,
+            "num_estados": n,
+            "num_decisiones": self.num_decisiones,
+            "politicas": politicas,
+            "costos": costos,
+            "probabilidades": probabilidades,
+        }
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    @property
+    def num_pares(self):
+        return int(self.inicio[-1])
+
+    @property
+    def estados(self):
+        """Estado i de cada par k (se calcula al primer uso)."""
+        if self._estados is None:
+            self._estados = np.repeat(np.arange(self.n), np.diff(self.inicio))
+        return self._estados
+
+    @property
+    def es_disperso(self):
+        """True si P es CSR (de scipy o compacta), False si es densa."""
+        return not isinstance(self.P, np.ndarray)
+
+    def matriz_csr(self):
+        """P como csr_matrix de scipy (float64 si estaba compactada)."""
+        if isinstance(self.P, np.ndarray):
+            return sparse.csr_matrix(self.P)
+        return self.P.tocsr()
+
+    def huella(self):
+        """SHA-256 del contenido en forma canónica (P como CSR ordenada);
+        modelos iguales escritos de otra forma tienen la misma huella. Se
+        calcula al primer uso: el modelo no debe modificarse después."""
+        if self._huella is None:
+            P = self.matriz_csr().astype(np.float64, copy=True)
+            P.sum_duplicates()
+            P.eliminate_zeros()
+            P.sort_indices()
+            h = hashlib.sha256()
+            h.update(f"{'max' if self.maximizar else 'min'}|{self.n}|".encode())
+            for arr, dtype in ((self.inicio, np.int64), (self.acciones, np.int64),
+                               (self.costos, np.float64), (P.indptr, np.int64),
+                               (P.indices, np.int64), (P.data, np.float64)):
+                h.update(np.ascontiguousarray(arr, dtype=dtype).tobytes())
+                h.update(b"|")
+            self._huella = h.hexdigest()
+        return self._huella
+
+    def submodelo(self, pares):
+        """Modelo con solo los pares k de `pares` (ordenados, al menos uno
+        por estado); conserva estados y etiquetas de decisión."""
+        pares = np.asarray(pares, dtype=np.int64)
+        inicio = np.zeros(self.n + 1, dtype=np.int64)
+        inicio[1:] = np.cumsum(np.bincount(self.estados[pares], minlength=self.n))
+        return ModeloPMD(self.n, inicio, self.acciones[pares],
+                         self.costos[pares], self.P[pares],
+                         problema_tipo=self.problema_tipo,
+                         num_decisiones=self.num_decisiones)
+
+    def decisiones(self, i):
+        """D(i): lista de decisiones viables en el estado i."""
+        return self.acciones[self.inicio[i]:self.inicio[i + 1]].tolist()
+
+    def pares(self, i):
+        """Rango de filas k del estado i."""
+        return range(self.inicio[i], self.inicio[i + 1])
+
+    def fila(self, k):
+        """Fila de transición densa del par k."""
+        if self.es_disperso:
+            return self.P.getrow(k).toarray().ravel()
+        return self.P[k]
+
+    def tabla_indices(self):
+        """Tabla n × (m+1) con el par k de (i, a), o -1 si no es viable."""
+        if self._tabla is None:
+            tabla = np.full((self.n, self.num_decisiones + 1), -1, dtype=np.int64)
+            tabla[self.estados, self.acciones] = np.arange(self.num_pares)
+            self._tabla = tabla
+        return self._tabla
+
+    def indices_politica(self, pol):
+        """Índices k de los pares (i, pol[i]); valida que sean viables."""
+        pol = np.asarray(pol, dtype=np.int64)
+        if pol.shape != (self.n,):
+            raise ValueError(f"La política debe tener {self.n} acciones.")
+        if np.any(pol < 0) or np.any(pol > self.num_decisiones):
+            raise ValueError("Política con decisiones fuera de rango.")
+        idx = self.tabla_indices()[np.arange(self.n), pol]
+        if np.any(idx < 0):
+            raise ValueError("Política con decisiones no viables.")
+        return idx
+
+    def matriz_politica(self, pol, densa=False):
+        """P^pol (n × n), densa o dispersa según el modelo (o densa si se pide)."""
+        Ppol = self.P[self.indices_politica(pol)]
+        if densa and sparse.issparse(Ppol):
+            return Ppol.toarray()
+        return Ppol
+
+    def costos_politica(self, pol):
+        """Vector c^pol (n,)."""
+        return self.costos[self.indices_politica(pol)]
+
+    def producto(self, v):
+        """P·v sobre todos los pares estado-acción (vector de longitud pares)."""
+        return np.asarray(self.P @ v).ravel()
+
+
+def como_modelo(datos):
+    """Acepta el diccionario de `read.py` o un ModeloPMD ya construido."""
+    if isinstance(datos, ModeloPMD):
+        return datos
+    return ModeloPMD.desde_datos(datos)
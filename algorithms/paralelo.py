@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# algorithms/paralelo.py
+
+"""
+Aproximaciones sucesivas en varios procesos con memoria compartida.
+
+Los estados se reparten en bloques contiguos, uno por proceso, y cada
+proceso hace el backup de Bellman de sus estados (sus filas de P, un
+producto disperso o denso y una reducción segmentada). Todo lo que se
+lee o escribe en las iteraciones vive en `multiprocessing.shared_memory`:
+
+  • costos, inicio y P (CSR: data/indices/indptr, o la matriz densa),
+    copiados una sola vez al arrancar;
+  • el vector de valores, en dos búferes que se alternan;
+  • las estadísticas de cada bloque (min d, max d, max |d|) con las que
+    todos los procesos deciden el paro sin pasar por el principal;
+  • la política (índice del par óptimo de cada estado).
+
+Así en cada iteración no se serializa nada: el único punto de
+sincronización es una barrera por barrido.
+
+Modos:
+  • síncrono (por defecto): Jacobi por bloques. Tras la barrera todos
+    leen las estadísticas de la iteración y cortan a la vez. Los iterados
+    son los de `iterar_valores(variante="jacobi")`.
+  • asíncrono (caótico): cada proceso recorre su bloque una y otra vez
+    sobre un solo vector, leyendo lo último que hayan escrito los demás,
+    sin barrera por barrido. Cuando todos los bloques ven su residuo
+    local por debajo del umbral se hace un barrido síncrono de
+    verificación; si el residuo global no cumple, se sigue. Conviene
+    solo con al menos tantas CPU libres como procesos: si compiten por
+    un núcleo, unos bloques dan muchos barridos con datos viejos.
+
+La extracción de la política y el backup final de las cotas se hacen
+igual, cada proceso en su bloque. El resultado tiene el mismo formato
+que `aproximaciones.iterar_valores`.
+"""
+
+import os
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+import numpy as np
+from scipy import sparse
+from modelo import como_modelo
+from bellman import umbral_parada
+
+# Espera máxima en la barrera antes de suponer que otro proceso murió
+ESPERA_BARRERA = 600.0
+
+
+# ----------------------------------------------------------------------
+# Memoria compartida
+# ----------------------------------------------------------------------
+class _Compartidos:
+    """Arreglos en memoria compartida, creados o adjuntados por nombre."""
+
+    def __init__(self):
+        self._memorias = []
+        self.arreglos = {}
+        self.especificacion = {}
+
+    def crear(self, nombre, forma, dtype, valor=None):
+        dtype = np.dtype(dtype)
+        tam = max(1, int(np.prod(forma)) * dtype.itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=tam)
+        self._memorias.append(shm)
+        arr = np.ndarray(forma, dtype=dtype, buffer=shm.buf)
+        if valor is None:
+            arr[...] = 0
+        else:
+            arr[...] = valor
+        self.arreglos[nombre] = arr
+        self.especificacion[nombre] = (shm.name, forma, dtype.str)
+        return arr
+
+    @classmethod
+    def adjuntar(cls, especificacion):
+        comp = cls()
+        for nombre, (shm_nombre, forma, dtype) in especificacion.items():
+            shm = shared_memory.SharedMemory(name=shm_nombre)
+            comp._memorias.append(shm)
+            comp.arreglos[nombre] = np.ndarray(forma, dtype=np.dtype(dtype),
+                                               buffer=shm.buf)
+        return comp
+
+    def cerrar(self, liberar=False):
+        self.arreglos.clear()
+        for shm in self._memorias:
+            shm.close()
+            if liberar:
+                shm.unlink()
+        self._memorias.clear()
+
+
+def _compartir_modelo(comp, modelo):
+    comp.crear("costos", (modelo.num_pares,), np.float64, modelo.costos)
+    comp.crear("inicio", (modelo.n + 1,), np.int64, modelo.inicio)
+    if modelo.es_disperso:
+        P = modelo.matriz_csr()
+        comp.crear("datos", P.data.shape, np.float64, P.data)
+        comp.crear("indices", P.indices.shape, P.indices.dtype, P.indices)
+        comp.crear("indptr", P.indptr.shape, P.indptr.dtype, P.indptr)
+    else:
+        comp.crear("P", np.shape(modelo.P), np.float64, modelo.P)
+
+
+def _bloques(n, procesos):
+    cortes = np.linspace(0, n, procesos + 1).round().astype(int)
+    return list(zip(cortes[:-1].tolist(), cortes[1:].tolist()))
+
+
+# ----------------------------------------------------------------------
+# Proceso trabajador
+# ----------------------------------------------------------------------
+class _Bloque:
+    """Backup de Bellman de los estados [a, b) sobre arreglos compartidos."""
+
+    def __init__(self, A, a, b, n, alpha, maximizar):
+        inicio = A["inicio"]
+        ka, kb = int(inicio[a]), int(inicio[b])
+        self.a, self.b = a, b
+        self.ka = ka
+        self.alpha = alpha
+        self.costos = A["costos"][ka:kb]
+        self.inicio = (inicio[a:b] - ka).astype(np.intp)
+        self.ufunc = np.maximum if maximizar else np.minimum
+        self.num_pares = kb - ka
+        if "P" in A:
+            self.B = A["P"][ka:kb]
+        else:
+            indptr = A["indptr"]
+            p0, p1 = int(indptr[ka]), int(indptr[kb])
+            self.B = sparse.csr_matrix(
+                (A["datos"][p0:p1], A["indices"][p0:p1], indptr[ka:kb + 1] - p0),
+                shape=(kb - ka, n), copy=False)
+
+    def q(self, v):
+        return self.costos + self.alpha * (self.B @ v)
+
+    def backup(self, v):
+        return self.ufunc.reduceat(self.q(v), self.inicio)
+
+    def greedy(self, v):
+        """(T v, índice global del primer par óptimo) en el bloque."""
+        q = self.q(v)
+        mejor = self.ufunc.reduceat(q, self.inicio)
+        estados = np.repeat(np.arange(self.b - self.a), np.diff(
+            np.append(self.inicio, self.num_pares)))
+        posiciones = np.where(q == mejor[estados], np.arange(self.num_pares),
+                              self.num_pares)
+        return mejor, np.minimum.reduceat(posiciones, self.inicio) + self.ka
+
+
+def _estadisticas(d):
+    return d.min(), d.max(), np.abs(d).max()
+
+
+def _medida_bloques(criterio, S):
+    """Medida global a partir de las estadísticas de todos los bloques."""
+    if criterio == "sup":
+        return S[:, 2].max()
+    return S[:, 1].max() - S[:, 0].min()
+
+
+def _trabajador(w, a, b, especificacion, n, alpha, maximizar, iter_max,
+                criterio, umbral, asincrono, barrera):
+    comp = _Compartidos.adjuntar(especificacion)
+    try:
+        A = comp.arreglos
+        bloque = _Bloque(A, a, b, n, alpha, maximizar)
+        V, S, control = A["V"], A["stats"], A["control"]
+        if asincrono:
+            _bucle_asincrono(w, bloque, V, S, control, A["listos"],
+                             A["barridos"], iter_max, criterio, umbral, barrera)
+        else:
+            _bucle_sincrono(w, bloque, V, S, control, iter_max, criterio,
+                            umbral, barrera)
+
+        # Backup final (cotas) y política, cada uno en su bloque
+        final = int(control[2])
+        Tv, k_opt = bloque.greedy(V[final])
+        V[1 - final, a:b] = Tv
+        A["politica"][a:b] = k_opt
+    except BrokenBarrierError:
+        pass
+    finally:
+        comp.cerrar()
+
+
+def _bucle_sincrono(w, bloque, V, S, control, iter_max, criterio, umbral,
+                    barrera):
+    a, b = bloque.a, bloque.b
+    convergio = False
+    for k in range(1, iter_max + 1):
+        v, nuevo = V[(k - 1) % 2], V[k % 2]
+        Tv = bloque.backup(v)
+        S[k % 2, w] = _estadisticas(Tv - v[a:b])
+        nuevo[a:b] = Tv
+        barrera.wait(ESPERA_BARRERA)
+        if _medida_bloques(criterio, S[k % 2]) < umbral:
+            convergio = True
+            break
+    if w == 0:
+        control[0], control[1], control[2] = k, convergio, k % 2
+    barrera.wait(ESPERA_BARRERA)
+
+
+def _bucle_asincrono(w, bloque, V, S, control, listos, barridos, iter_max,
+                     criterio, umbral, barrera):
+    a, b = bloque.a, bloque.b
+    v = V[0]
+    while True:
+        # Fase caótica: sin barreras, hasta que todos los bloques estén
+        # quietos. Un bloque quieto solo vuelve a barrer cuando otro
+        # avanzó (si no, cede la CPU en lugar de girar en vacío).
+        visto = -1
+        while barridos[w] < iter_max and not control[3]:
+            otros = int(barridos.sum() - barridos[w])
+            if listos[w] and otros == visto:
+                os.sched_yield()
+                continue
+            visto = otros
+            Tv = bloque.backup(v)
+            d = Tv - v[a:b]
+            v[a:b] = Tv
+            barridos[w] += 1
+            S[0, w] = _estadisticas(d)
+            listos[w] = _medida_bloques(criterio, S[0, w:w + 1]) < umbral
+            if listos.all():
+                control[3] = 1
+        barrera.wait(ESPERA_BARRERA)
+
+        # Barrido síncrono de verificación sobre el vector común; todos
+        # deciden con los mismos datos compartidos
+        Tv = bloque.backup(v)
+        S[1, w] = _estadisticas(Tv - v[a:b])
+        V[1, a:b] = Tv
+        barridos[w] += 1
+        barrera.wait(ESPERA_BARRERA)
+        convergio = _medida_bloques(criterio, S[1]) < umbral
+        if convergio or barridos.max() >= iter_max:
+            break
+        v[a:b] = V[1, a:b]
+        barrera.wait(ESPERA_BARRERA)
+        if w == 0:
+            control[3] = 0
+            listos[:] = False
+        barrera.wait(ESPERA_BARRERA)
+
+    if w == 0:
+        control[0], control[1], control[2] = barridos.max(), convergio, 0
+    barrera.wait(ESPERA_BARRERA)
+
+
+# ----------------------------------------------------------------------
+# Interfaz
+# ----------------------------------------------------------------------
+def iterar_valores_paralelo(datos, alpha, iter_max, tol, criterio="sup",
+                            procesos=None, asincrono=False, v0=None):
+    """Aproximaciones sucesivas con `procesos` procesos (por defecto, uno
+    por CPU) y memoria compartida.
+
+    Devuelve el mismo diccionario que `iterar_valores`. En modo síncrono
+    iteraciones es el número de barridos; en modo asíncrono, el mayor
+    número de barridos de un bloque (backups cuenta los de todos).
+    """
+    modelo = como_modelo(datos)
+    umbral = umbral_parada(criterio, tol, alpha)
+    n = modelo.n
+    procesos = min(procesos or mp.cpu_count(), n)
+    bloques = _bloques(n, procesos)
+
+    comp = _Compartidos()
+    try:
+        _compartir_modelo(comp, modelo)
+        V = comp.crear("V", (2, n), np.float64)
+        if v0 is not None:
+            V[0] = v0
+        comp.crear("stats", (2, procesos, 3), np.float64)
+        comp.crear("control", (4,), np.int64)
+        comp.crear("listos", (procesos,), np.bool_)
+        comp.crear("barridos", (procesos,), np.int64)
+        politica = comp.crear("politica", (n,), np.int64)
+
+        barrera = mp.Barrier(procesos)
+        t0 = time.perf_counter()
+        trabajadores = [
+            mp.Process(target=_trabajador, daemon=True,
+                       args=(w, a, b, comp.especificacion, n, alpha,
+                             modelo.maximizar, iter_max, criterio, umbral,
+                             asincrono, barrera))
+            for w, (a, b) in enumerate(bloques)
+        ]
+        for p in trabajadores:
+            p.start()
+        _esperar(trabajadores, barrera)
+        tiempo = time.perf_counter() - t0
+
+        control = comp.arreglos["control"]
+        k, convergio, final = int(control[0]), bool(control[1]), int(control[2])
+        v, Tv = V[final].copy(), V[1 - final].copy()
+        k_opt = politica.copy()
+        if asincrono:
+            backups = int(comp.arreglos["barridos"] @ [b - a for a, b in bloques])
+        else:
+            backups = k * n
+    finally:
+        comp.cerrar(liberar=True)
+
+    d = Tv - v
+    factor = alpha / (1 - alpha)
+    inferior = Tv + factor * d.min()
+    superior = Tv + factor * d.max()
+    return {
+        "v": 0.5 * (inferior + superior) if criterio == "span" else v,
+        "v_iterada": v,
+        "politica": tuple(modelo.acciones[k_opt].tolist()),
+        "variante": "asincrono" if asincrono else "paralelo",
+        "iteraciones": k,
+        "backups": backups,
+        "tiempo": tiempo,
+        "convergio": convergio,
+        "cota_inferior": inferior,
+        "cota_superior": superior,
+        "epsilon": factor * float(d.max() - d.min()),
+    }
+
+
+def _esperar(trabajadores, barrera):
+    """Espera a los procesos; si uno falla, rompe la barrera y avisa."""
+    while trabajadores:
+        for p in list(trabajadores):
+            p.join(timeout=0.05)
+            if p.exitcode is None:
+                continue
+            trabajadores.remove(p)
+            if p.exitcode != 0:
+                barrera.abort()
+                for q in trabajadores:
+                    q.join()
+                raise RuntimeError(
+                    f"Un proceso de la iteración paralela terminó con código {p.exitcode}.")
@@ -12,206 +12,166 @@ Contiene dos métodos:
   2) Con descuento α:
      - Resuelve (I – αP^π)·v = c^π
      - Mejora usando c_{i,a} + α Σ_j P_a[i,j]·v_j
+
+Los sistemas de evaluación se resuelven con `sistemas.resolver_sistema`,
+que usa la vía densa o GMRES (Jacobi, ILU si hace falta) según tamaño y
+densidad.
+
+`iterar_politicas` es el bucle de evaluación y mejora, sin pantalla ni
+input(); el menú de `main.py` lo llama (vía `api.py`) con una traza que
+imprime cada iteración.
+
+Con descuento y eliminar=True, la mejora aplica la prueba de MacQueen de
+`bellman.EliminadorAcciones` con U = v^π (o L = v^π al maximizar) y
+d = T'v^π – v^π: los pares que no pueden ser óptimos se descartan y las
+mejoras siguientes solo recorren los sobrevivientes. Como los pares
+óptimos nunca se eliminan, la política final es la misma.
 """
 
+import time
 import numpy as np
-from read import leer_datos_manualmente
-from lim_pant import limpiar_pantalla
-
-def evaluar_politica_sin_desc(pol, datos):
-
-    """Evalúa la política SIN descuento (igual a tu evaluar_politica)."""
-    n      = datos["num_estados"]
-    probs  = datos["probabilidades"]
-    costos = datos["costos"]
-
-    # Construir Pmat y cvec
-    Pmat = np.zeros((n, n))
-    cvec = np.zeros(n)
-    for i, a in enumerate(pol):
-        Pmat[i, :] = probs[a][i]
-        cvec[i]    = costos[a][i]
-
-    # Montar sistema A x = b con x = [v_0…v_{n-1}, g]
-    N = n + 1
-    A = np.zeros((N, N))
-    b = np.zeros(N)
-
-    # Eqs i=0…n-1
-    for i in range(n):
-        for j in range(n):
-            A[i, j] = (1.0 if i == j else 0.0) - Pmat[i, j]
-        A[i, n] = -1.0
-        b[i]    = -cvec[i]
-
-    # Eq n: v_{n-1} = 0
-    A[n, n-1] = 1.0
-    b[n]       = 0.0
-
-    sol     = np.linalg.solve(A, b)
+from modelo import como_modelo
+from bellman import q_valores, argoptimo, reducir, EliminadorAcciones
+from evaluacion_incremental import EvaluadorIncremental
+from estacionaria import clases_recurrentes, CadenaMulticadenaError
+from grafos import evaluar_bloques
+from sistemas import resolver_sistema, matriz_descuento, matriz_costo_medio
+from traza import como_traza, evento
+
+def evaluar_politica_sin_desc(pol, datos, metodo="auto"):
+
+    """Evalúa la política SIN descuento (igual a tu evaluar_politica).
+
+    metodo="bloques" resuelve por componentes fuertemente conexas
+    (`grafos.evaluar_bloques`). Si la cadena es multicadena no hay un
+    único g: se lanza CadenaMulticadenaError con las clases recurrentes.
+    """
+    modelo = como_modelo(datos)
+    n      = modelo.n
+
+    # Construir Pmat (densa o dispersa, como el modelo) y cvec
+    Pmat = modelo.matriz_politica(pol)
+    cvec = modelo.costos_politica(pol)
+
+    if metodo == "bloques":
+        res = evaluar_bloques(modelo, pol)
+        desc = res["descomposicion"]
+        if not desc.es_unicadena:
+            raise CadenaMulticadenaError(desc.clases_recurrentes)
+        return float(res["g"][n - 1]), res["v"] - res["v"][n - 1]
+    clases = clases_recurrentes(Pmat)
+    if len(clases) > 1:
+        raise CadenaMulticadenaError(clases)
+
+    # Sistema A x = b con x = [v_0…v_{n-1}, g]:
+    #   (I – P) v – g = –c  y  v_{n-1} = 0
+    A = matriz_costo_medio(Pmat)
+    b = np.zeros(n + 1)
+    b[:n] = -cvec
+
+    sol     = resolver_sistema(A, b, metodo)
     v_raw   = sol[:n]
     g       = sol[n]
     # Invertir signo para que Δ funcione
     v_signed = -v_raw
     return g, v_signed
 
-def metodo_policy_improvement(datos):
-    limpiar_pantalla()
-    """Mejoramiento de Políticas SIN descuento."""
-    problema_tipo = datos["problema_tipo"].lower()
-    n             = datos["num_estados"]
-    politicas     = datos["politicas"]
-    probs         = datos["probabilidades"]
-    costos        = datos["costos"]
-
-    # Construir D(i)
-    D = {i: [] for i in range(n)}
-    for a, estados in politicas.items():
-        for i in estados:
-            D[i].append(a)
-
-    # Leer política inicial
-    while True:
-        entrada = input(f"Ingrese política inicial ({n} acciones, coma-sep.): ")
-        try:
-            pol = tuple(int(x) for x in entrada.split(","))
-            if len(pol)!=n or any(pol[i] not in D[i] for i in range(n)):
-                raise ValueError
-            break
-        except:
-            print("Política inválida, inténtalo de nuevo.")
-
-    iter_count = 0
-    while True:
-        iter_count += 1
-        print(f"\n--- Iteración {iter_count} (sin descuento) ---")
-
-        # Evaluar
-        g, v = evaluar_politica_sin_desc(pol, datos)
-        print(f" g = {g:.6f}")
-        for i, vi in enumerate(v):
-            print(f" v_{i} = {vi:.6f}")
-
-        # Mejorar
-        nueva = []
-        for i in range(n):
-            candidatos = {}
-            for a in D[i]:
-                delta = costos[a][i] + np.dot(probs[a][i], v) - v[i]
-                candidatos[a] = delta
-            mejor = (max if problema_tipo.startswith("max") else min)(candidatos, key=candidatos.get)
-            nueva.append(mejor)
-        nueva = tuple(nueva)
-
-        print(" Política mejorada:", nueva)
-
-        # Convergencia
-        if nueva==pol:
-            print(f"\nConvergió en {iter_count} iteraciones.")
-            print("Política Óptima (sin descuento):", pol)
-            print(f" g* = {g:.6f}")
-            for i, vi in enumerate(v):
-                print(f" v*_{i} = {vi:.6f}")
-            pfin = np.zeros((n, n))
-            for i, a in enumerate(pol):
-                pfin[i, :] = probs[a][i]
-            A = pfin.T - np.eye(n); A[-1, :] = 1.0
-            b = np.zeros(n); b[-1] = 1.0
-            pi_est = np.linalg.solve(A, b)
-            costo_medio = sum(pi_est[i] * costos[pol[i]][i] for i in range(n))
-            print(f"\nCosto medio E[C_(R)] = {costo_medio:.6f}")
+def iterar_politicas(datos, pol0, alpha=None, iter_max=None, traza=None,
+                     eliminar=False):
+    """Iteración de políticas desde pol0, sin descuento si alpha es None.
+
+    Devuelve un diccionario con politica, v, g (solo sin descuento),
+    iteraciones, convergio, refactorizaciones y actualizaciones (de rango
+    bajo del evaluador incremental). Cada iteración emite un evento "pi"
+    o "pi_desc" con g, politica, cambios, residuo (máx |T v – v| o, sin
+    descuento, máx |min_a Δ – g|) y tiempo_resolucion. Con eliminar=True
+    (solo con descuento) el evento y el resultado incluyen además los
+    pares eliminados en cada iteración ("eliminados") y "pares_vivos".
+    Sin descuento, si alguna política del recorrido es multicadena se
+    lanza CadenaMulticadenaError.
+    """
+    modelo = como_modelo(datos)
+    if eliminar and alpha is None:
+        raise ValueError("La eliminación de acciones requiere descuento α.")
+    elim = EliminadorAcciones(modelo) if eliminar else None
+    eliminados = []
+    traza = como_traza(traza)
+    nombre = "pi" if alpha is None else "pi_desc"
+    traza.inicio(nombre, {"n": modelo.n, "alpha": alpha, "iter_max": iter_max})
+
+    # Evaluación incremental: reutiliza la factorización entre iteraciones
+    evaluador = EvaluadorIncremental(modelo, alpha)
+    pol = tuple(pol0)
+    t0 = time.perf_counter()
+    g = None
+    k = 0
+    convergio = False
+    while iter_max is None or k < iter_max:
+        k += 1
+        t_eval = time.perf_counter()
+        if alpha is None:
+            # Sin descuento el sistema solo tiene solución única si hay
+            # una sola clase recurrente
+            clases = clases_recurrentes(modelo.matriz_politica(pol))
+            if len(clases) > 1:
+                raise CadenaMulticadenaError(clases)
+            g, v = evaluador.evaluar(pol)
+            q = q_valores(modelo, v) - v[modelo.estados]
+        elif elim is None:
+            v = evaluador.evaluar(pol)
+            q = q_valores(modelo, v, alpha)
+        else:
+            v = evaluador.evaluar(pol)
+            q = elim.q_valores(v, alpha)
+        t_eval = time.perf_counter() - t_eval
+
+        # Mejorar (sobre los pares vivos si hay eliminación)
+        activo = modelo if elim is None else elim.modelo
+        mejor = reducir(activo, q)
+        nueva = tuple(activo.acciones[argoptimo(activo, q, mejor)].tolist())
+        if elim is not None:
+            d = mejor - v
+            factor = alpha / (1 - alpha)
+            holgura = factor * (d.max() if modelo.maximizar else -d.min())
+            eliminados.append(elim.eliminar(q, v, holgura))
+
+        if traza.activa:
+            residuo = np.max(np.abs(mejor - (g if alpha is None else v)))
+            cambios = sum(a != b for a, b in zip(pol, nueva))
+            traza.iteracion(evento(
+                nombre, k, t0, residuo=float(residuo), cambios=cambios,
+                tiempo_resolucion=t_eval, g=g, politica=nueva,
+                valores=v if traza.valores else None,
+                eliminados=eliminados[-1] if elim is not None else None))
+
+        if nueva == pol:
+            convergio = True
             break
         pol = nueva
 
-def evaluar_politica_con_desc(pol, datos, alpha):
-    """Evalúa la política CON descuento α resolviendo (I – αP) v = c."""
-    n      = datos["num_estados"]
-    probs  = datos["probabilidades"]
-    costos = datos["costos"]
-
-    Pmat = np.zeros((n, n))
-    cvec = np.zeros(n)
-    for i, a in enumerate(pol):
-        Pmat[i, :] = probs[a][i]
-        cvec[i]    = costos[a][i]
-
-    A = np.eye(n) - alpha * Pmat
-    v = np.linalg.solve(A, cvec)
+    resultado = {
+        "politica": pol, "v": v, "g": g, "iteraciones": k,
+        "convergio": convergio,
+        "refactorizaciones": evaluador.refactorizaciones,
+        "actualizaciones": evaluador.actualizaciones,
+    }
+    if elim is not None:
+        resultado.update(eliminados=np.array(eliminados), pares_vivos=elim.vivos)
+    traza.fin({"metodo": nombre, "iteraciones": k, "convergio": convergio,
+               "tiempo": time.perf_counter() - t0})
+    return resultado
+
+
+def evaluar_politica_con_desc(pol, datos, alpha, metodo="auto"):
+    """Evalúa la política CON descuento α resolviendo (I – αP) v = c
+    (con metodo="bloques", por componentes fuertemente conexas)."""
+    modelo = como_modelo(datos)
+    if metodo == "bloques":
+        return evaluar_bloques(modelo, pol, alpha)["v"]
+
+    Pmat = modelo.matriz_politica(pol)
+    cvec = modelo.costos_politica(pol)
+
+    A = matriz_descuento(Pmat, alpha)
+    v = resolver_sistema(A, cvec, metodo)
     return v
-
-def metodo_policy_improvement_desc(datos):
-    limpiar_pantalla()
-    """Mejoramiento de Políticas CON descuento."""
-    problema_tipo = datos["problema_tipo"].lower()
-    n             = datos["num_estados"]
-    politicas     = datos["politicas"]
-    probs         = datos["probabilidades"]
-    costos        = datos["costos"]
-
-    # Leer α
-    while True:
-        try:
-            alpha = float(input("Ingrese factor de descuento α (0 ≤ α < 1): ").strip())
-            if 0 <= alpha < 1: break
-        except:
-            pass
-        print("α inválido; debe ser 0 ≤ α < 1.")
-
-    # Construir D(i)
-    D = {i: [] for i in range(n)}
-    for a, estados in politicas.items():
-        for i in estados:
-            D[i].append(a)
-
-    # Política inicial
-    while True:
-        entrada = input(f"Ingrese política inicial ({n} acciones, coma-sep.): ")
-        try:
-            pol = tuple(int(x) for x in entrada.split(","))
-            if len(pol)!=n or any(pol[i] not in D[i] for i in range(n)):
-                raise ValueError
-            break
-        except:
-            print("Política inválida, inténtalo de nuevo.")
-
-    iter_count = 0
-    while True:
-        iter_count += 1
-        print(f"\n--- Iteración {iter_count} (con descuento α={alpha}) ---")
-
-        # Evaluar con descuento
-        v = evaluar_politica_con_desc(pol, datos, alpha)
-        for i, vi in enumerate(v):
-            print(f" v_{i} = {vi:.6f}")
-
-        # Mejorar
-        nueva = []
-        for i in range(n):
-            candidatos = {}
-            for a in D[i]:
-                q = costos[a][i] + alpha * np.dot(probs[a][i], v)
-                candidatos[a] = q
-            mejor = (max if problema_tipo.startswith("max") else min)(
-                candidatos, key=candidatos.get)
-            nueva.append(mejor)
-        nueva = tuple(nueva)
-
-        print(" Política mejorada:", nueva)
-
-        # Convergencia
-        if nueva==pol:
-            print(f"\nConvergió en {iter_count} iteraciones.")
-            print("Política Óptima (con descuento):", pol)
-            print("Valores finales v*: ")
-            for i, vi in enumerate(v):
-                print(f" v*_{i} = {vi:.6f}")
-            pfin = np.zeros((n, n))
-            for i, a in enumerate(pol):
-                pfin[i, :] = probs[a][i]
-            A = pfin.T - np.eye(n); A[-1, :] = 1.0
-            b = np.zeros(n); b[-1] = 1.0
-            pi_est = np.linalg.solve(A,b)
-            costo_medio = sum(pi_est[i] * costos[pol[i]][i] for i in range(n))
-            print(f"\nCosto medio E[C_(R)] = {costo_medio:.6f}")
-            break
-        pol = nueva
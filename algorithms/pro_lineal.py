@@ -11,46 +11,108 @@ Sujeto a:
     Σ_{j∈D(i)} y_{i,j}  – Σ_{k, j∈D(k)} p_j[k][i] · y_{k,j} = 0   ∀ i
     Σ_{i,j} y_{i,j} = 1
     y_{i,j} ≥ 0   (para todo par i,j, incluso si vale 0)
+
+Hay dos vías de resolución:
+  • "pulp" : arma el modelo término a término con PuLP y lo resuelve con
+             CBC; muestra el PPL completo (modelos de tamaño didáctico).
+  • "highs": arma la matriz de restricciones directamente como matriz
+             dispersa de scipy a partir de P (solo los no nulos) y la
+             resuelve en el mismo proceso con scipy.optimize.linprog.
 """
 
+import time
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
 from pulp import (
     LpProblem, LpVariable, lpSum,
     LpStatus, LpMinimize, LpMaximize, PULP_CBC_CMD
 )
-from lim_pant import limpiar_pantalla
-
-def metodo_programacion_lineal(datos):
-    limpiar_pantalla()
-
-    problema_tipo = datos["problema_tipo"]       # "Maximizar" o "Minimizar"
-    n = datos["num_estados"]
-    politicas = datos["politicas"]               # dict: j → [estados]
-    costos = datos["costos"]                     # dict: j → {i: c_{i,j}}
-    probs = datos["probabilidades"]              # dict: j → matriz n×n
+from modelo import como_modelo
+from traza import como_traza
+
+# Con "auto", hasta este número de pares y_{i,j} se usa PuLP
+MAX_PARES_PULP = 50
+# Tolerancias de factibilidad de HiGHS (por omisión 1e-7, que deja g*
+# con un error relativo de hasta ~3e-6)
+TOL_HIGHS = 1e-10
+
+
+def matriz_restricciones(modelo):
+    """A_eq dispersa ((n+1) × pares) y b_eq del LP de costo medio.
+
+    Columna k = par (i, a):  +1 en la fila i  –  P_a[i, :]ᵀ,
+    y la última fila es la normalización Σ y = 1.
+    """
+    n, m = modelo.n, modelo.num_pares
+    salidas = sparse.csr_matrix(
+        (np.ones(m), (modelo.estados, np.arange(m))), shape=(n, m))
+    entradas = modelo.matriz_csr().T
+    flujo = (salidas - entradas).tocsr()
+    flujo.eliminate_zeros()
+    A_eq = sparse.vstack([flujo, np.ones((1, m))], format="csr")
+    b_eq = np.zeros(n + 1)
+    b_eq[n] = 1.0
+    return A_eq, b_eq
+
+
+def resolver_lp_highs(datos, traza=None):
+    """Resuelve el LP con HiGHS; devuelve (y por par, estado)."""
+    modelo = como_modelo(datos)
+    traza = como_traza(traza)
+    t0 = time.perf_counter()
+    A_eq, b_eq = matriz_restricciones(modelo)
+    traza.inicio("lp", {"backend": "highs", "maximizar": modelo.maximizar,
+                        "variables": modelo.num_pares,
+                        "restricciones": A_eq.shape[0], "no_nulos": A_eq.nnz})
+    c = -modelo.costos if modelo.maximizar else modelo.costos
+    res = linprog(c, A_eq=A_eq, b_eq=b_eq, bounds=(0, None), method="highs",
+                  options={"primal_feasibility_tolerance": TOL_HIGHS,
+                           "dual_feasibility_tolerance": TOL_HIGHS})
+    estado = "Optimal" if res.status == 0 else res.message
+    y = res.x if res.x is not None else np.zeros(modelo.num_pares)
+    traza.fin({"metodo": "lp", "iteraciones": int(res.nit), "estado": estado,
+               "convergio": res.status == 0, "tiempo": time.perf_counter() - t0})
+    return y, estado
+
+
+def resolver_lp_pulp(datos, traza=None):
+    """Resuelve el LP con PuLP/CBC; devuelve (y por par, estado).
+
+    El PPL completo se entrega a `traza.detalle` y solo se arma como texto
+    si la traza lo muestra.
+    """
+    modelo = como_modelo(datos)
+    traza = como_traza(traza)
+    n = modelo.n
+    t0 = time.perf_counter()
 
     # Creamos el LP
-    sentido = LpMinimize if problema_tipo == "Minimizar" else LpMaximize
+    sentido = LpMaximize if modelo.maximizar else LpMinimize
     prob = LpProblem("PMD_AverageCost", sentido)
 
-    # Variables y_{i,j} ≥ 0, incluso si luego resultan 0
+    # Variables y_{i,j} ≥ 0 (una por par k), incluso si luego resultan 0
     y = {}
-    for j, estados in politicas.items():
-        for i in estados:
-            y[(i, j)] = LpVariable(f"y_{i}_{j}", lowBound=0)
+    costos = {}
+    par = {}
+    for k in _orden_variables(modelo):
+        i, j = int(modelo.estados[k]), int(modelo.acciones[k])
+        y[(i, j)] = LpVariable(f"y_{i}_{j}", lowBound=0)
+        costos[(i, j)] = float(modelo.costos[k])
+        par[(i, j)] = k
 
     # Objetivo: z = Σ c_{i,j} · y_{i,j}
-    objetivo = lpSum(costos[j][i] * y[(i, j)] for (i, j) in y)
+    objetivo = lpSum(costos[(i, j)] * y[(i, j)] for (i, j) in y)
     prob += objetivo, "z"
 
     # Restricciones de flujo estacionario para cada estado i
     restricciones = []
     for i in range(n):
-        salidas = [y[(i, j)] for j in politicas if (i, j) in y]
+        salidas = [y[(i, j)] for j in modelo.decisiones(i)]
         entradas = []
-        for j, estados in politicas.items():
-            for k in estados:
-                # flujo de k->i bajo acción j
-                entradas.append(probs[j][k][i] * y[(k, j)])
+        for (k, j), var in y.items():
+            # flujo de k->i bajo acción j
+            entradas.append(modelo.fila(par[(k, j)])[i] * var)
         restr = lpSum(salidas) - lpSum(entradas) == 0
         name = f"Restricción {i}"
         prob += restr, name
@@ -61,54 +123,59 @@ def metodo_programacion_lineal(datos):
     prob += norm, "Normalización"
     restricciones.append(("Normalización", norm))
 
-    # 1) Mostrar el PPL (manualmente)
-    sentido_str = "Minimizar" if sentido == LpMinimize else "Maximizar"
-    print(f"{sentido_str} z = ", end="")
-    # Objetivo impreso a mano:
-    terms = [f"{costos[j][i]}·y_{i}_{j}" for (i, j) in y]
-    print(" + ".join(terms))
+    traza.inicio("lp", {"backend": "pulp", "variables": len(y),
+                        "restricciones": len(restricciones)})
 
-    print("\nSujeto a:")
-    for name, restr in restricciones:
-        # Cada restricción con tabulador
-        print(f"\t{name}: {restr}")
+    def ppl():
+        # El PPL armado a mano, una línea por restricción
+        sentido_str = "Minimizar" if sentido == LpMinimize else "Maximizar"
+        terms = [f"{costos[(i, j)]}·y_{i}_{j}" for (i, j) in y]
+        yield f"{sentido_str} z = " + " + ".join(terms)
 
-    print("\nVariables y_{i,j} ≥ 0:")
-    # Listamos todas las variables, incluso si se quedan en cero
-    for (i, j), var in y.items():
-        print(f"\t y_{i}_{j} ≥ 0")
+        yield "\nSujeto a:"
+        for name, restr in restricciones:
+            yield f"\t{name}: {restr}"
 
-    # 2) Resolver
-    prob.solve(PULP_CBC_CMD(msg=0))
-    print(f"\nEstado de la solución: {LpStatus[prob.status]}\n")
+        yield "\nVariables y_{i,j} ≥ 0:"
+        # Listamos todas las variables, incluso si se quedan en cero
+        for (i, j) in y:
+            yield f"\t y_{i}_{j} ≥ 0"
 
-    # 3) Mostrar todas las y_{i,j} con su valor (incluso ceros)
-    print("Valores de variables y_{i,j}:")
-    sol_y = {}
-    for (i, j), var in y.items():
-        val = var.value() or 0.0
-        sol_y[(i, j)] = val
-        print(f"\t y_{i}_{j} = {val:.6f}")
-
-    # 4) Derivar política óptima: para cada estado i, elegir j con mayor y_{i,j}
-    pol_opt = []
-    for i in range(n):
-        candidatos = {j: sol_y.get((i, j), 0.0) for j in politicas if (i, j) in y}
-        mejor_j = max(candidatos, key=candidatos.get)
-        pol_opt.append(mejor_j)
-
-    # 5) Distribución estacionaria π[i] = Σ_{j∈D(i)} y_{i,j}
-    pi = [sum(sol_y.get((i, j), 0.0) for j in politicas if (i, j) in y)
-          for i in range(n)]
-
-    # 6) Costo esperado E(C_{R*})
-    costo_esperado = sum(costos[j][i] * sol_y[(i, j)] for (i, j) in sol_y)
-
-    # 7) Impresión final
-    print("\n" + "=" * 60)
-    print("POLÍTICA ÓPTIMA (LP)".center(60))
-    print("=" * 60)
-    print(f"R* = {tuple(pol_opt)}")
-    print("π* =", [round(v, 6) for v in pi])
-    print(f"E(C_{{R*}}) = {costo_esperado:.6f}\n")
+    traza.detalle("lp", ppl)
 
+    prob.solve(PULP_CBC_CMD(msg=0))
+    sol = np.zeros(modelo.num_pares)
+    for (i, j), var in y.items():
+        sol[par[(i, j)]] = var.value() or 0.0
+    estado = LpStatus[prob.status]
+    traza.fin({"metodo": "lp", "estado": estado, "convergio": estado == "Optimal",
+               "tiempo": time.perf_counter() - t0})
+    return sol, estado
+
+
+def _orden_variables(modelo):
+    """Pares ordenados por decisión y luego por estado (orden de PuLP)."""
+    return np.lexsort((modelo.estados, modelo.acciones))
+
+
+def lineas_valores_y(modelo, y):
+    """Líneas con todas las y_{i,j} (incluso ceros), en el orden de PuLP."""
+    yield "Valores de variables y_{i,j}:"
+    for k in _orden_variables(modelo):
+        i, j = modelo.estados[k], modelo.acciones[k]
+        yield f"\t y_{i}_{j} = {y[k]:.6f}"
+
+
+def politica_de_lp(modelo, y):
+    """R*, π* y E(C_{R*}) a partir de los y_{i,j} óptimos.
+
+    Para cada estado se elige la decisión con mayor y_{i,j} (la primera
+    de D(i) en caso de empate) y π_i = Σ_{j∈D(i)} y_{i,j}.
+    """
+    mejor = np.maximum.reduceat(y, modelo.inicio[:-1])
+    posiciones = np.where(y == mejor[modelo.estados],
+                          np.arange(modelo.num_pares), modelo.num_pares)
+    k = np.minimum.reduceat(posiciones, modelo.inicio[:-1])
+    pol = tuple(modelo.acciones[k].tolist())
+    pi = np.add.reduceat(y, modelo.inicio[:-1])
+    return pol, pi, float(modelo.costos @ y)
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# algorithms/servicio.py
+
+"""
+Servicio HTTP local para resolver PMD sin pasar por el menú.
+
+Solo usa la biblioteca estándar (http.server, sqlite3, concurrent.futures)
+y funciona sin red externa. Rutas:
+
+  POST /trabajos         {"modelo": …, "metodo": "vi", "parametros": {…}}
+                         → 202 {"id", "estado": "en_cola"}
+                         → 200 {"id", "estado": "terminado", "resultado"}
+                           si el resultado ya estaba en la caché
+  GET  /trabajos/<id>    → {"id", "estado", "resultado" | "error"}
+  GET  /cache            → entradas y bytes de la caché
+  GET  /salud            → {"ok": true}
+
+El modelo puede venir en la forma de `read.py` (las claves numéricas
+como texto, como quedan en JSON) o compacta:
+  {"problema_tipo", "num_estados", "inicio", "acciones", "costos",
+   "P": [[…], …] | {"data", "indices", "indptr"}}
+
+Los métodos y sus parámetros son los de `api.RESOLVEDORES` (sin traza).
+
+Caché: la clave es el SHA-256 del modelo canónico (ModeloPMD con P en
+CSR ordenada, en bytes) y de los parámetros con sus valores por
+omisión, así que el mismo modelo escrito de otra forma da la misma
+clave. Resultados y trabajos se guardan en SQLite; la caché expulsa las
+entradas usadas hace más tiempo (LRU) cuando pasa de `max_entradas` o de
+`max_bytes`. Dos pedidos iguales en curso comparten el mismo cálculo.
+
+Los trabajos corren en un pool de `trabajadores` procesos; si hay más de
+`max_cola` pendientes se responde 503.
+
+Uso:
+    python servicio.py --puerto 8765 --db servicio.sqlite --trabajadores 2
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from scipy import sparse
+from modelo import ModeloPMD
+from api import RESOLVEDORES
+
+MAX_CUERPO = 256 * 2**20        # tamaño máximo de un pedido (bytes)
+NO_CACHEABLES = ("traza",)      # parámetros que no se aceptan por HTTP
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    clave     TEXT PRIMARY KEY,
+    metodo    TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    bytes     INTEGER NOT NULL,
+    creado    REAL NOT NULL,
+    usado     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+CREATE TABLE IF NOT EXISTS trabajos (
+    id        TEXT PRIMARY KEY,
+    clave     TEXT NOT NULL,
+    metodo    TEXT NOT NULL,
+    estado    TEXT NOT NULL,
+    creado    REAL NOT NULL,
+    terminado REAL,
+    error     TEXT
+);
+"""
+
+
+# ----------------------------------------------------------------------
+# Modelo y parámetros canónicos
+# ----------------------------------------------------------------------
+def _claves_enteras(d):
+    return {int(k): v for k, v in d.items()}
+
+
+def modelo_desde_json(obj):
+    """ModeloPMD a partir de la forma de `read.py` o de la compacta."""
+    if "politicas" in obj:
+        datos = dict(obj)
+        datos["politicas"] = _claves_enteras(obj["politicas"])
+        datos["costos"] = {a: _claves_enteras(c)
+                           for a, c in _claves_enteras(obj["costos"]).items()}
+        datos["probabilidades"] = _claves_enteras(obj["probabilidades"])
+        return ModeloPMD.desde_datos(datos)
+
+    n = int(obj["num_estados"])
+    inicio = np.asarray(obj["inicio"], dtype=np.int64)
+    P = obj["P"]
+    if isinstance(P, dict):
+        P = sparse.csr_matrix((P["data"], P["indices"], P["indptr"]),
+                              shape=(int(inicio[-1]), n))
+    else:
+        P = np.asarray(P, dtype=float)
+    return ModeloPMD(n, inicio, obj["acciones"], obj["costos"], P,
+                     problema_tipo=obj.get("problema_tipo", "Minimizar"))
+
+
+def huella_modelo(modelo):
+    """SHA-256 del modelo en forma canónica (ver ModeloPMD.huella)."""
+    return modelo.huella()
+
+
+def parametros_canonicos(metodo, parametros):
+    """Parámetros con los valores por omisión de `api`; ValueError si no
+    corresponden al método."""
+    if metodo not in RESOLVEDORES:
+        raise ValueError(f"Método desconocido: {metodo}")
+    if any(p in parametros for p in NO_CACHEABLES):
+        raise ValueError(f"Parámetros no permitidos: {NO_CACHEABLES}")
+    firma = inspect.signature(RESOLVEDORES[metodo])
+    try:
+        ligados = firma.bind(None, **parametros)
+    except TypeError as e:
+        raise ValueError(str(e)) from None
+    ligados.apply_defaults()
+    canon = dict(ligados.arguments)
+    canon.pop(next(iter(firma.parameters)))      # el modelo
+    for p in NO_CACHEABLES:
+        canon.pop(p, None)
+    return canon
+
+
+def clave_cache(huella, metodo, parametros):
+    texto = json.dumps([huella, metodo, parametros], sort_keys=True,
+                       separators=(",", ":"), default=a_json)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def a_json(x):
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    if isinstance(x, np.generic):
+        return x.item()
+    if isinstance(x, (tuple, set)):
+        return list(x)
+    raise TypeError(f"No serializable: {type(x).__name__}")
+
+
+def _resolver(modelo, metodo, parametros):
+    """Se corre en el pool: resuelve y devuelve el resultado como JSON."""
+    res = RESOLVEDORES[metodo](modelo, **parametros)
+    return json.dumps(asdict(res), default=a_json, ensure_ascii=False)
+
+
+# ----------------------------------------------------------------------
+# Almacén SQLite
+# ----------------------------------------------------------------------
+class Almacen:
+    """Trabajos y caché de resultados en una base SQLite."""
+
+    def __init__(self, ruta, max_entradas=10_000, max_bytes=512 * 2**20):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(ruta, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(ESQUEMA)
+        # Trabajos que quedaron a medias en una corrida anterior
+        self._db.execute("UPDATE trabajos SET estado='error', error=? "
+                         "WHERE estado='en_cola'", ("interrumpido",))
+
+    def _ejecutar(self, sql, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    # Caché ------------------------------------------------------------
+    def buscar(self, clave):
+        """Resultado (texto JSON) de la clave, o None; marca su uso."""
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT resultado FROM resultados WHERE clave=?", (clave,)).fetchone()
+            if fila:
+                self._db.execute("UPDATE resultados SET usado=? WHERE clave=?",
+                                 (time.time(), clave))
+        return fila[0] if fila else None
+
+    def guardar(self, clave, metodo, resultado):
+        ahora = time.time()
+        tam = len(resultado.encode())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?)",
+                (clave, metodo, resultado, tam, ahora, ahora))
+            self._expulsar()
+
+    def _expulsar(self):
+        """Borra las entradas menos usadas hasta cumplir los límites."""
+        entradas, total = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM resultados").fetchone()
+        if entradas <= self.max_entradas and total <= self.max_bytes:
+            return
+        filas = self._db.execute(
+            "SELECT clave, bytes FROM resultados ORDER BY usado").fetchall()
+        borrar = []
+        for clave, tam in filas:
+            if entradas <= self.max_entradas and total <= self.max_bytes:
+                break
+            borrar.append((clave,))
+            entradas -= 1
+            total -= tam
+        self._db.executemany("DELETE FROM resultados WHERE clave=?", borrar)
+
+    def estadisticas(self):
+        entradas, total = self._ejecutar(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM resultados")[0]
+        return {"entradas": entradas, "bytes": total,
+                "max_entradas": self.max_entradas, "max_bytes": self.max_bytes}
+
+    # Trabajos ---------------------------------------------------------
+    def nuevo_trabajo(self, clave, metodo, estado="en_cola"):
+        id_ = uuid.uuid4().hex
+        ahora = time.time()
+        self._ejecutar("INSERT INTO trabajos VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                       (id_, clave, metodo, estado, ahora,
+                        ahora if estado == "terminado" else None))
+        return id_
+
+    def terminar(self, ids, error=None):
+        estado = "error" if error else "terminado"
+        with self._lock:
+            self._db.executemany(
+                "UPDATE trabajos SET estado=?, terminado=?, error=? WHERE id=?",
+                [(estado, time.time(), error, i) for i in ids])
+
+    def trabajo(self, id_):
+        filas = self._ejecutar(
+            "SELECT clave, metodo, estado, error FROM trabajos WHERE id=?", (id_,))
+        if not filas:
+            return None
+        clave, metodo, estado, error = filas[0]
+        return {"id": id_, "clave": clave, "metodo": metodo, "estado": estado,
+                "error": error}
+
+    def cerrar(self):
+        self._db.close()
+
+
+# ----------------------------------------------------------------------
+# Cola de trabajos
+# ----------------------------------------------------------------------
+class ColaSaturada(Exception):
+    pass
+
+
+class Servicio:
+    """Recibe pedidos, consulta la caché y reparte el resto en el pool."""
+
+    def __init__(self, almacen, trabajadores=2, max_cola=64):
+        self.almacen = almacen
+        self.max_cola = max_cola
+        self._pool = ProcessPoolExecutor(max_workers=trabajadores)
+        self._lock = threading.Lock()
+        self._en_curso = {}         # clave → (future, [ids de trabajo])
+
+    def enviar(self, pedido):
+        """Devuelve (id, estado, resultado JSON o None)."""
+        metodo = pedido.get("metodo")
+        parametros = parametros_canonicos(metodo, pedido.get("parametros", {}))
+        modelo = modelo_desde_json(pedido["modelo"])
+        clave = clave_cache(huella_modelo(modelo), metodo, parametros)
+
+        resultado = self.almacen.buscar(clave)
+        if resultado is not None:
+            return self.almacen.nuevo_trabajo(clave, metodo, "terminado"), \
+                "terminado", resultado
+
+        with self._lock:
+            if clave in self._en_curso:
+                id_ = self.almacen.nuevo_trabajo(clave, metodo)
+                self._en_curso[clave][1].append(id_)
+                return id_, "en_cola", None
+            if len(self._en_curso) >= self.max_cola:
+                raise ColaSaturada()
+            id_ = self.almacen.nuevo_trabajo(clave, metodo)
+            futuro = self._pool.submit(_resolver, modelo, metodo, parametros)
+            self._en_curso[clave] = (futuro, [id_])
+        futuro.add_done_callback(
+            lambda f: self._terminado(clave, metodo, f))
+        return id_, "en_cola", None
+
+    def _terminado(self, clave, metodo, futuro):
+        with self._lock:
+            _, ids = self._en_curso.pop(clave)
+        try:
+            self.almacen.guardar(clave, metodo, futuro.result())
+            self.almacen.terminar(ids)
+        except Exception as e:
+            self.almacen.terminar(ids, error=f"{type(e).__name__}: {e}")
+
+    def consultar(self, id_):
+        trabajo = self.almacen.trabajo(id_)
+        if trabajo is None:
+            return None
+        clave = trabajo.pop("clave")
+        if trabajo["estado"] == "en_cola":
+            with self._lock:
+                en_curso = self._en_curso.get(clave)
+            if en_curso and en_curso[0].running():
+                trabajo["estado"] = "corriendo"
+        elif trabajo["estado"] == "terminado":
+            resultado = self.almacen.buscar(clave)
+            if resultado is None:
+                trabajo["estado"] = "expulsado"
+            else:
+                trabajo["resultado"] = resultado
+        if trabajo["error"] is None:
+            del trabajo["error"]
+        return trabajo
+
+    def cerrar(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self.almacen.cerrar()
+
+
+# ----------------------------------------------------------------------
+# HTTP
+# ----------------------------------------------------------------------
+def _respuesta(campos, resultado=None):
+    """JSON de la respuesta; el resultado ya viene serializado."""
+    texto = json.dumps(campos, ensure_ascii=False)
+    if resultado is not None:
+        texto = texto[:-1] + f', "resultado": {resultado}}}'
+    return texto.encode()
+
+
+class Manejador(BaseHTTPRequestHandler):
+    servicio = None     # se asigna en `crear_servidor`
+
+    def _enviar(self, codigo, cuerpo, cabeceras=()):
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in cabeceras:
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, codigo, mensaje, cabeceras=()):
+        self._enviar(codigo, _respuesta({"error": mensaje}), cabeceras)
+
+    def do_GET(self):
+        partes = self.path.strip("/").split("/")
+        if partes == ["salud"]:
+            return self._enviar(200, _respuesta({"ok": True}))
+        if partes == ["cache"]:
+            return self._enviar(200, _respuesta(
+                self.servicio.almacen.estadisticas()))
+        if len(partes) == 2 and partes[0] == "trabajos":
+            trabajo = self.servicio.consultar(partes[1])
+            if trabajo is None:
+                return self._error(404, "Trabajo inexistente.")
+            resultado = trabajo.pop("resultado", None)
+            return self._enviar(200, _respuesta(trabajo, resultado))
+        self._error(404, "Ruta inexistente.")
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/trabajos":
+            return self._error(404, "Ruta inexistente.")
+        largo = int(self.headers.get("Content-Length", 0))
+        if largo > MAX_CUERPO:
+            return self._error(413, "Pedido demasiado grande.")
+        try:
+            pedido = json.loads(self.rfile.read(largo))
+            id_, estado, resultado = self.servicio.enviar(pedido)
+        except ColaSaturada:
+            return self._error(503, "Cola llena; reintente más tarde.",
+                               [("Retry-After", "5")])
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(400, f"Pedido inválido: {e}")
+        codigo = 200 if resultado is not None else 202
+        self._enviar(codigo, _respuesta({"id": id_, "estado": estado},
+                                        resultado))
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def crear_servidor(host="127.0.0.1", puerto=8765, db="servicio.sqlite",
+                   trabajadores=2, max_cola=64, max_entradas=10_000,
+                   max_bytes=512 * 2**20):
+    """Servidor listo para `serve_forever()`; `servidor.servicio` da acceso
+    a la cola y a la caché (y hay que cerrarlo al terminar)."""
+    servicio = Servicio(Almacen(db, max_entradas, max_bytes), trabajadores,
+                        max_cola)
+    manejador = type("ManejadorServicio", (Manejador,), {"servicio": servicio})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.servicio = servicio
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de solución de PMD")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--db", default="servicio.sqlite")
+    parser.add_argument("--trabajadores", type=int, default=2)
+    parser.add_argument("--max-cola", type=int, default=64)
+    parser.add_argument("--max-entradas", type=int, default=10_000)
+    parser.add_argument("--max-mb", type=float, default=512)
+    args = parser.parse_args()
+
+    servidor = crear_servidor(args.host, args.puerto, args.db,
+                              args.trabajadores, args.max_cola,
+                              args.max_entradas, int(args.max_mb * 2**20))
+    print(f"Sirviendo en http://{args.host}:{args.puerto} (db: {args.db})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.servicio.cerrar()
+
+
+if __name__ == "__main__":
+    main()
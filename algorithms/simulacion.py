@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# algorithms/simulacion.py
+
+"""
+Simulación Monte Carlo vectorizada de una política fija.
+
+Estima el costo medio a largo plazo E[C_R] sin resolver el sistema
+estacionario: avanza T trayectorias a la vez, un paso por iteración,
+muestreando el siguiente estado de todas con operaciones vectorizadas
+sobre P^pol en CSR. Para el muestreo se precalcula, por fila, una de:
+
+  • "alias"     : tablas de alias (Walker/Vose), O(1) por muestra con
+                  un solo uniforme; se construyen por rondas
+                  vectorizadas, una por entrada de la fila más larga
+  • "acumulada" : sumas acumuladas por fila y búsqueda binaria global,
+                  O(log nnz) por muestra pero construcción O(nnz)
+
+"auto" usa alias si las filas tienen a lo más MAX_FILA_ALIAS entradas.
+
+Intervalo de confianza por medias de lotes: tras el calentamiento, la
+corrida se divide en lotes de `tam_lote` pasos; la media de cada lote
+(promediada sobre las T trayectorias) es una observación y el intervalo
+usa la t de Student con (lotes – 1) grados de libertad. Con `tol` la
+simulación se detiene en cuanto la semiamplitud baja de tol (absoluta,
+o relativa a |g| con relativa=True) y hay al menos `lotes_min` lotes.
+Si la autocorrelación de las medias de lotes es alta, se juntan de a
+pares (el lote se duplica) antes de calcular el intervalo.
+
+La semilla fija el estado inicial y todas las muestras: la misma
+llamada da siempre el mismo resultado.
+"""
+
+import time
+import numpy as np
+from scipy import sparse, stats
+from modelo import como_modelo
+
+MAX_FILA_ALIAS = 64
+AUTOCORRELACION_MAX = 0.2       # de las medias de lotes (retardo 1)
+
+
+class Muestreador:
+    """Muestreo vectorizado de transiciones de una matriz CSR n × n."""
+
+    def __init__(self, P, metodo="auto"):
+        P = sparse.csr_matrix(P)
+        self.indptr = np.asarray(P.indptr, dtype=np.int64)
+        self.indices = np.asarray(P.indices, dtype=np.int64)
+        data = np.asarray(P.data, dtype=np.float64)
+        self.largo = np.diff(self.indptr)
+        if np.any(self.largo == 0):
+            raise ValueError("Hay filas sin transiciones.")
+        if metodo == "auto":
+            metodo = "alias" if self.largo.max() <= MAX_FILA_ALIAS else "acumulada"
+        self.metodo = metodo
+        fila = np.repeat(np.arange(self.largo.size), self.largo)
+        # Normaliza cada fila (absorbe el redondeo de los datos)
+        sumas = np.add.reduceat(data, self.indptr[:-1])
+        data = data / sumas[fila]
+        if metodo == "alias":
+            self.prob, self.alias = self._tablas_alias(data, fila)
+        elif metodo == "acumulada":
+            acumulada = np.cumsum(data)
+            base = np.concatenate(([0.0], acumulada[self.indptr[1:-1] - 1]))
+            # fila + acumulada dentro de la fila: creciente en todo el arreglo
+            self.clave = fila + (acumulada - base[fila])
+            self.clave[self.indptr[1:] - 1] = np.arange(1, self.largo.size + 1)
+        else:
+            raise ValueError(f"Método de muestreo desconocido: {metodo}")
+
+    def _tablas_alias(self, data, fila):
+        """Vose por rondas: en cada una, cada fila empareja una entrada
+        chica (q < 1) con una grande (q ≥ 1)."""
+        nnz = data.size
+        q = data * self.largo[fila]
+        prob = np.ones(nnz)
+        alias = np.arange(nnz)
+        abierta = np.ones(nnz, dtype=bool)
+        posiciones = np.arange(nnz)
+        inicios = self.indptr[:-1]
+        while True:
+            chica = abierta & (q < 1.0)
+            grande = abierta & (q >= 1.0)
+            s = np.minimum.reduceat(np.where(chica, posiciones, nnz), inicios)
+            g = np.minimum.reduceat(np.where(grande, posiciones, nnz), inicios)
+            ok = (s < nnz) & (g < nnz)
+            if not ok.any():
+                break
+            s, g = s[ok], g[ok]
+            prob[s] = q[s]
+            alias[s] = g
+            abierta[s] = False
+            q[g] -= 1.0 - q[s]
+        # Las que quedan abiertas tienen q ≈ 1 (prob = 1, sin alias)
+        return prob, alias
+
+    def siguiente(self, estados, rng):
+        """Un paso de cada trayectoria desde `estados`."""
+        u = rng.random(estados.size)
+        if self.metodo == "alias":
+            largo = self.largo[estados]
+            x = u * largo
+            k = np.minimum(x.astype(np.int64), largo - 1)
+            pos = self.indptr[estados] + k
+            pos = np.where(x - k < self.prob[pos], pos, self.alias[pos])
+        else:
+            pos = np.searchsorted(self.clave, estados + u, side="right")
+            pos = np.minimum(pos, self.indptr[estados + 1] - 1)
+        return self.indices[pos]
+
+
+def _intervalo(medias, nivel):
+    """(media, semiamplitud) de las medias de lotes con la t de Student."""
+    k = medias.size
+    if k < 2:
+        return float(medias.mean()), float("inf")
+    s = medias.std(ddof=1)
+    return (float(medias.mean()),
+            float(stats.t.ppf(0.5 + nivel / 2, k - 1) * s / np.sqrt(k)))
+
+
+def _autocorrelacion(x):
+    if x.size < 3 or np.ptp(x) == 0:
+        return 0.0
+    d = x - x.mean()
+    return float(d[:-1] @ d[1:] / (d @ d))
+
+
+def _agrupar(medias, lotes_min):
+    """Junta lotes de a pares mientras estén correlacionados."""
+    factor = 1
+    while (medias.size >= 2 * lotes_min
+           and _autocorrelacion(medias) > AUTOCORRELACION_MAX):
+        medias = 0.5 * (medias[0:medias.size - medias.size % 2:2]
+                        + medias[1::2][:medias.size // 2])
+        factor *= 2
+    return medias, factor
+
+
+def simular_politica(datos, pol, trayectorias=1000, pasos=10_000,
+                     calentamiento=1000, tam_lote=500, nivel=0.95, tol=None,
+                     relativa=False, lotes_min=10, semilla=None,
+                     estado_inicial=None, metodo="auto"):
+    """Estima el costo medio de `pol` por simulación.
+
+    pol es una política (una decisión por estado) o cualquier resultado
+    de `api` con atributo `politica`. pasos es el máximo de pasos por
+    trayectoria después del calentamiento (se redondea a lotes
+    completos). estado_inicial: un estado, un arreglo de T estados o
+    None (uniforme al azar).
+
+    Devuelve un diccionario con g, semiamplitud, intervalo, nivel,
+    lotes, tam_lote (después de agrupar), pasos por trayectoria,
+    trayectorias, muestras, convergio (si se pidió tol), metodo de
+    muestreo y tiempo (s).
+    """
+    modelo = como_modelo(datos)
+    pol = getattr(pol, "politica", pol)
+    if pol is None:
+        raise ValueError("El resultado no tiene política.")
+    if not 0 < nivel < 1:
+        raise ValueError("El nivel de confianza debe estar en (0, 1).")
+    if trayectorias < 1 or tam_lote < 1:
+        raise ValueError("trayectorias y tam_lote deben ser positivos.")
+
+    t0 = time.perf_counter()
+    costos = np.asarray(modelo.costos_politica(pol), dtype=np.float64)
+    muestreador = Muestreador(modelo.matriz_politica(pol), metodo)
+    rng = np.random.default_rng(semilla)
+    if estado_inicial is None:
+        estados = rng.integers(0, modelo.n, size=trayectorias)
+    else:
+        estados = np.broadcast_to(np.asarray(estado_inicial, dtype=np.int64),
+                                  (trayectorias,)).copy()
+        if estados.min() < 0 or estados.max() >= modelo.n:
+            raise ValueError("Estado inicial fuera de rango.")
+
+    for _ in range(calentamiento):
+        estados = muestreador.siguiente(estados, rng)
+
+    lotes_max = max(1, -(-pasos // tam_lote))
+    medias = np.empty(lotes_max)
+    convergio = False
+    g, semiamplitud, factor = float("nan"), float("inf"), 1
+    for b in range(lotes_max):
+        suma = np.zeros(trayectorias)
+        for _ in range(tam_lote):
+            suma += costos[estados]
+            estados = muestreador.siguiente(estados, rng)
+        medias[b] = suma.mean() / tam_lote
+        if tol is not None and b + 1 >= lotes_min:
+            agrupadas, factor = _agrupar(medias[:b + 1], lotes_min)
+            g, semiamplitud = _intervalo(agrupadas, nivel)
+            if semiamplitud <= (tol * abs(g) if relativa else tol):
+                convergio = True
+                break
+    lotes = b + 1
+    if not convergio:
+        agrupadas, factor = _agrupar(medias[:lotes], lotes_min)
+        g, semiamplitud = _intervalo(agrupadas, nivel)
+    return {
+        "g": g,
+        "semiamplitud": semiamplitud,
+        "intervalo": (g - semiamplitud, g + semiamplitud),
+        "nivel": nivel,
+        "lotes": lotes // factor,
+        "tam_lote": tam_lote * factor,
+        "pasos": lotes * tam_lote,
+        "trayectorias": trayectorias,
+        "muestras": lotes * tam_lote * trayectorias,
+        "convergio": convergio,
+        "metodo": muestreador.metodo,
+        "tiempo": time.perf_counter() - t0,
+    }
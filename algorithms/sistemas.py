@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# algorithms/sistemas.py
+
+"""
+Resolución de los sistemas lineales de evaluación de políticas.
+
+La evaluación de una política lleva a sistemas A x = b con
+  • A = I – αP^π                        (con descuento)
+  • A = [[I – P^π, –1], [e_{n-1}ᵀ, 0]]   (costo medio, x = [v, g])
+
+Las filas de P^π suelen tener muy pocos elementos no nulos, así que
+`resolver_sistema` elige el método según tamaño y densidad:
+  • "denso"   : np.linalg.solve, para sistemas pequeños o muy llenos
+  • "directo" : factorización LU dispersa (SuperLU), solo cuando el ancho
+                de banda tras Cuthill–McKee acota el relleno (cadenas
+                locales: inventarios, colas). En cadenas dispersas
+                aleatorias el relleno la haría más lenta que la vía densa.
+  • "krylov"  : GMRES precondicionado con Jacobi (ILU si no converge),
+                para todo lo demás
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg as spla
+from scipy.sparse import csgraph
+
+# Umbrales para la elección automática del método
+N_DENSO_MAX = 1000          # hasta aquí siempre conviene la vía densa
+DENSIDAD_DENSA = 0.05       # por encima de esta densidad, vía densa
+TOL_KRYLOV = 1e-12
+FACTOR_RELLENO = 50         # LU dispersa si n · ancho de banda ≤ esto · nnz
+
+
+def elegir_metodo(A):
+    """Método automático para A según su tamaño y densidad."""
+    n = A.shape[0]
+    nnz = A.nnz if sparse.issparse(A) else np.count_nonzero(A)
+    if n <= N_DENSO_MAX or nnz > DENSIDAD_DENSA * n * n:
+        return "denso"
+    if relleno_acotado(A):
+        return "directo"
+    return "krylov"
+
+
+def resolver_sistema(A, b, metodo="auto", precondicionador="jacobi", x0=None):
+    """Resuelve A x = b con el método indicado ("auto" elige por tamaño).
+
+    precondicionador ("jacobi" o "ilu") y la aproximación inicial x0 solo
+    se usan con metodo="krylov".
+    """
+    if metodo == "auto":
+        metodo = elegir_metodo(A)
+
+    if metodo == "denso":
+        if sparse.issparse(A):
+            A = A.toarray()
+        return np.linalg.solve(A, b)
+
+    A = sparse.csc_matrix(A)
+    if metodo == "directo":
+        return spla.splu(A).solve(np.asarray(b, dtype=float))
+    if metodo == "krylov":
+        return _resolver_krylov(A, b, precondicionador, x0)
+    raise ValueError(f"Método de resolución desconocido: {metodo}")
+
+
+def _precondicionador(A, tipo):
+    if tipo == "ilu":
+        try:
+            ilu = spla.spilu(A, drop_tol=1e-4, fill_factor=5)
+            return spla.LinearOperator(A.shape, ilu.solve)
+        except RuntimeError:
+            return None
+    if tipo == "jacobi":
+        diag = A.diagonal()
+        diag[diag == 0] = 1.0
+        return sparse.diags(1.0 / diag)
+    return None
+
+
+def relleno_acotado(A):
+    """True si n · (ancho de banda tras RCM) ≤ FACTOR_RELLENO · nnz.
+
+    Cota barata (O(nnz)) del relleno de la LU. Las filas y columnas
+    densas (como la columna de –1 del sistema de costo medio) solo añaden
+    un borde al relleno y no cuentan para el ancho.
+    """
+    A = sparse.csr_matrix(A)
+    por_fila = np.diff(A.indptr)
+    por_col = np.bincount(A.indices, minlength=A.shape[1])
+    limite = 10 * max(1.0, A.nnz / A.shape[0])
+    normal = np.flatnonzero((por_fila <= limite) & (por_col <= limite))
+    B = A[normal][:, normal]
+    perm = csgraph.reverse_cuthill_mckee(B, symmetric_mode=False)
+    inv = np.empty_like(perm)
+    inv[perm] = np.arange(perm.size)
+    B = B.tocoo()
+    ancho = int(np.abs(inv[B.row] - inv[B.col]).max()) if B.nnz else 0
+    return A.shape[0] * (ancho + 1) <= FACTOR_RELLENO * A.nnz
+
+
+def _resolver_krylov(A, b, precondicionador, x0=None):
+    """GMRES precondicionado; si no converge, reintenta con ILU.
+
+    Nunca recurre a LU dispersa: a estos tamaños y con relleno no acotado
+    la factorización no cabría en memoria ni en tiempo. Si ILU tampoco
+    converge se lanza RuntimeError.
+    """
+    M = _precondicionador(A, precondicionador)
+    x, info = _gmres(A, b, M, x0)
+    if info != 0 and precondicionador != "ilu":
+        x, info = _gmres(A, b, _precondicionador(A, "ilu"), x)
+    if info != 0:
+        raise RuntimeError(f"GMRES no convergió (info={info}) para n={A.shape[0]}.")
+    return x
+
+
+def _gmres(A, b, M, x0):
+    return spla.gmres(A, b, x0=x0, M=M, rtol=TOL_KRYLOV, atol=0.0,
+                      restart=50, maxiter=200)
+
+
+def matriz_descuento(Ppol, alpha):
+    """I – αP^π, dispersa si P^π lo es."""
+    n = Ppol.shape[0]
+    if sparse.issparse(Ppol):
+        return (sparse.identity(n, format="csr") - alpha * Ppol).tocsr()
+    return np.eye(n) - alpha * Ppol
+
+
+def matriz_costo_medio(Ppol):
+    """Matriz (n+1)×(n+1) del sistema de costo medio con v_{n-1} = 0."""
+    n = Ppol.shape[0]
+    if sparse.issparse(Ppol):
+        ult = sparse.csr_matrix(([1.0], ([0], [n - 1])), shape=(1, n))
+        return sparse.bmat([
+            [sparse.identity(n, format="csr") - Ppol, -np.ones((n, 1))],
+            [ult, None],
+        ], format="csr")
+    A = np.zeros((n + 1, n + 1))
+    A[:n, :n] = np.eye(n) - Ppol
+    A[:n, n] = -1.0
+    A[n, n - 1] = 1.0
+    return A
+
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# algorithms/traza.py
+
+"""
+Instrumentación de los métodos iterativos.
+
+En lugar de imprimir dentro de los bucles, los motores (`iterar_valores`,
+`iterar_politicas`, `iterar_valores_relativos`, el LP) emiten eventos a
+una traza:
+
+  traza.inicio(metodo, parametros)   al empezar (α, variante, n, …)
+  traza.iteracion(evento)            un diccionario por iteración
+  traza.detalle(metodo, generar)     texto opcional (el PPL del LP, …);
+                                     generar() devuelve las líneas y solo
+                                     se llama si la traza muestra texto
+  traza.fin(resumen)                 al terminar
+
+Cada evento de iteración trae: metodo, iteracion, residuo, cambios (de
+política), tiempo (desde el inicio), tiempo_resolucion (del sistema
+lineal, si hubo) y, según el método, g, politica, cotas… El vector de
+valores solo se incluye si `traza.valores` es True.
+
+Los motores comprueban `traza.activa` antes de armar el evento, así que
+la traza silenciosa no cuesta nada. Trazas disponibles:
+
+  • TrazaSilenciosa : no hace nada
+  • TrazaResumen    : una línea al terminar
+  • TrazaJSONL      : un objeto JSON por línea en un archivo
+  • TrazaImpresora  : la salida de siempre (v_i de cada iteración, …)
+  • TrazaMultiple   : reparte los eventos entre varias trazas
+"""
+
+import json
+import time
+import numpy as np
+
+
+def evento(metodo, iteracion, t0, residuo=None, cambios=None,
+           tiempo_resolucion=None, **campos):
+    """Evento de iteración con los campos comunes."""
+    campos.update(metodo=metodo, iteracion=iteracion, residuo=residuo,
+                  cambios=cambios, tiempo=time.perf_counter() - t0,
+                  tiempo_resolucion=tiempo_resolucion)
+    return campos
+
+
+class Traza:
+    """Traza base: no hace nada. Las subclases redefinen lo que usan."""
+
+    activa = True       # False: los motores no arman eventos
+    valores = False     # True: incluir el vector de valores en los eventos
+    textos = False      # True: llamar a los generadores de `detalle`
+
+    def inicio(self, metodo, parametros):
+        pass
+
+    def iteracion(self, evento):
+        pass
+
+    def detalle(self, metodo, generar):
+        pass
+
+    def fin(self, resumen):
+        pass
+
+
+class TrazaSilenciosa(Traza):
+    activa = False
+
+
+SILENCIOSA = TrazaSilenciosa()
+
+
+def como_traza(traza):
+    """None → traza silenciosa."""
+    return SILENCIOSA if traza is None else traza
+
+
+class TrazaResumen(Traza):
+    """Imprime una línea por método al terminar."""
+
+    def __init__(self):
+        self._ultimo = {}
+
+    def iteracion(self, evento):
+        self._ultimo = evento
+
+    def fin(self, resumen):
+        metodo = resumen.get("metodo", self._ultimo.get("metodo", ""))
+        iteraciones = resumen.get("iteraciones", self._ultimo.get("iteracion", 0))
+        partes = [f"{metodo}: {iteraciones} iteraciones"]
+        residuo = self._ultimo.get("residuo")
+        if residuo is not None:
+            partes.append(f"residuo {residuo:.3g}")
+        if "tiempo" in resumen:
+            partes.append(f"{resumen['tiempo']:.4f} s")
+        if "convergio" in resumen:
+            partes.append("convergió" if resumen["convergio"] else "sin converger")
+        print(", ".join(partes))
+        self._ultimo = {}
+
+
+def _a_json(x):
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    if isinstance(x, np.generic):
+        return x.item()
+    if isinstance(x, tuple):
+        return list(x)
+    raise TypeError(f"No serializable: {type(x).__name__}")
+
+
+class TrazaJSONL(Traza):
+    """Escribe cada evento como una línea JSON en `ruta`.
+
+    Con valores=True también guarda el vector de valores de cada
+    iteración (archivos grandes en modelos grandes).
+    """
+
+    def __init__(self, ruta, valores=False):
+        self.valores = valores
+        self._archivo = open(ruta, "a", encoding="utf-8")
+
+    def _escribir(self, tipo, datos):
+        datos = {"tipo": tipo, **datos}
+        self._archivo.write(json.dumps(datos, default=_a_json, ensure_ascii=False))
+        self._archivo.write("\n")
+
+    def inicio(self, metodo, parametros):
+        self._escribir("inicio", {"metodo": metodo, **parametros})
+
+    def iteracion(self, evento):
+        if not self.valores or evento.get("valores") is None:
+            evento = {k: v for k, v in evento.items() if k != "valores"}
+        self._escribir("iteracion", evento)
+
+    def fin(self, resumen):
+        self._escribir("fin", {k: v for k, v in resumen.items()
+                               if not isinstance(v, np.ndarray)})
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class TrazaImpresora(Traza):
+    """Reproduce la salida por iteración que imprimían los métodos."""
+
+    valores = True
+    textos = True
+
+    def __init__(self):
+        self._parametros = {}
+
+    def inicio(self, metodo, parametros):
+        self._parametros = parametros
+        if metodo == "vi":
+            print("\n--- Valores de la iteración ---")
+        elif metodo == "lp" and parametros.get("backend") == "highs":
+            sentido = "Maximizar" if parametros.get("maximizar") else "Minimizar"
+            print(f"{sentido} z = Σ c_(i,j)·y_(i,j) con HiGHS: "
+                  f"{parametros['variables']} variables, "
+                  f"{parametros['restricciones']} restricciones, "
+                  f"{parametros['no_nulos']} coeficientes no nulos")
+
+    def iteracion(self, evento):
+        metodo, k = evento["metodo"], evento["iteracion"]
+        if metodo == "vi":
+            print(f"\nIteración {k}:")
+        elif metodo == "pi":
+            print(f"\n--- Iteración {k} (sin descuento) ---")
+            print(f" g = {evento['g']:.6f}")
+        elif metodo == "pi_desc":
+            print(f"\n--- Iteración {k} (con descuento α={self._parametros.get('alpha')}) ---")
+        elif metodo == "rvi":
+            print(f"\n--- Iteración {k} (valores relativos) ---")
+            print(f" {evento['cotas'][0]:.6f} ≤ g* ≤ {evento['cotas'][1]:.6f}")
+            return
+        if evento.get("valores") is not None:
+            for i, vi in enumerate(evento["valores"]):
+                print(f" v_{i} = {vi:.6f}")
+        if metodo in ("pi", "pi_desc"):
+            print(" Política mejorada:", evento["politica"])
+
+    def detalle(self, metodo, generar):
+        for linea in generar():
+            print(linea)
+
+
+class TrazaMultiple(Traza):
+    """Reenvía cada evento a todas las trazas activas."""
+
+    def __init__(self, *trazas):
+        self.trazas = [t for t in trazas if t.activa]
+        self.activa = bool(self.trazas)
+        self.valores = any(t.valores for t in self.trazas)
+        self.textos = any(t.textos for t in self.trazas)
+
+    def inicio(self, metodo, parametros):
+        for t in self.trazas:
+            t.inicio(metodo, parametros)
+
+    def iteracion(self, evento):
+        for t in self.trazas:
+            t.iteracion(evento)
+
+    def detalle(self, metodo, generar):
+        lineas = None
+        for t in self.trazas:
+            if t.textos:
+                lineas = list(generar()) if lineas is None else lineas
+                t.detalle(metodo, lambda: lineas)
+
+    def fin(self, resumen):
+        for t in self.trazas:
+            t.fin(resumen)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# algorithms/valores_relativos.py
+
+"""
+Iteración de valores relativos (RVI) para PMD de costo medio.
+
+Ecuación de iteración, con un estado de referencia s (por defecto n-1):
+  w^{k}_i   = min_{a∈D(i)} [ c_{i,a} + Σ_j P̃_a[i,j] · h^k_j ]
+  h^{k+1}_i = w^k_i – w^k_s
+(o max si el problema es de maximizar).
+
+Con la transformación de aperiodicidad se usa P̃ = τP + (1–τ)I, 0 < τ ≤ 1,
+que no cambia la ganancia g y escala el sesgo: h = τ·h̃. Así RVI converge
+aunque alguna política óptima sea periódica.
+
+Cada iteración es un producto matriz-vector (motor de `bellman.py`), sin
+resolver sistemas. Con d = w^k – h^k se tienen las cotas
+  min_i d_i ≤ g* ≤ max_i d_i
+y se detiene cuando sp(d) = max d – min d < tol.
+
+El resultado se presenta igual que en `metodo_policy_improvement`:
+g y v_0…v_{n-1} con v_{n-1} = 0.
+"""
+
+import time
+import numpy as np
+from modelo import como_modelo
+from bellman import reducir, argoptimo
+from traza import como_traza, evento
+
+
+def iterar_valores_relativos(datos, iter_max, tol, tau=1.0, ref=None,
+                             h0=None, traza=None):
+    """RVI con transformación de aperiodicidad τ y estado de referencia.
+
+    Cada iteración emite a `traza` un evento "rvi" con las cotas
+    (g_inf, g_sup) y residuo sp(d).
+
+    Devuelve un diccionario con g (punto medio de las cotas), el sesgo h
+    (con h[ref] = 0), la política codiciosa, las cotas de g*, iteraciones,
+    tiempo (s) y si convergió.
+    """
+    modelo = como_modelo(datos)
+    if not 0 < tau <= 1:
+        raise ValueError("τ debe cumplir 0 < τ ≤ 1.")
+    if iter_max < 1:
+        raise ValueError("iter_max debe ser al menos 1.")
+    n = modelo.n
+    ref = n - 1 if ref is None else ref
+    h = np.zeros(n) if h0 is None else np.array(h0, dtype=float) / tau
+    h -= h[ref]
+    traza = como_traza(traza)
+    traza.inicio("rvi", {"n": n, "iter_max": iter_max, "tol": tol,
+                         "tau": tau, "ref": ref})
+
+    t0 = time.perf_counter()
+    convergio = False
+    for k in range(1, iter_max + 1):
+        q = modelo.costos + tau * modelo.producto(h) \
+            + (1 - tau) * h[modelo.estados]
+        w = reducir(modelo, q)
+        d = w - h
+        g_inf, g_sup = float(d.min()), float(d.max())
+        h = w - w[ref]
+        if traza.activa:
+            traza.iteracion(evento(
+                "rvi", k, t0, residuo=g_sup - g_inf, cotas=(g_inf, g_sup),
+                valores=tau * h if traza.valores else None))
+        if g_sup - g_inf < tol:
+            convergio = True
+            break
+    tiempo = time.perf_counter() - t0
+    traza.fin({"metodo": "rvi", "iteraciones": k, "convergio": convergio,
+               "tiempo": tiempo})
+
+    q = modelo.costos + tau * modelo.producto(h)
+    politica = tuple(modelo.acciones[argoptimo(modelo, q)].tolist())
+    return {
+        "g": 0.5 * (g_inf + g_sup),
+        "h": tau * h,
+        "politica": politica,
+        "cota_inferior": g_inf,
+        "cota_superior": g_sup,
+        "iteraciones": k,
+        "tiempo": tiempo,
+        "convergio": convergio,
+    }
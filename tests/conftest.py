@@ -0,0 +1,8 @@
+# tests/conftest.py
+
+"""Los módulos de algorithms/ se importan por nombre, como en main.py."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "algorithms"))
@@ -0,0 +1,17 @@
+# tests/test_benchmark.py
+
+import pytest
+
+from benchmark import correr_caso
+
+
+@pytest.mark.parametrize("generador, n, m", [("cola", 60, 2),
+                                             ("cola", 200, 3),
+                                             ("inventario", 30, 3),
+                                             ("aleatorio", 40, 2)])
+def test_metodos_coinciden(generador, n, m):
+    """cola(60, 2) daba "NO coinciden" con las tolerancias por omisión
+    de HiGHS (1.509788 contra 1.5097947)."""
+    caso = correr_caso(generador, n, m, memoria=False)
+    assert caso["coinciden"], caso["discrepancia"]
+    assert caso["resultados"]["lp"]["iteraciones"] > 0
@@ -0,0 +1,97 @@
+# tests/test_checkpoint.py
+
+import numpy as np
+import pytest
+
+import api
+from checkpoint import (TrazaCheckpoint, arranque_en_caliente,
+                        cargar_checkpoint, guardar_checkpoint,
+                        resolver_reanudable)
+from generadores import aleatorio_disperso, cola, inventario
+from traza import Traza, TrazaMultiple
+
+ALPHA = 0.98
+TOL = 1e-9
+
+
+@pytest.fixture
+def modelo():
+    return aleatorio_disperso(80, 3, semilla=7)
+
+
+class _Corte(Traza):
+    """Simula que el proceso muere en la iteración `en`."""
+
+    def __init__(self, en):
+        self.en = en
+
+    def iteracion(self, evento):
+        if evento["iteracion"] == self.en:
+            raise KeyboardInterrupt
+
+
+def test_formato_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / "x.ckpt")
+    v = np.linspace(0, 1, 17)
+    pol = np.arange(5, dtype=np.int32)
+    guardar_checkpoint(ruta, {"metodo": "vi", "iteracion": 3},
+                       {"v": v, "politica": pol, "residuos": np.empty(0)})
+    for mmap in (True, False):
+        ck = cargar_checkpoint(ruta, mmap=mmap)
+        assert ck["metodo"] == "vi" and ck["iteracion"] == 3
+        np.testing.assert_array_equal(ck["v"], v)
+        np.testing.assert_array_equal(ck["politica"], pol)
+        assert ck["residuos"].shape == (0,)
+    assert not (tmp_path / "x.ckpt.tmp").exists()
+
+
+def test_vi_reanudada_igual_a_corrida_completa(modelo, tmp_path):
+    completa = api.resolver_vi(modelo, ALPHA, TOL)
+    ruta = str(tmp_path / "vi.ckpt")
+    with pytest.raises(KeyboardInterrupt):
+        api.resolver_vi(modelo, ALPHA, TOL, traza=TrazaMultiple(
+            TrazaCheckpoint(ruta, intervalo=50, modelo=modelo), _Corte(420)))
+    assert cargar_checkpoint(ruta)["iteracion"] == 400
+
+    res = resolver_reanudable(modelo, "vi", ruta, alpha=ALPHA, tol=TOL)
+    assert res.convergio
+    assert res.politica == completa.politica
+    np.testing.assert_allclose(res.v, completa.v, atol=10 * TOL / (1 - ALPHA))
+    # Se retoma desde la iteración 400: el total es el de una sola corrida
+    assert abs(res.iteraciones - completa.iteraciones) <= 1
+    ck = cargar_checkpoint(ruta)
+    assert ck["completo"] and ck["residuos"].size == res.iteraciones
+
+
+def test_rvi_y_pi_reanudadas(tmp_path):
+    modelo = cola(80, 3, semilla=1)
+    g = api.resolver_pi(modelo).g
+    for metodo, parametros in (("rvi", {"tol": 1e-10, "iter_max": 100}),
+                               ("pi", {"iter_max": 1})):
+        ruta = str(tmp_path / f"{metodo}.ckpt")
+        parcial = resolver_reanudable(modelo, metodo, ruta, intervalo=1,
+                                      **parametros)
+        assert not parcial.convergio
+        parametros.pop("iter_max")
+        res = resolver_reanudable(modelo, metodo, ruta, intervalo=1,
+                                  **parametros)
+        assert res.convergio
+        assert res.g == pytest.approx(g, rel=1e-8)
+        assert res.iteraciones > parcial.iteraciones
+
+
+def test_checkpoint_de_otro_metodo(modelo, tmp_path):
+    ruta = str(tmp_path / "vi.ckpt")
+    resolver_reanudable(modelo, "vi", ruta, alpha=ALPHA, tol=1e-3)
+    with pytest.raises(ValueError):
+        resolver_reanudable(modelo, "rvi", ruta, tol=1e-3)
+
+
+def test_arranque_en_caliente_con_decision_no_viable(tmp_path):
+    modelo = inventario(30, 4, semilla=2)
+    previo = api.resolver_pi_desc(modelo, 0.9)
+    otro = inventario(30, 3, semilla=2)      # sin la decisión 4
+    arranque = arranque_en_caliente(previo, otro, alpha=0.9)
+    otro.indices_politica(arranque["pol0"])  # todas viables
+    res = api.resolver_pi_desc(otro, 0.9, pol0=arranque["pol0"])
+    assert res.politica == api.resolver_pi_desc(otro, 0.9).politica
@@ -0,0 +1,62 @@
+# tests/test_compacto.py
+
+import numpy as np
+import pytest
+
+import api
+from compacto import MatrizCompacta, compactar, verificar_precision
+from generadores import aleatorio_disperso, cola, inventario
+
+
+@pytest.fixture(scope="module")
+def inv():
+    return inventario(50, 4, semilla=3)
+
+
+@pytest.mark.parametrize("precision", ["float32", "float64"])
+def test_producto_y_filas(precision):
+    modelo = aleatorio_disperso(300, 3, semilla=4)
+    P = modelo.matriz_csr()
+    C = MatrizCompacta.desde(P, precision)
+    x = np.random.default_rng(0).random((300, 2))
+    rtol = 1e-6 if precision == "float32" else 1e-14
+    np.testing.assert_allclose(C @ x[:, 0], P @ x[:, 0], rtol=rtol)
+    np.testing.assert_allclose(C @ x, P @ x, rtol=rtol)
+    idx = np.array([5, 0, 899, 5])
+    np.testing.assert_allclose(C[idx].toarray(), P[idx].toarray(), atol=1e-7)
+    np.testing.assert_allclose(C[10:20].toarray(), P[10:20].toarray(), atol=1e-7)
+
+
+def test_filas_float64_suman_uno(inv):
+    C = compactar(inv).P
+    np.testing.assert_allclose(np.asarray(C.tocsr().sum(axis=1)).ravel(), 1.0,
+                               rtol=0, atol=1e-15)
+    np.testing.assert_allclose(C.getrow(7).sum(), 1.0, rtol=0, atol=1e-15)
+
+
+@pytest.mark.parametrize("backend", ["highs", "pulp"])
+def test_lp_compacto_igual_a_float64(inv, backend):
+    """Regresión: con filas float32 sin reescalar HiGHS daba 114.917 y
+    PuLP 115.680 en lugar de 110.806."""
+    g = api.resolver_lp(inv, backend=backend).g
+    g_compacto = api.resolver_lp(compactar(inv), backend=backend).g
+    assert g == pytest.approx(110.806, abs=1e-3)
+    assert g_compacto == pytest.approx(g, rel=1e-6)
+
+
+def test_metodos_coinciden_en_compacto(inv):
+    compacto = compactar(inv)
+    g = api.resolver_pi(inv).g
+    assert api.resolver_pi(compacto).g == pytest.approx(g, rel=1e-6)
+    assert api.resolver_rvi(compacto, 1e-9).g == pytest.approx(g, rel=1e-6)
+    assert api.resolver_lp(compacto, backend="highs").g == pytest.approx(g, rel=1e-6)
+
+
+@pytest.mark.parametrize("modelo", [inventario(50, 4, semilla=3),
+                                    cola(60, 2, semilla=1),
+                                    aleatorio_disperso(80, 3, semilla=2)])
+def test_verificar_precision(modelo):
+    r = verificar_precision(modelo)
+    assert r["error_relativo"] < 1e-5
+    assert r["error_relativo_lp"] < 1e-6
+    assert r["misma_politica_lp"]
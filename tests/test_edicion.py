@@ -0,0 +1,152 @@
+# tests/test_edicion.py
+
+import itertools
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from compacto import MatrizCompacta, compactar
+from edicion import EdicionModelo, ResolucionIncremental, diferencia_modelos
+from estacionaria import clases_recurrentes
+from generadores import aleatorio_disperso, inventario
+from modelo import ModeloPMD
+
+ALPHA = 0.9
+
+
+def _fuerza_bruta(modelo):
+    """g* (sobre las políticas unicadena) y v* con descuento ALPHA,
+    evaluando todas las políticas con sistemas densos."""
+    n = modelo.n
+    g_opt, v_opt = None, None
+    for pol in itertools.product(*(modelo.decisiones(i) for i in range(n))):
+        P = modelo.matriz_politica(pol, densa=True)
+        c = modelo.costos_politica(pol).astype(np.float64)
+        v = np.linalg.solve(np.eye(n) - ALPHA * P, c)
+        v_opt = v if v_opt is None else np.minimum(v_opt, v)
+        if len(clases_recurrentes(P)) == 1:
+            A = np.vstack([P.T - np.eye(n), np.ones(n)])
+            pi = np.linalg.lstsq(A, np.append(np.zeros(n), 1.0), rcond=None)[0]
+            g = float(pi @ c)
+            g_opt = g if g_opt is None else min(g_opt, g)
+    return g_opt, v_opt
+
+
+def _editar(edicion, rng, cambios=3):
+    modelo = edicion.base
+    for _ in range(cambios):
+        i = int(rng.integers(modelo.n))
+        a = int(rng.choice(modelo.decisiones(i)))
+        edicion.cambiar_costo(i, a, rng.uniform(0, 100))
+        fila = rng.random(modelo.n) * (rng.random(modelo.n) < 0.6)
+        fila[i] += 1e-3
+        edicion.cambiar_fila(i, a, fila / fila.sum())
+    return edicion
+
+
+# ----------------------------------------------------------------------
+# Edición de modelos
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("formato", ["densa", "csr", "compacta"])
+def test_aplicar_conserva_formato(formato):
+    base = aleatorio_disperso(20, 3, semilla=1)
+    if formato == "densa":
+        base = ModeloPMD(base.n, base.inicio, base.acciones, base.costos,
+                         base.matriz_csr().toarray())
+    elif formato == "compacta":
+        base = compactar(base)
+    edicion = EdicionModelo(base).cambiar_costo(3, 2, 7.5) \
+        .cambiar_fila(4, 1, {0: 0.25, 19: 0.75})
+    nuevo = edicion.aplicar()
+    assert type(nuevo.P) is type(base.P)
+    if formato == "compacta":
+        assert nuevo.P.dtype == np.float32
+    k_costo, k_fila = base.tabla_indices()[3, 2], base.tabla_indices()[4, 1]
+    assert nuevo.costos[k_costo] == 7.5
+    fila = np.zeros(20)
+    fila[[0, 19]] = [0.25, 0.75]
+    np.testing.assert_allclose(nuevo.fila(k_fila), fila)
+    # El resto queda igual y el base no se toca
+    otros = np.setdiff1d(np.arange(base.num_pares), [k_costo, k_fila])
+    np.testing.assert_array_equal(nuevo.matriz_csr()[otros].toarray(),
+                                  base.matriz_csr()[otros].toarray())
+    assert base.costos[k_costo] != 7.5
+    np.testing.assert_array_equal(diferencia_modelos(base, nuevo),
+                                  edicion.pares)
+
+
+def test_ediciones_invalidas():
+    edicion = EdicionModelo(inventario(10, 3))
+    with pytest.raises(ValueError):
+        edicion.cambiar_costo(9, 3, 1.0)        # pedir 2 con stock lleno
+    with pytest.raises(ValueError):
+        edicion.cambiar_fila(0, 1, [0.5] * 10)
+    with pytest.raises(ValueError):
+        edicion.cambiar_fila(0, 1, {10: 1.0})
+    with pytest.raises(ValueError):
+        diferencia_modelos(inventario(10, 3), inventario(11, 3))
+
+
+# ----------------------------------------------------------------------
+# Resolución en caliente contra fuerza bruta
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("semilla", range(4))
+def test_en_caliente_igual_a_fuerza_bruta(semilla):
+    rng = np.random.default_rng(semilla)
+    sesion = ResolucionIncremental(aleatorio_disperso(5, 3, semilla=semilla, nnz=3))
+    metodos = {
+        "enumeracion": {"k": 3},
+        "lp": {"backend": "highs"},
+        "pi": {},
+        "rvi": {"tol": 1e-11},
+        "pi_desc": {"alpha": ALPHA},
+        "vi": {"alpha": ALPHA, "tol": 1e-11},
+    }
+    for version in range(3):
+        if version:
+            sesion.aplicar(_editar(sesion.editar(), rng))
+        g, v = _fuerza_bruta(sesion.modelo)
+        for metodo, parametros in metodos.items():
+            res = sesion.resolver(metodo, **parametros)
+            if metodo in ("pi_desc", "vi"):
+                np.testing.assert_allclose(res.v, v, rtol=1e-8)
+            elif res.g is not None and g is not None:
+                assert res.g == pytest.approx(g, rel=1e-7), (version, metodo)
+
+
+def test_lp_en_caliente_no_resuelve_el_lp():
+    sesion = ResolucionIncremental(inventario(60, 5, semilla=4))
+    frio = sesion.resolver("lp", backend="highs")
+    sesion.aplicar(sesion.editar().cambiar_costo(10, 1, 50.0)
+                   .cambiar_costo(30, 2, 0.0))
+    caliente = sesion.resolver("lp", backend="highs")
+    assert frio.backend == "highs" and caliente.backend == "previa"
+    referencia = ResolucionIncremental(sesion.modelo).resolver("lp", backend="highs")
+    # (las políticas pueden diferir en los estados transitorios)
+    assert caliente.g == pytest.approx(referencia.g, rel=1e-8)
+    assert caliente.g == pytest.approx(sesion.resolver("pi").g, rel=1e-10)
+
+
+def test_vi_en_caliente_itera_menos():
+    sesion = ResolucionIncremental(inventario(100, 6, semilla=1))
+    frio = sesion.resolver("vi", alpha=0.99, tol=1e-8)
+    sesion.aplicar(sesion.editar().cambiar_costo(50, 1, 20.0))
+    caliente = sesion.resolver("vi", alpha=0.99, tol=1e-8)
+    referencia = ResolucionIncremental(sesion.modelo).resolver(
+        "vi", alpha=0.99, tol=1e-8)
+    assert caliente.iteraciones < frio.iteraciones / 5
+    assert caliente.politica == referencia.politica
+    np.testing.assert_allclose(caliente.v, referencia.v, atol=1e-5)
+
+
+def test_enumeracion_con_semillas_da_las_mismas_mejores():
+    rng = np.random.default_rng(0)
+    sesion = ResolucionIncremental(aleatorio_disperso(8, 3, semilla=3, nnz=4))
+    sesion.resolver("enumeracion", k=5)
+    sesion.aplicar(_editar(sesion.editar(), rng, cambios=2))
+    caliente = sesion.resolver("enumeracion", k=5)
+    frio = ResolucionIncremental(sesion.modelo).resolver("enumeracion", k=5)
+    assert [p for p, _, _ in caliente.mejores] == [p for p, _, _ in frio.mejores]
+    np.testing.assert_allclose([g for _, _, g in caliente.mejores],
+                               [g for _, _, g in frio.mejores], rtol=1e-12)
@@ -0,0 +1,61 @@
+# tests/test_estacionaria.py
+
+import numpy as np
+import pytest
+
+import estacionaria
+from estacionaria import (CadenaMulticadenaError, cache_de,
+                          distribucion_estacionaria, estacionaria_politica)
+from generadores import aleatorio_disperso, inventario
+from modelo import ModeloPMD
+
+
+def _referencia(P):
+    """π con el sistema denso (Pᵀ – I) π = 0, Σ π = 1."""
+    n = P.shape[0]
+    A = np.vstack([P.T - np.eye(n), np.ones(n)])
+    return np.linalg.lstsq(A, np.append(np.zeros(n), 1.0), rcond=None)[0]
+
+
+@pytest.mark.parametrize("metodo", ["lu", "gth", "potencia", "iterativo"])
+def test_metodos_igual_a_referencia(metodo):
+    modelo = aleatorio_disperso(50, 2, semilla=5)
+    P = modelo.matriz_politica([1] * 50, densa=True)
+    np.testing.assert_allclose(distribucion_estacionaria(P, metodo),
+                               _referencia(P), atol=1e-9)
+
+
+def test_multicadena():
+    P = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.5, 0.5, 0.0]])
+    with pytest.raises(CadenaMulticadenaError):
+        distribucion_estacionaria(P)
+
+
+def test_cache_acierta_con_diccionarios():
+    """El diccionario de read.py da un modelo nuevo en cada llamada; la
+    caché se comparte por contenido."""
+    datos = inventario(12, 3, semilla=1).a_datos()
+    pol = [1] * 12
+    cache = cache_de(ModeloPMD.desde_datos(datos))
+    aciertos = cache.aciertos
+    pi = estacionaria_politica(datos, pol)
+    for _ in range(3):
+        assert estacionaria_politica(datos, pol) is pi
+    assert cache.aciertos == aciertos + 3
+    np.testing.assert_allclose(
+        pi, _referencia(ModeloPMD.desde_datos(datos).matriz_politica(pol, True)),
+        atol=1e-10)
+
+
+def test_cache_distingue_contenido():
+    a = inventario(12, 3, semilla=1)
+    b = inventario(12, 3, semilla=2)
+    assert a.huella() != b.huella()
+    assert cache_de(a) is not cache_de(b)
+    assert cache_de(a) is cache_de(inventario(12, 3, semilla=1))
+
+
+def test_cache_acotada():
+    for semilla in range(estacionaria.MAX_MODELOS_CACHE + 3):
+        cache_de(aleatorio_disperso(10, 2, semilla=semilla))
+    assert len(estacionaria._caches) <= estacionaria.MAX_MODELOS_CACHE
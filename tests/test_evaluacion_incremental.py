@@ -0,0 +1,108 @@
+# tests/test_evaluacion_incremental.py
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import api
+from generadores import aleatorio_disperso, inventario
+from modelo import ModeloPMD
+from sistemas import elegir_metodo, matriz_descuento
+from evaluacion_incremental import EvaluadorIncremental
+from pol_mejoradas import evaluar_politica_con_desc
+
+
+def _referencia_desc(modelo, pol, alpha):
+    Ppol = modelo.matriz_politica(pol, densa=True)
+    return np.linalg.solve(np.eye(modelo.n) - alpha * Ppol,
+                           modelo.costos_politica(pol))
+
+
+def _referencia_medio(modelo, pol):
+    """(g, h) con h_{n-1} = 0, resolviendo el sistema denso completo."""
+    n = modelo.n
+    Ppol = modelo.matriz_politica(pol, densa=True)
+    A = np.zeros((n + 1, n + 1))
+    A[:n, :n] = np.eye(n) - Ppol
+    A[:n, n] = 1.0
+    A[n, n - 1] = 1.0
+    x = np.linalg.solve(A, np.append(modelo.costos_politica(pol), 0.0))
+    return x[n], x[:n]
+
+
+def _politicas(modelo, cuantas, cambios, semilla=0):
+    """Sucesión de políticas que cambian `cambios` estados cada vez."""
+    rng = np.random.default_rng(semilla)
+    pol = np.array([modelo.decisiones(i)[0] for i in range(modelo.n)])
+    for _ in range(cuantas):
+        for i in rng.choice(modelo.n, size=cambios, replace=False):
+            pol[i] = rng.choice(modelo.decisiones(i))
+        yield pol.tolist()
+
+
+def _modelo_mixto(n, semilla=0):
+    """Acción 1 tridiagonal (LU dispersa), acción 2 con 5 destinos
+    aleatorios por fila (GMRES)."""
+    rng = np.random.default_rng(semilla)
+    T = sparse.diags([np.full(n - 1, 0.3), np.full(n, 0.4), np.full(n - 1, 0.3)],
+                     [-1, 0, 1], format="lil")
+    T[0, 0] = T[n - 1, n - 1] = 0.7
+    columnas = rng.integers(0, n, size=(n, 5))
+    valores = rng.random((n, 5)) + 1e-3
+    valores /= valores.sum(axis=1, keepdims=True)
+    R = sparse.csr_matrix((valores.ravel(), columnas.ravel(),
+                           np.arange(0, 5 * n + 1, 5)), shape=(n, n))
+    R.sum_duplicates()
+    orden = np.empty(2 * n, dtype=np.int64)
+    orden[0::2], orden[1::2] = np.arange(n), n + np.arange(n)
+    P = sparse.vstack([T.tocsr(), R]).tocsr()[orden]
+    return ModeloPMD(n, np.arange(0, 2 * n + 1, 2), np.tile([1, 2], n),
+                     rng.uniform(0, 100, 2 * n), P)
+
+
+@pytest.mark.parametrize("cambios", [1, 3, 40])
+def test_descontado_igual_a_referencia(cambios):
+    modelo = aleatorio_disperso(60, 3, semilla=1)
+    ev = EvaluadorIncremental(modelo, 0.95)
+    for pol in _politicas(modelo, 15, cambios):
+        np.testing.assert_allclose(ev.evaluar(pol),
+                                   _referencia_desc(modelo, pol, 0.95),
+                                   rtol=1e-8)
+    assert ev.refactorizaciones + ev.actualizaciones > 1
+
+
+def test_costo_medio_igual_a_referencia():
+    modelo = inventario(40, 4, semilla=2)
+    ev = EvaluadorIncremental(modelo)
+    for pol in _politicas(modelo, 10, 2, semilla=3):
+        g, h = ev.evaluar(pol)
+        g_ref, h_ref = _referencia_medio(modelo, pol)
+        assert g == pytest.approx(g_ref, rel=1e-9)
+        np.testing.assert_allclose(h, h_ref, rtol=1e-7, atol=1e-7)
+    assert ev.actualizaciones > 0
+
+
+def test_politicas_con_metodos_distintos():
+    """La base se factoriza con LU dispersa y la política siguiente va a
+    GMRES (y al revés): no hay factorización que reutilizar."""
+    n = 1200
+    modelo = _modelo_mixto(n)
+    unos, doses = [1] * n, [2] * n
+    metodo = lambda pol: elegir_metodo(
+        matriz_descuento(modelo.P[modelo.indices_politica(pol)], 0.9))
+    assert metodo(unos) == "directo" and metodo(doses) == "krylov"
+
+    ev = EvaluadorIncremental(modelo, 0.9)
+    for pol in (unos, doses, unos, doses[:n // 2] + unos[n // 2:]):
+        np.testing.assert_allclose(ev.evaluar(pol),
+                                   _referencia_desc(modelo, pol, 0.9),
+                                   rtol=1e-8)
+
+
+def test_pi_descontada_con_metodos_distintos():
+    modelo = _modelo_mixto(1200, semilla=1)
+    res = api.resolver_pi_desc(modelo, 0.9)
+    assert res.convergio
+    np.testing.assert_allclose(
+        res.v, evaluar_politica_con_desc(list(res.politica), modelo, 0.9),
+        rtol=1e-8)